@@ -16,7 +16,7 @@ from devito.tools import *  # noqa
 from devito.types import NODE, CELL, Buffer, SubDomain  # noqa
 from devito.types.dimension import *  # noqa
 
-from devito.compiler import compiler_registry
+from devito.compiler import compiler_registry, compile_all  # noqa
 from devito.backends import backends_registry, init_backend
 
 
@@ -50,10 +50,33 @@ def _reinit_compiler(val):  # noqa
                                        mpi=configuration['mpi'])
     return bool(val)
 configuration.add('openmp', 0, [0, 1], callback=_reinit_compiler)  # noqa
-configuration.add('mpi', 0, [0, 1], callback=_reinit_compiler)
+
+# MPI setup. Besides switching MPI on (`1`, which implies `basic`), one can
+# select the halo exchange scheme:
+# - basic: no overlap between communication and computation
+# - full: like `basic`, but all neighbours, including the diagonal ones, are
+#         exchanged with in a single communication round
+# - overlap: the halo exchanges are overlapped with the computation of the
+#            region that does not read the halo
+# - persistent: like `overlap`, but with buffers and MPI requests set up once
+#               per Operator invocation, rather than once per halo exchange
+# - wide: communication-avoiding; a wider halo is exchanged only once every
+#         `exchange_period` timesteps, and the stencil is computed redundantly
+#         over the halo in between
+def _reinit_mpi(val):  # noqa
+    _reinit_compiler(val)
+    if val is True or val == 1:
+        return 'basic'
+    return val or False
+configuration.add('mpi', 0, [0, 1, 'basic', 'full', 'overlap', 'persistent', 'wide'], callback=_reinit_mpi)  # noqa
+
+# With MPI, the halo of the Functions along the distributed Dimensions is, by
+# default, as large as the space order. A deeper halo (e.g., `2` for twice as
+# large) allows the `wide` scheme to exchange it less frequently
+configuration.add('halo-depth', 1, None, lambda i: int(i), False)
 
 # Autotuning setup
-AT_LEVELs = ['off', 'basic', 'aggressive']
+AT_LEVELs = ['off', 'basic', 'aggressive', 'guided']
 AT_MODEs = ['preemptive', 'destructive', 'runtime']
 at_default_mode = {'core': 'preemptive', 'yask': 'runtime', 'ops': 'runtime'}
 at_setup = namedtuple('at_setup', 'level mode')
@@ -1,4 +1,5 @@
 from collections import OrderedDict
+from functools import reduce
 
 import numpy as np
 import cgen as c
@@ -155,6 +156,16 @@ class CodePrinter(C99CodePrinter):
     def _print_ListInitializer(self, expr):
         return "{%s}" % ', '.join([self._print(i) for i in expr.params])
 
+    def _print_Min(self, expr):
+        # Relies on the MIN macro, defined in all generated files
+        args = [self._print(i) for i in expr.args]
+        return reduce(lambda a, b: "MIN(%s, %s)" % (a, b), args)
+
+    def _print_Max(self, expr):
+        # Relies on the MAX macro, defined in all generated files
+        args = [self._print(i) for i in expr.args]
+        return reduce(lambda a, b: "MAX(%s, %s)" % (a, b), args)
+
     def _print_IntDiv(self, expr):
         return expr.__str__()
 
@@ -1,6 +1,8 @@
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from functools import partial
 from hashlib import sha1
-from os import environ, path
+from os import cpu_count, environ, path
 from time import time
 from distutils import version
 from subprocess import DEVNULL, CalledProcessError, check_output, check_call
@@ -17,7 +19,7 @@ from devito.parameters import configuration
 from devito.tools import (as_tuple, change_directory, filter_ordered,
                           memoized_func, make_tempdir)
 
-__all__ = ['jit_compile', 'load', 'make', 'GNUCompiler']
+__all__ = ['jit_compile', 'compile_all', 'load', 'make', 'GNUCompiler']
 
 
 def sniff_compiler_version(cc):
@@ -393,6 +395,51 @@ def jit_compile(soname, code, compiler):
         debug("%s: cache hit `%s` [%.2f s]" % (compiler, src_file, toc-tic))
 
 
+def compile_all(operators, workers=None):
+    """
+    JIT compile a batch of Operators, running the backend compiler invocations
+    concurrently within a pool of processes.
+
+    Code generation is performed by the calling process, while each worker
+    process runs ``jit_compile``, thus retaining codepy's caching and locking
+    as well as the spin-lock in case of MPI. The total compilation time is
+    therefore bounded by the slowest compilation, rather than the sum of all
+    of them. Upon return, the Operators are ready to be executed.
+
+    Parameters
+    ----------
+    operators : Operator or list of Operator
+        The Operators to be compiled.
+    workers : int, optional
+        Number of worker processes. Defaults to the number of available cores,
+        unless running with MPI, in which case the compilations are performed
+        serially, as each rank would otherwise spawn its own pool of processes.
+    """
+    operators = [i for i in as_tuple(operators) if i._lib is None]
+
+    # Operators generating the very same code only need to be compiled once
+    jobs = OrderedDict()
+    for i in operators:
+        jobs.setdefault(i._soname, (str(i.ccode), i._compiler))
+
+    if workers is None:
+        workers = 1 if configuration['mpi'] else cpu_count() or 1
+    workers = min(workers, len(jobs))
+    if workers > 1:
+        tic = time()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(jit_compile, k, *v) for k, v in jobs.items()]
+            for i in futures:
+                i.result()
+        toc = time()
+        debug("Compiled %d Operators with %d workers [%.2f s]"
+              % (len(jobs), workers, toc-tic))
+
+    # Load the shared objects. If compiled above, codepy's cache is hit
+    for i in operators:
+        i.cfunction
+
+
 def make(loc, args):
     """Invoke the ``make`` command from within ``loc`` with arguments ``args``."""
     hash_key = sha1((loc + str(args)).encode()).hexdigest()
@@ -1,17 +1,29 @@
 from collections import OrderedDict
 from itertools import chain, combinations, product
+from pathlib import Path
+import json
+import os
+import re
 import resource
+
+import cpuinfo
 import psutil
 
+try:
+    import fcntl
+except ImportError:
+    # E.g., Windows
+    fcntl = None
+
 from devito.dle import BlockDimension, NThreads
 from devito.ir import Backward, retrieve_iteration_tree
 from devito.logger import perf, warning as _warning
 from devito.mpi import MPI
 from devito.parameters import configuration
 from devito.symbolics import evaluate
-from devito.tools import filter_ordered, flatten, prod
+from devito.tools import filter_ordered, flatten, memoized_func, prod
 
-__all__ = ['autotune']
+__all__ = ['autotune', 'TuningDatabase']
 
 
 def autotune(operator, args, level, mode):
@@ -25,9 +37,11 @@ def autotune(operator, args, level, mode):
     args : dict_like
         The runtime arguments with which `operator` is run.
     level : str
-        The autotuning aggressiveness (basic, aggressive). A more aggressive
+        The autotuning aggressiveness (basic, aggressive, guided). A more aggressive
         autotuning might eventually result in higher performance, though in
-        some circumstances it might instead increase the actual runtime.
+        some circumstances it might instead increase the actual runtime. The
+        guided autotuning explores the same space as the aggressive one, but
+        through a model-driven search requiring far fewer runs.
     mode : str
         The autotuning mode (preemptive, runtime). In preemptive mode, the
         output runtime values supplied by the user to `operator.apply` are
@@ -47,6 +61,15 @@ def autotune(operator, args, level, mode):
         # Nothing to tune for
         return args, {}
 
+    # Reuse the best setup found by a previous autotuning session, if any
+    key = tuning_key(operator, args, level, nthreads)
+    if options['database'] and not options['refresh']:
+        best = TuningDatabase(options['database']).lookup(key)
+        if best is not None:
+            log("selected best from database: %s" % best)
+            args = {k: best.get(k, v) for k, v in args.items()}
+            return args, {'runs': 0, 'tpr': 0, 'tuned': best}
+
     # We get passed all the arguments, but the cfunction only requires a subset
     at_args = OrderedDict([(p.name, args[p.name]) for p in operator.parameters])
 
@@ -75,14 +98,20 @@ def autotune(operator, args, level, mode):
 
     trees = retrieve_iteration_tree(operator.body)
 
-    # Shrink the time dimension's iteration range for quick autotuning
-    steppers = {i for i in flatten(trees) if i.dim.is_Time}
+    # Shrink the time dimension's iteration range for quick autotuning. With
+    # temporal blocking, the Iterations over the time tiles aren't steppers, and
+    # each run must span at least one time tile
+    steppers = {i for i in flatten(trees)
+                if i.dim.is_Time and not isinstance(i.dim, BlockDimension)}
+    squeezer = options['squeezer']
+    if any(i.root.is_Time for i in blockable):
+        squeezer = max(squeezer, max(options['tblocksize']))
     if len(steppers) == 0:
         stepper = None
         timesteps = 1
     elif len(steppers) == 1:
         stepper = steppers.pop()
-        timesteps = init_time_bounds(stepper, at_args)
+        timesteps = init_time_bounds(stepper, at_args, squeezer)
         if timesteps is None:
             return args, {}
     else:
@@ -93,16 +122,17 @@ def autotune(operator, args, level, mode):
     # number of threads, and size of the parallel iteration space
     calculate_parblocks = make_calculate_parblocks(trees, blockable, nthreads)
 
-    # Generated loop-blocking attempts
-    block_shapes = generate_block_shapes(blockable, args, level)
-
-    # Generate nthreads attempts
-    nthreads = generate_nthreads(nthreads, args, level)
+    timings = OrderedDict()
 
-    generators = [i for i in [block_shapes, nthreads] if i]
+    if level == 'guided':
+        working_set = make_working_set(operator, blockable, at_args)
+        candidates = generate_guided(blockable, nthreads, args, timings, working_set)
+        nexhaustive = prod(len(i) for i in generate_search_space(blockable, nthreads,
+                                                                 args, level))
+    else:
+        candidates = product(*generate_search_space(blockable, nthreads, args, level))
 
-    timings = OrderedDict()
-    for i in product(*generators):
+    for i in candidates:
         run = tuple(chain(*i))
         mapper = OrderedDict(run)
 
@@ -147,6 +177,10 @@ def autotune(operator, args, level, mode):
         warning("couldn't perform any runs")
         return args, {}
 
+    # Make the best setup available to future autotuning sessions
+    if options['database']:
+        TuningDatabase(options['database']).store(key, best)
+
     # Build the new argument list
     args = {k: best.get(k, v) for k, v in args.items()}
 
@@ -167,21 +201,83 @@ def autotune(operator, args, level, mode):
     summary['runs'] = len(timings)
     summary['tpr'] = timesteps  # tpr -> timesteps per run
     summary['tuned'] = dict(best)
+    if level == 'guided':
+        summary['saved'] = nexhaustive - len(timings)
+        log("performed %d runs, %d saved w.r.t. an exhaustive search"
+            % (len(timings), summary['saved']))
 
     return args, summary
 
 
-def init_time_bounds(stepper, at_args):
+def tuning_key(operator, args, level, nthreads):
+    """
+    A key uniquely identifying an autotuning session: the generated code, the
+    iteration space sizes, the platform/ISA, the number of threads, and the
+    autotuning level.
+    """
+    sizes = ['%s=%d' % (d.name, args[d.max_name] - args[d.min_name] + 1)
+             for d in operator.dimensions
+             if not d.is_Derived and d.min_name in args and d.max_name in args]
+    items = [operator._soname, ','.join(sizes), configuration['platform'],
+             configuration['isa'], ','.join(str(args[i.name]) for i in nthreads),
+             str(level)]
+    return '|'.join(items)
+
+
+class TuningDatabase(object):
+
+    """
+    A persistent database of autotuning results, stored as a JSON file.
+
+    The database may be shared by multiple processes (e.g., MPI ranks, or
+    concurrent jobs); writers serialize through a file lock, while readers
+    always see a consistent snapshot as the file is atomically replaced
+    upon each update.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+
+    def load(self):
+        try:
+            with open(str(self.path), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def lookup(self, key):
+        """Return the best known setup for ``key``, or None if unknown."""
+        return self.load().get(key)
+
+    def store(self, key, best):
+        """Store ``best`` as the best known setup for ``key``."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(str(self.path.with_suffix('.lock')), 'w') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                data = self.load()
+                data[key] = {k: int(v) for k, v in best.items()}
+                tmpfile = self.path.with_suffix('.%d.tmp' % os.getpid())
+                with open(str(tmpfile), 'w') as f:
+                    json.dump(data, f, indent=2, sort_keys=True)
+                os.replace(str(tmpfile), str(self.path))
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def init_time_bounds(stepper, at_args, squeezer):
     if stepper is None:
         return
     dim = stepper.dim.root
     if stepper.direction is Backward:
-        at_args[dim.min_name] = at_args[dim.max_name] - options['squeezer']
+        at_args[dim.min_name] = at_args[dim.max_name] - squeezer
         if at_args[dim.max_name] < at_args[dim.min_name]:
             warning("too few time iterations; skipping")
             return False
     else:
-        at_args[dim.max_name] = at_args[dim.min_name] + options['squeezer']
+        at_args[dim.max_name] = at_args[dim.min_name] + squeezer
         if at_args[dim.min_name] > at_args[dim.max_name]:
             warning("too few time iterations; skipping")
             return False
@@ -232,7 +328,10 @@ def make_calculate_parblocks(trees, blockable, nthreads):
     blocks_per_threads = []
     main_block_trees = [i for i in trees if set(blockable) < set(i.dimensions)]
     for tree, nt in product(main_block_trees, nthreads):
-        block_iters = [i for i in tree if i.dim in blockable]
+        block_iters = [i for i in tree if i.dim in blockable and i.is_Parallel]
+        if not block_iters:
+            # E.g., temporal blocking, whose tiles are executed in sequence
+            continue
         par_block_iters = block_iters[:block_iters[0].ncollapsed]
         niterations = prod(i.size() for i in par_block_iters)
         block_size = prod(i.dim.step for i in par_block_iters)
@@ -240,6 +339,118 @@ def make_calculate_parblocks(trees, blockable, nthreads):
     return blocks_per_threads
 
 
+def generate_search_space(blockable, nthreads, args, level):
+    """The block shapes and nthreads attempts for the given autotuning ``level``."""
+    # Generated loop-blocking attempts
+    block_shapes = generate_block_shapes([i for i in blockable if not i.root.is_Time],
+                                         args, level)
+
+    # Generate temporal blocking attempts
+    time_blocks = generate_time_blocks([i for i in blockable if i.root.is_Time],
+                                       args, level)
+
+    # Generate nthreads attempts
+    nthreads = generate_nthreads(nthreads, args, level)
+
+    return [i for i in [block_shapes, time_blocks, nthreads] if i]
+
+
+def generate_guided(blockable, nthreads, args, timings, working_set):
+    """
+    Generate attempts through a coordinate descent over the same search space
+    explored in `aggressive` mode.
+
+    The attempts of the `basic` mode are performed first. Then, starting from
+    the best attempt so far, each tunable parameter is varied in turn, while
+    the others are kept fixed. This is repeated until no further improvement
+    is observed. Attempts whose working set would overflow the L2 cache, as
+    estimated by ``working_set``, are skipped.
+
+    Parameters
+    ----------
+    timings : dict
+        The timings of the attempts performed so far. It must be updated by
+        the caller before resuming the generator.
+    """
+    tried = set()
+    for i in product(*generate_search_space(blockable, nthreads, args, 'basic')):
+        run = tuple(chain(*i))
+        tried.add(run)
+        yield (run,)
+
+    # The values each tunable parameter can take
+    values = OrderedDict()
+    for candidates in generate_search_space(blockable, nthreads, args, 'guided'):
+        for candidate in candidates:
+            for k, v in candidate:
+                values.setdefault(k, set()).add(v)
+
+    l2_cache_size = options['l2-cache-size'] or get_l2_cache_size()
+
+    improved = True
+    while improved and timings:
+        improved = False
+        best = min(timings, key=timings.get)
+        for k, v in values.items():
+            for i in sorted(v):
+                run = tuple((j, i if j == k else w) for j, w in best)
+                if run in tried:
+                    continue
+                tried.add(run)
+                if working_set(dict(run)) > l2_cache_size:
+                    continue
+                yield (run,)
+            if min(timings, key=timings.get) != best:
+                best = min(timings, key=timings.get)
+                improved = True
+
+
+def make_working_set(operator, blockable, args):
+    """
+    Return a function estimating the working set, in bytes, of a block given
+    the values of the tunable parameters. This is a coarse model, which assumes
+    that all grid points within a block of all DiscreteFunctions are accessed.
+    """
+    extents = OrderedDict([(d, args[d.max_name] - args[d.min_name] + 1)
+                           for d in operator.dimensions
+                           if d.is_Space and not d.is_Derived and
+                           d.min_name in args and d.max_name in args])
+
+    steps = OrderedDict()
+    for d in blockable:
+        steps.setdefault(d.root, []).append(d.step.name)
+
+    functions = [i for i in operator.input
+                 if i.is_DiscreteFunction and not i.is_SparseFunction]
+    itemsize = sum(i.dtype().itemsize * (i.time_order + 1 if i.is_TimeFunction else 1)
+                   for i in functions)
+
+    def working_set(mapper):
+        points = 1
+        for d, v in extents.items():
+            points *= min([v] + [mapper[i] for i in steps.get(d, []) if i in mapper])
+        return points*itemsize
+
+    return working_set
+
+
+@memoized_func
+def get_l2_cache_size():
+    """
+    The L2 cache size, in bytes, or a conservative default if unknown. As
+    querying the CPU is slow, this is only done once, and upon request.
+    """
+    value = cpuinfo.get_cpu_info().get('l2_cache_size')
+    if isinstance(value, int):
+        return value
+    try:
+        # E.g., '256 KB', '2 MiB (1 instance)'
+        number, unit = re.match(r'([\d.]+)\s*([KMG]?)', value).groups()
+        return int(float(number) * {'': 1, 'K': 2**10, 'M': 2**20, 'G': 2**30}[unit])
+    except (TypeError, AttributeError):
+        return 2**20
+
+
 def generate_block_shapes(blockable, args, level):
     # Max attemptable block shape
     max_bs = tuple((d.step.name, d.max_step.subs(args)) for d in blockable)
@@ -249,8 +460,8 @@ def generate_block_shapes(blockable, args, level):
     ret = [tuple((d.step.name, v) for d in blockable) for v in options['blocksize']]
     # 2) Always try the entire iteration space (degenerate block)
     ret.append(max_bs)
-    # 3) More attempts if auto-tuning in aggressive mode
-    if level == 'aggressive':
+    # 3) More attempts if auto-tuning in aggressive (or guided) mode
+    if level in ('aggressive', 'guided'):
         # Ramp up to larger block shapes
         handle = tuple((i, options['blocksize'][-1]) for i, _ in ret[0])
         for i in range(3):
@@ -280,11 +491,29 @@ def generate_block_shapes(blockable, args, level):
     return ret
 
 
+def generate_time_blocks(blockable, args, level):
+    if not blockable:
+        return []
+
+    # Max attemptable number of timesteps per tile
+    max_bs = min(d.max_step.subs(args) for d in blockable)
+
+    # Attempted number of timesteps per tile; more attempts if auto-tuning in
+    # aggressive (or guided) mode
+    values = list(options['tblocksize'])
+    if level in ('aggressive', 'guided'):
+        values.append(values[-1]*2)
+
+    ret = [tuple((d.step.name, v) for d in blockable) for v in values if v <= max_bs]
+
+    return filter_ordered(ret)
+
+
 def generate_nthreads(nthreads, args, level):
     ret = [((i.name, args[i.name]),) for i in nthreads]
 
     # On the KNL, also try running with a different number of hyperthreads
-    if level == 'aggressive' and configuration['platform'] == 'knl':
+    if level in ('aggressive', 'guided') and configuration['platform'] == 'knl':
         ret.extend([((i.name, psutil.cpu_count()),) for i in nthreads])
         ret.extend([((i.name, psutil.cpu_count() // 2),) for i in nthreads])
         ret.extend([((i.name, psutil.cpu_count() // 4),) for i in nthreads])
@@ -296,15 +525,25 @@ def heuristically_discard_run(calculate_parblocks, at_args):
     if configuration['develop-mode']:
         return False
     # Drop run if not at least one block per thread
-    return all(i.subs(at_args) < 1 for i in calculate_parblocks)
+    return (len(calculate_parblocks) > 0 and
+            all(i.subs(at_args) < 1 for i in calculate_parblocks))
 
 
 options = {
     'squeezer': 4,
     'blocksize': sorted({8, 16, 24, 32, 40, 64, 128}),
-    'stack_limit': resource.getrlimit(resource.RLIMIT_STACK)[0] / 4
+    'tblocksize': (2, 4, 8),
+    'stack_limit': resource.getrlimit(resource.RLIMIT_STACK)[0] / 4,
+    'database': os.environ.get('DEVITO_AUTOTUNING_DB'),
+    'refresh': False,
+    'l2-cache-size': None
 }
-"""Autotuning options."""
+"""
+Autotuning options. If ``database`` is the path to a (possibly non-existing)
+JSON file, the autotuning results are stored there and reused by all future
+autotuning sessions, unless ``refresh`` is True. If ``l2-cache-size`` is None,
+the L2 cache size used by the ``guided`` mode is detected from the CPU.
+"""
 
 
 def log(msg):
@@ -1,7 +1,7 @@
 from collections import OrderedDict
 
 from devito.core.autotuning import autotune
-from devito.ir.iet import List, HaloSpot, MetaCall, FindNodes, Transformer
+from devito.ir.iet import HaloSpot, MetaCall, FindNodes, Transformer
 from devito.ir.support import align_accesses
 from devito.parameters import configuration
 from devito.mpi import HaloExchangeBuilder
@@ -25,22 +25,28 @@ class OperatorCore(Operator):
         iet = Transformer(mapper, nested=True).visit(iet)
 
         # Nothing else to do if no MPI
-        if configuration['mpi'] is False:
+        if not configuration['mpi']:
             return iet
 
         # Build halo exchange Callables and Calls
+        # The halo exchange scheme may be selected on a per-Operator basis, through
+        # any of the values accepted by `configuration['mpi']`
+        mode = kwargs.get("mpi") or configuration['mpi']
+        mode = 'basic' if mode is True or mode == 1 else mode
+        heb = HaloExchangeBuilder(is_threaded(kwargs.get("dle")), mode)
+        iet = heb.prepare(iet)
         halo_spots = FindNodes(HaloSpot).visit(iet)
-        heb = HaloExchangeBuilder(is_threaded(kwargs.get("dle")))
         callables, calls = heb.make(halo_spots)
 
         # Update the Operator internal state
         self._includes.append('mpi.h')
         self._func_table.update(OrderedDict([(i.name, MetaCall(i, True))
                                              for i in callables]))
+        self.input.extend(heb.objs)
+        self._halo_exchanges = (type(heb), heb.exchanges)
 
-        # Transform the IET by adding in the `haloupdate` Calls
-        mapper = {k: List(body=v + list(k.body)) for k, v in calls.items()}
-        iet = Transformer(mapper, nested=True).visit(iet)
+        # Transform the IET by adding in the halo exchange Calls
+        iet = heb.place(iet, calls)
 
         return iet
 
@@ -1,7 +1,20 @@
 import abc
+import atexit
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from functools import reduce
 from operator import mul
+from threading import RLock
 import mmap
+import os
+import sys
+import tempfile
+
+try:
+    import fcntl
+except ImportError:
+    # E.g., Windows
+    fcntl = None
 
 import numpy as np
 import ctypes
@@ -13,7 +26,9 @@ from devito.tools import dtype_to_ctype
 
 __all__ = ['ALLOC_FLAT', 'ALLOC_NUMA_LOCAL', 'ALLOC_NUMA_ANY',
            'ALLOC_KNL_MCDRAM', 'ALLOC_KNL_DRAM', 'ALLOC_GUARD',
-           'default_allocator']
+           'ALLOC_HUGEPAGES', 'ALLOC_HUGEPAGES_NUMA_LOCAL', 'ALLOC_POOL',
+           'ALLOC_MMAP', 'ALLOC_SHM', 'PoolAllocator', 'MmapAllocator',
+           'SharedMemoryAllocator', 'default_allocator']
 
 
 class MemoryAllocator(object):
@@ -24,6 +39,19 @@ class MemoryAllocator(object):
 
     is_Posix = False
     is_Numa = False
+    is_HugePages = False
+    is_Pool = False
+    is_Mmap = False
+    is_Shm = False
+
+    preserves_data = False
+    """
+    True if the allocated memory comes with meaningful values, which must not
+    be overwritten upon allocation.
+    """
+
+    is_readonly = False
+    """True if the allocated memory may not be written."""
 
     _attempted_init = False
     lib = None
@@ -298,12 +326,557 @@ class NumaAllocator(MemoryAllocator):
         return self._node == 'local'
 
 
+def load_libc_mmap():
+    """
+    Load a private handle to ``libc``, with argument and return types set up
+    for the memory mapping functions. Return None if ``libc`` is unavailable.
+    """
+    handle = find_library('c')
+    if handle is None:
+        return None
+    lib = ctypes.CDLL(handle, use_errno=True)
+    lib.mmap.restype = ctypes.c_void_p
+    lib.mmap.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int,
+                         ctypes.c_int, ctypes.c_int, ctypes.c_long]
+    lib.munmap.argtypes = [ctypes.c_void_p, ctypes.c_size_t]
+    lib.madvise.argtypes = [ctypes.c_void_p, ctypes.c_size_t, ctypes.c_int]
+    return lib
+
+
+MAP_FAILED = ctypes.c_void_p(-1).value
+
+
+class HugePagesAllocator(MemoryAllocator):
+
+    """
+    Memory allocator based on huge pages, which reduce the TLB misses when
+    sweeping over large arrays. The memory is first requested from the pool of
+    explicitly reserved huge pages, through ``mmap(..., MAP_HUGETLB)``. If no
+    huge pages are available (or if not on Linux), the memory is rather aligned
+    to huge page boundaries through ``posix_memalign``, and the kernel is asked
+    to back it with transparent huge pages through ``madvise(MADV_HUGEPAGE)``.
+    The allocated memory is aligned to huge page boundaries.
+
+    Parameters
+    ----------
+    node : int or str, optional
+        If supplied, the allocated memory is bound to a NUMA node, provided that
+        ``libnuma`` is available. Accepted values are as in NumaAllocator, bar
+        ``any``.
+    """
+
+    is_HugePages = True
+
+    hugepagesize = 2*1024*1024
+    """Size of a huge page in bytes."""
+
+    # Linux-specific flags, not all of which are exposed by Python's `mmap`
+    _MAP_HUGETLB = 0x40000
+    _MADV_HUGEPAGE = 14
+
+    @classmethod
+    def initialize(cls):
+        cls.lib = load_libc_mmap()
+
+    def __init__(self, node=None):
+        super(HugePagesAllocator, self).__init__()
+        self._node = node
+
+    @property
+    def node(self):
+        return self._node
+
+    def _alloc_C_libcall(self, size, ctype):
+        if not self.available():
+            raise RuntimeError("Couldn't find `libc` to allocate memory")
+
+        # Round up to a whole number of huge pages
+        nbytes = max(size * ctypes.sizeof(ctype), 1)
+        nbytes = -(-nbytes // self.hugepagesize) * self.hugepagesize
+        c_bytesize = ctypes.c_size_t(nbytes)
+
+        c_pointer = None
+        if sys.platform.startswith('linux'):
+            flags = mmap.MAP_PRIVATE | mmap.MAP_ANONYMOUS | self._MAP_HUGETLB
+            ptr = self.lib.mmap(None, c_bytesize, mmap.PROT_READ | mmap.PROT_WRITE,
+                                flags, -1, 0)
+            if ptr not in (None, MAP_FAILED):
+                c_pointer = ctypes.c_void_p(ptr)
+                memfree_args = (c_pointer, c_bytesize, True)
+        if c_pointer is None:
+            # Fallback to transparent huge pages
+            c_pointer = ctypes.c_void_p()
+            ret = self.lib.posix_memalign(ctypes.byref(c_pointer), self.hugepagesize,
+                                          c_bytesize)
+            if ret != 0:
+                return None, None
+            if sys.platform.startswith('linux'):
+                # Failure here only means that the memory is backed by regular pages
+                self.lib.madvise(c_pointer, c_bytesize, self._MADV_HUGEPAGE)
+            memfree_args = (c_pointer, c_bytesize, False)
+
+        if self._node is not None and NumaAllocator.available():
+            numa = NumaAllocator.lib
+            if self._node == 'local':
+                numa.numa_setlocal_memory(c_pointer, c_bytesize)
+            else:
+                numa.numa_tonode_memory(c_pointer, c_bytesize, self._node)
+
+        return c_pointer, memfree_args
+
+    def free(self, c_pointer, c_bytesize, mmapped):
+        if mmapped:
+            self.lib.munmap(c_pointer, c_bytesize)
+        else:
+            self.lib.free(c_pointer)
+
+
+class PoolAllocator(MemoryAllocator):
+
+    """
+    Memory allocator recycling the freed memory blocks. Upon ``free``, a block
+    is retained in a free list, one for each size class, and handed back upon
+    the next allocation of the same size class, thus sparing the system calls
+    and the page faults of a fresh allocation. This is beneficial when Functions
+    of the same shape are repeatedly created and destroyed, e.g. once per shot.
+
+    Parameters
+    ----------
+    allocator : MemoryAllocator, optional
+        The MemoryAllocator used for the actual allocations. Defaults to the
+        allocator that would be returned by ``default_allocator()``.
+    capacity : int, optional
+        The maximum number of bytes retained in the free lists. When exceeded,
+        the least recently freed blocks are released. Defaults to a quarter of
+        the physical memory.
+    zero : bool, optional
+        If True, the recycled blocks are zeroed, using multiple threads, before
+        being handed back. Defaults to False; note that the Functions zero-fill
+        their data upon allocation anyway.
+
+    Notes
+    -----
+    The size classes are spaced so that no more than 1/8 of a block is wasted.
+    """
+
+    is_Pool = True
+
+    _granularity = mmap.PAGESIZE
+
+    def __init__(self, allocator=None, capacity=None, zero=False):
+        super(PoolAllocator, self).__init__()
+        self._allocator = allocator
+        if capacity is None:
+            from psutil import virtual_memory
+            capacity = virtual_memory().total // 4
+        self.capacity = capacity
+        self.zero = zero
+
+        # Free lists, in LRU order: (allocator, size class) -> [(ptr, memfree_args)]
+        self._blocks = OrderedDict()
+        self._lock = RLock()
+        self._executor = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes_cached = 0
+
+    @classmethod
+    def available(cls):
+        return True
+
+    @property
+    def allocator(self):
+        """The MemoryAllocator used for the actual allocations."""
+        return self._allocator or _default_allocator()
+
+    @property
+    def guaranteed_alignment(self):
+        return self.allocator.guaranteed_alignment
+
+    @property
+    def stats(self):
+        """The pool statistics, as a dictionary."""
+        with self._lock:
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'nbytes_cached': self.nbytes_cached,
+                    'nblocks_cached': sum(len(i) for i in self._blocks.values())}
+
+    @classmethod
+    def size_class(cls, nbytes):
+        """The number of bytes actually allocated to satisfy a request."""
+        granularity = max(cls._granularity, 1 << max(int(nbytes).bit_length() - 4, 0))
+        return max(-(-nbytes // granularity) * granularity, granularity)
+
+    def _alloc_C_libcall(self, size, ctype):
+        allocator = self.allocator
+        nbytes = self.size_class(size * ctypes.sizeof(ctype))
+        key = (allocator, nbytes)
+
+        with self._lock:
+            blocks = self._blocks.get(key)
+            if blocks:
+                c_pointer, memfree_args = blocks.pop()
+                if not blocks:
+                    self._blocks.pop(key)
+                self.nbytes_cached -= nbytes
+                self.hits += 1
+            else:
+                c_pointer = None
+                self.misses += 1
+
+        if c_pointer is None:
+            c_pointer, memfree_args = allocator._alloc_C_libcall(nbytes, ctypes.c_char)
+            if c_pointer is None:
+                # Perhaps the cached blocks are the reason we're out of memory
+                self.clear()
+                c_pointer, memfree_args = allocator._alloc_C_libcall(nbytes,
+                                                                     ctypes.c_char)
+                if c_pointer is None:
+                    return None, None
+        elif self.zero:
+            self._memset(c_pointer, nbytes)
+
+        return c_pointer, (key, c_pointer, memfree_args)
+
+    def free(self, key, c_pointer, memfree_args):
+        allocator, nbytes = key
+        evicted = []
+        with self._lock:
+            self._blocks.setdefault(key, []).append((c_pointer, memfree_args))
+            self._blocks.move_to_end(key)
+            self.nbytes_cached += nbytes
+            while self.nbytes_cached > self.capacity and self._blocks:
+                k, blocks = next(iter(self._blocks.items()))
+                evicted.append((k[0], blocks.pop(0)[1]))
+                if not blocks:
+                    self._blocks.pop(k)
+                self.nbytes_cached -= k[1]
+                self.evictions += 1
+        for allocator, args in evicted:
+            allocator.free(*args)
+
+    def clear(self):
+        """Release all of the cached blocks."""
+        with self._lock:
+            blocks, self._blocks = self._blocks, OrderedDict()
+            self.nbytes_cached = 0
+        for (allocator, _), v in blocks.items():
+            for _, args in v:
+                allocator.free(*args)
+
+    def _memset(self, c_pointer, nbytes, chunksize=1 << 22):
+        """Zero a memory block. Large blocks are zeroed by multiple threads."""
+        if nbytes <= chunksize:
+            ctypes.memset(c_pointer, 0, nbytes)
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+        # ctypes releases the GIL during the `memset` calls
+        offsets = range(0, nbytes, chunksize)
+        list(self._executor.map(
+            lambda i: ctypes.memset(c_pointer.value + i, 0, min(chunksize, nbytes - i)),
+            offsets))
+
+
+class MmapAllocator(MemoryAllocator):
+
+    """
+    Memory allocator backing the allocated memory with a memory-mapped file,
+    e.g. on a fast local disk, for data that does not fit in main memory. The
+    operating system pages the data in and out as it gets accessed.
+
+    Parameters
+    ----------
+    path : str
+        Either a file or a directory. A file is retained when the memory is
+        released, so that it may later be reopened, e.g. to reuse a forward
+        wavefield in a subsequent gradient computation; a file may back a single
+        allocation at a time. A directory is instead used to back any number of
+        allocations with scratch files, which are deleted as soon as created.
+    mode : str, optional
+        If ``w+`` (default), a file is created, or overwritten. If ``r+`` or
+        ``r``, an existing file is reopened for reading and writing or for
+        reading only, respectively; its content becomes the allocated data, with
+        zero copy. Only relevant if ``path`` is a file.
+    advice : str, optional
+        An access pattern hint, passed to the kernel through ``madvise``. One of
+        ``normal``, ``sequential``, ``reverse``, ``random``, ``willneed``. May
+        be changed at any time through :meth:`advise`.
+
+    Notes
+    -----
+    The allocated memory is in the same layout as the (padded) Data, halo
+    included, so the files are meant to be reopened by Functions of the same
+    shape, type, space order and padding.
+
+    The halo of a Function reopened read-only retains the values stored in the
+    file, as it may not be updated by the MPI halo exchanges. Running an Operator
+    exchanging its halo raises an InvalidArgument; the same holds for a
+    read-only :class:`SharedMemoryAllocator`.
+
+    Examples
+    --------
+    A forward wavefield, saved to disk
+
+    >>> u = TimeFunction(name='u', grid=grid, save=nt,
+    ...                  allocator=ALLOC_MMAP('/scratch/u.bin'))  # doctest: +SKIP
+
+    may then be reused, in another process, as
+
+    >>> alloc = ALLOC_MMAP('/scratch/u.bin', mode='r')
+    >>> u = TimeFunction(name='u', grid=grid, save=nt, allocator=alloc)  # doctest: +SKIP
+    """
+
+    is_Mmap = True
+
+    # The kernel readahead only works forwards, so, upon a backward sweep, it is
+    # rather disabled, as with a random access pattern
+    _advices = {'normal': 0, 'random': 1, 'reverse': 1, 'sequential': 2, 'willneed': 3}
+
+    @classmethod
+    def initialize(cls):
+        cls.lib = load_libc_mmap()
+
+    def __init__(self, path, mode='w+', advice=None):
+        super(MmapAllocator, self).__init__()
+        if mode not in ('w+', 'r+', 'r'):
+            raise ValueError("Illegal mode `%s`" % mode)
+        if advice is not None and advice not in self._advices:
+            raise ValueError("Illegal advice `%s`" % advice)
+        self._path = str(path)
+        self._mode = mode
+        self._advice = advice
+        self._mapped = []
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def mode(self):
+        return self._mode
+
+    @property
+    def is_scratch(self):
+        return os.path.isdir(self._path)
+
+    @property
+    def preserves_data(self):
+        return not self.is_scratch and self._mode != 'w+'
+
+    @property
+    def is_readonly(self):
+        return not self.is_scratch and self._mode == 'r'
+
+    def _open(self, nbytes):
+        """
+        Open the file backing an allocation of ``nbytes`` bytes. Return the
+        file descriptor and the memory protection of the mapping.
+        """
+        prot = mmap.PROT_READ
+        if self.is_scratch:
+            fd, filename = tempfile.mkstemp(dir=self._path, suffix='.devito')
+            os.unlink(filename)
+            os.ftruncate(fd, nbytes)
+            prot |= mmap.PROT_WRITE
+        else:
+            if self._mapped:
+                raise RuntimeError("`%s` is already backing a Data" % self._path)
+            if self._mode == 'w+':
+                fd = os.open(self._path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+                os.ftruncate(fd, nbytes)
+                prot |= mmap.PROT_WRITE
+            else:
+                flags = os.O_RDWR if self._mode == 'r+' else os.O_RDONLY
+                fd = os.open(self._path, flags)
+                if os.fstat(fd).st_size != nbytes:
+                    os.close(fd)
+                    raise ValueError("`%s` has %d bytes, but %d bytes are required"
+                                     % (self._path, os.path.getsize(self._path),
+                                        nbytes))
+                if self._mode == 'r+':
+                    prot |= mmap.PROT_WRITE
+        return fd, prot
+
+    def _close(self, fd):
+        """Called once the file backing an allocation has been mapped."""
+        # The mapping outlives the file descriptor
+        os.close(fd)
+
+    def _release(self):
+        """Called once the file backing an allocation has been unmapped."""
+        return
+
+    def _alloc_C_libcall(self, size, ctype):
+        if not self.available():
+            raise RuntimeError("Couldn't find `libc`'s `mmap` to allocate memory")
+
+        nbytes = size * ctypes.sizeof(ctype)
+        fd, prot = self._open(nbytes)
+
+        c_bytesize = ctypes.c_size_t(max(nbytes, 1))
+        ptr = self.lib.mmap(None, c_bytesize, prot, mmap.MAP_SHARED, fd, 0)
+        self._close(fd)
+        if ptr in (None, MAP_FAILED):
+            self._release()
+            return None, None
+
+        c_pointer = ctypes.c_void_p(ptr)
+        self._mapped.append((c_pointer.value, c_bytesize))
+        if self._advice is not None:
+            self.lib.madvise(c_pointer, c_bytesize, self._advices[self._advice])
+
+        return c_pointer, (c_pointer, c_bytesize)
+
+    def free(self, c_pointer, c_bytesize):
+        self._mapped.remove((c_pointer.value, c_bytesize))
+        self.lib.munmap(c_pointer, c_bytesize)
+        self._release()
+
+    def advise(self, advice):
+        """
+        Pass an access pattern hint to the kernel for all of the memory allocated
+        through this MmapAllocator, e.g. ``sequential`` before a forward sweep
+        and ``reverse`` before a backward sweep.
+        """
+        if advice not in self._advices:
+            raise ValueError("Illegal advice `%s`" % advice)
+        self._advice = advice
+        for ptr, c_bytesize in self._mapped:
+            self.lib.madvise(ctypes.c_void_p(ptr), c_bytesize, self._advices[advice])
+
+
+class SharedMemoryAllocator(MmapAllocator):
+
+    """
+    Memory allocator backing the allocated memory with a named POSIX shared
+    memory segment (i.e., a file in ``/dev/shm``), so that multiple processes
+    on the same node may share the same data with zero copy. For example, the
+    model parameters may be allocated once, by one process, and then attached
+    to, read-only, by all of the workers running the shots.
+
+    Parameters
+    ----------
+    name : str
+        The name of the segment.
+    mode : str, optional
+        If ``w+`` (default), the segment is created, or overwritten if not in
+        use by any other process. If ``r+`` or ``r``, an existing segment is
+        attached to for reading and writing or for reading only, respectively.
+
+    Notes
+    -----
+    Each process using a segment holds a shared lock on it. When a process
+    releases its memory, or exits, and no other process holds a lock, the
+    segment is removed. The lock is released by the operating system should a
+    process terminate abnormally; a stale segment is then reused by the next
+    ``w+`` allocation. The locks are taken through ``fcntl.flock``, so this
+    allocator is unavailable on platforms lacking ``fcntl`` (e.g., Windows).
+
+    Examples
+    --------
+    The parent process creates the model
+
+    >>> m = Function(name='m', grid=grid, allocator=ALLOC_SHM('m'))  # doctest: +SKIP
+    >>> m.data[:] = 1/vp**2  # doctest: +SKIP
+
+    while the worker processes attach to it
+
+    >>> allocator = ALLOC_SHM('m', mode='r')
+    >>> m = Function(name='m', grid=grid, allocator=allocator)  # doctest: +SKIP
+    """
+
+    is_Shm = True
+
+    shm_dir = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    """The directory of the shared memory segments."""
+
+    @classmethod
+    def initialize(cls):
+        cls.lib = load_libc_mmap() if fcntl is not None else None
+
+    def __init__(self, name, mode='w+'):
+        if fcntl is None:
+            raise RuntimeError("SharedMemoryAllocator requires `fcntl`, which is "
+                               "unavailable on this platform")
+        super(SharedMemoryAllocator, self).__init__(os.path.join(self.shm_dir, name),
+                                                    mode=mode)
+        self._name = name
+        self._fd = None
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def is_scratch(self):
+        return False
+
+    def _open(self, nbytes):
+        if self._mapped:
+            raise RuntimeError("`%s` is already backing a Data" % self._name)
+        if self._mode == 'w+':
+            fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                raise RuntimeError("`%s` is in use by another process" % self._name)
+            os.ftruncate(fd, 0)
+            os.ftruncate(fd, nbytes)
+            fcntl.flock(fd, fcntl.LOCK_SH)
+            prot = mmap.PROT_READ | mmap.PROT_WRITE
+        else:
+            fd, prot = super(SharedMemoryAllocator, self)._open(nbytes)
+            fcntl.flock(fd, fcntl.LOCK_SH)
+            if os.fstat(fd).st_nlink == 0:
+                # Removed while we were attaching to it
+                os.close(fd)
+                raise ValueError("`%s` does not exist anymore" % self._name)
+        self._fd = fd
+        # Don't leave the segment behind, should the process exit first
+        atexit.register(self._release)
+        return fd, prot
+
+    def _close(self, fd):
+        # The file descriptor carries the lock, hence it's retained
+        return
+
+    def _release(self):
+        if self._fd is None:
+            return
+        fd, self._fd = self._fd, None
+        atexit.unregister(self._release)
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        try:
+            # Succeeds only if no other process is using the segment
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            if os.fstat(fd).st_nlink > 0:
+                os.unlink(self._path)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+
 ALLOC_GUARD = GuardAllocator(1048576)
 ALLOC_FLAT = PosixAllocator()
 ALLOC_KNL_DRAM = NumaAllocator(0)
 ALLOC_KNL_MCDRAM = NumaAllocator(1)
 ALLOC_NUMA_ANY = NumaAllocator('any')
 ALLOC_NUMA_LOCAL = NumaAllocator('local')
+ALLOC_HUGEPAGES = HugePagesAllocator()
+ALLOC_HUGEPAGES_NUMA_LOCAL = HugePagesAllocator('local')
+ALLOC_POOL = PoolAllocator()
+ALLOC_MMAP = MmapAllocator
+ALLOC_SHM = SharedMemoryAllocator
+
+# Overrides the default allocator selection (see `default_allocator`)
+configuration.add('allocator', 'auto', ['auto', 'hugepages', 'pool'], impacts_jit=False)
 
 
 def default_allocator():
@@ -321,9 +894,19 @@ def default_allocator():
         * ALLOC_KNL_MCDRAM: On a Knights Landing platform, allocate memory in MCDRAM.
                             Falls back to DRAM if there isn't enough space.
         * ALLOC_KNL_DRAM: On a Knights Landing platform, allocate memory in DRAM.
+        * ALLOC_HUGEPAGES: Allocate memory backed by huge pages.
+        * ALLOC_HUGEPAGES_NUMA_LOCAL: Allocate memory backed by huge pages in
+                                      the "closest" NUMA node.
+        * ALLOC_POOL: Recycle the freed memory, obtained through the allocator
+                      that would be chosen in the absence of pooling.
 
     The default allocator is chosen based on the following algorithm: ::
 
+        * If pooling was requested (env var DEVITO_ALLOCATOR=pool), return
+          ALLOC_POOL;
+        * If huge pages were requested (env var DEVITO_ALLOCATOR=hugepages),
+          return ALLOC_HUGEPAGES_NUMA_LOCAL if ``libnuma`` is available,
+          ALLOC_HUGEPAGES otherwise;
         * If running in DEVELOP mode (env var DEVITO_DEVELOP), return ALLOC_FLAT;
         * If ``libnuma`` is not available on the system, return ALLOC_FLAT (though
           it typically is available, at least on relatively recent Linux distributions);
@@ -332,7 +915,18 @@ def default_allocator():
         * If on a multi-socket Intel Xeon platform, return ALLOC_NUMA_LOCAL;
         * In all other cases, return ALLOC_FLAT.
     """
-    if configuration['develop-mode']:
+    if configuration['allocator'] == 'pool':
+        return ALLOC_POOL
+    return _default_allocator()
+
+
+def _default_allocator():
+    if configuration['allocator'] == 'hugepages':
+        if NumaAllocator.available():
+            return ALLOC_HUGEPAGES_NUMA_LOCAL
+        else:
+            return ALLOC_HUGEPAGES
+    elif configuration['develop-mode']:
         return ALLOC_GUARD
     elif NumaAllocator.available():
         if configuration['platform'] == 'knl':
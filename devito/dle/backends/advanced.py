@@ -3,17 +3,21 @@ from itertools import combinations
 
 import cgen
 import numpy as np
+from sympy import Max, Min
 
 from devito.cgen_utils import ccode
-from devito.dle import BlockDimension, fold_blockable_tree, unfold_blocked_tree
+from devito.dle import (BlockDimension, TileDimension, fold_blockable_tree,
+                        unfold_blocked_tree)
 from devito.dle.backends import (BasicRewriter, Ompizer, dle_pass, simdinfo,
                                  get_simd_flag, get_simd_items)
 from devito.exceptions import DLEException
-from devito.ir.iet import (Expression, Iteration, List, PARALLEL, ELEMENTAL,
-                           REMAINDER, tagger, FindSymbols, FindNodes, Transformer,
-                           IsPerfectIteration, compose_nodes, retrieve_iteration_tree)
+from devito.ir.iet import (Call, Expression, Iteration, List, PARALLEL, SEQUENTIAL,
+                           ELEMENTAL, REMAINDER, tagger, FindSymbols, FindNodes,
+                           Transformer, IsPerfectIteration, compose_nodes,
+                           retrieve_iteration_tree)
+from devito.ir.support import Forward, Scope
 from devito.logger import perf_adv
-from devito.tools import as_tuple
+from devito.tools import as_tuple, is_integer
 
 
 class AdvancedRewriter(BasicRewriter):
@@ -22,6 +26,8 @@ class AdvancedRewriter(BasicRewriter):
 
     def _pipeline(self, state):
         self._avoid_denormals(state)
+        if self.params.get('blocktime') is True:
+            self._loop_temporal_blocking(state)
         self._loop_blocking(state)
         self._simdize(state)
         if self.params['openmp'] is True:
@@ -64,6 +70,9 @@ class AdvancedRewriter(BasicRewriter):
             if not IsPerfectIteration().visit(root):
                 # Illegal/unsupported
                 continue
+            if any(isinstance(i.dim, BlockDimension) for i in tree):
+                # Already tiled (e.g., through temporal blocking)
+                continue
             if not tree.root.is_Sequential and not ignore_heuristic:
                 # Heuristic: avoid polluting the generated code with blocked
                 # nests (thus increasing JIT compilation time and affecting
@@ -84,9 +93,9 @@ class AdvancedRewriter(BasicRewriter):
                 name = "%s%d_block" % (i.dim.name, len(mapper))
                 dim = blocked.setdefault(i, BlockDimension(i.dim, name=name))
                 binnersize = i.symbolic_size + (i.offsets[1] - i.offsets[0])
-                bmax = i.dim.symbolic_max - (binnersize % dim.step)
-                inter_block = Iteration([], dim, bmax, offsets=i.offsets,
-                                        properties=PARALLEL)
+                bmax = i.symbolic_max - (binnersize % dim.step)
+                inter_block = Iteration([], dim, (i.symbolic_min, bmax, dim.step),
+                                        offsets=i.offsets, properties=PARALLEL)
                 inter_blocks.append(inter_block)
 
                 # Build Iteration within a block
@@ -98,7 +107,7 @@ class AdvancedRewriter(BasicRewriter):
                 # Build unitary-increment Iteration over the 'leftover' region.
                 # This will be used for remainder loops, executed when any
                 # dimension size is not a multiple of the block size.
-                remainder = i._rebuild([], limits=[bmax + 1, i.dim.symbolic_max, 1],
+                remainder = i._rebuild([], limits=[bmax + 1, i.symbolic_max, 1],
                                        offsets=(i.offsets[1], i.offsets[1]))
                 remainders.append(remainder)
 
@@ -132,6 +141,96 @@ class AdvancedRewriter(BasicRewriter):
 
         return processed, {'dimensions': list(blocked.values())}
 
+    @dle_pass
+    def _loop_temporal_blocking(self, nodes, state):
+        """
+        Apply temporal blocking, through skewed (wavefront) tiles, to the
+        time-marching Iterations enclosing a single PARALLEL Iteration tree.
+
+        Several timesteps are computed over a tile before moving on to the
+        next one. At each timestep within a tile, the tile is shifted back by
+        the largest distance of the dependences across timesteps, so that all
+        of the values it reads have already been computed by the previous
+        tiles or timesteps. The tile sizes are runtime arguments.
+        """
+        exclude_innermost = not self.params.get('blockinner', False)
+
+        mapper = {}
+        tiled = []
+        for i in FindNodes(Iteration).visit(nodes):
+            if not (i.dim.is_Time and i.is_Sequential and i.direction is Forward):
+                continue
+            if FindNodes(Call).visit(i):
+                # E.g., halo exchanges, which must occur in between timesteps
+                continue
+            # Is the time loop tileable ?
+            trees = retrieve_iteration_tree(i)
+            if len(trees) != 1:
+                continue
+            iterations = trees[0][trees[0].index(i) + 1:]
+            if not iterations or any(not j.is_Parallel for j in iterations):
+                continue
+            if not IsPerfectIteration().visit(iterations[0]):
+                continue
+            exprs = FindNodes(Expression).visit(i)
+            if len(exprs) != len(FindNodes(Expression).visit(iterations[0])):
+                continue
+            skewed = [j for j in iterations if j.dim.is_Space]
+            if exclude_innermost:
+                skewed = [j for j in skewed if not j.is_Vectorizable]
+            if not skewed:
+                continue
+
+            # The skewing factor along each tiled Dimension is the largest
+            # distance of the dependences across timesteps
+            radius = OrderedDict([(j.dim, 0) for j in skewed])
+            for d in Scope([e.expr for e in exprs]).d_all:
+                if not d.function.is_Tensor:
+                    continue
+                distances = [d.distance_mapper.get(j, d.distance_mapper.get(j.root))
+                             for j in radius]
+                if not all(is_integer(j) for j in distances):
+                    # Unknown (e.g., indirect) access
+                    break
+                if any(v != 0 for k, v in d.distance_mapper.items() if k.is_Time):
+                    for j, v in zip(radius, distances):
+                        radius[j] = max(radius[j], abs(v))
+                elif any(distances):
+                    # A dependence within the same timestep across tiles
+                    break
+            else:
+                # Build the Iterations over the tiles
+                name = "%s%d_tblock" % (i.dim.name, len(mapper))
+                tdim = TileDimension(i.dim, name=name)
+                tiles = [Iteration([], tdim, (i.symbolic_min, i.symbolic_max, tdim.step),
+                                   properties=SEQUENTIAL)]
+                subs = {}
+                for j, r in radius.items():
+                    name = "%s%d_tblock" % (j.name, len(mapper))
+                    dim = TileDimension(j, name=name)
+                    tiles.append(Iteration([], dim, (j.symbolic_min,
+                                                     j.symbolic_max + r*(tdim.step - 1),
+                                                     dim.step), properties=SEQUENTIAL))
+
+                    # Within a tile, shift back by `r` points at each timestep
+                    iteration = iterations[[k.dim for k in iterations].index(j)]
+                    start = dim - r*(i.dim - tdim)
+                    limits = (Max(iteration.symbolic_min, start),
+                              Min(iteration.symbolic_max, start + dim.step - 1), 1)
+                    subs[iteration] = iteration._rebuild(limits=limits, offsets=(0, 0))
+                tiled.extend(k.dim for k in tiles)
+
+                # Build the time Iteration within a tile
+                limits = (tdim, Min(tdim + tdim.step - 1, i.symbolic_max), 1)
+                body = Transformer(subs, nested=True).visit(i.nodes)
+                intra_tile = i._rebuild(body, limits=limits, offsets=(0, 0))
+
+                mapper[i] = compose_nodes(tiles + [intra_tile])
+
+        processed = Transformer(mapper).visit(nodes)
+
+        return processed, {'dimensions': tiled}
+
     @dle_pass
     def _simdize(self, nodes, state):
         """
@@ -249,6 +348,8 @@ class AdvancedRewriterSafeMath(AdvancedRewriter):
     """
 
     def _pipeline(self, state):
+        if self.params.get('blocktime') is True:
+            self._loop_temporal_blocking(state)
         self._loop_blocking(state)
         self._simdize(state)
         if self.params['openmp'] is True:
@@ -262,6 +363,8 @@ class SpeculativeRewriter(AdvancedRewriter):
     def _pipeline(self, state):
         self._avoid_denormals(state)
         self._loop_wrapping(state)
+        if self.params.get('blocktime') is True:
+            self._loop_temporal_blocking(state)
         self._loop_blocking(state)
         self._simdize(state)
         if self.params['openmp'] is True:
@@ -304,6 +407,7 @@ class CustomRewriter(SpeculativeRewriter):
         'denormals': SpeculativeRewriter._avoid_denormals,
         'wrapping': SpeculativeRewriter._loop_wrapping,
         'blocking': SpeculativeRewriter._loop_blocking,
+        'tblocking': SpeculativeRewriter._loop_temporal_blocking,
         'openmp': SpeculativeRewriter._parallelize,
         'simd': SpeculativeRewriter._simdize,
         'split': SpeculativeRewriter._create_efuncs
@@ -3,6 +3,7 @@ from collections import OrderedDict
 from time import time
 
 from devito.logger import dle
+from devito.profiling import PeakMemory, record_compile_stage
 
 
 __all__ = ['AbstractRewriter', 'State', 'dle_pass']
@@ -12,15 +13,17 @@ def dle_pass(func):
 
     def wrapper(self, state, **kwargs):
         tic = time()
-        # Processing
-        processed, extra = func(self, state.nodes, state)
-        for i, nodes in enumerate(list(state.efuncs)):
-            state.efuncs[i], _ = func(self, nodes, state)
-        # State update
-        state.update(processed, **extra)
+        with PeakMemory() as memory:
+            # Processing
+            processed, extra = func(self, state.nodes, state)
+            for i, nodes in enumerate(list(state.efuncs)):
+                state.efuncs[i], _ = func(self, nodes, state)
+            # State update
+            state.update(processed, **extra)
         toc = time()
 
         self.timings[func.__name__] = toc - tic
+        record_compile_stage('dle.%s' % func.__name__.lstrip('_'), toc - tic, memory.peak)
 
     return wrapper
 
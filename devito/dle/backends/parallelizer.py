@@ -3,13 +3,20 @@ from collections import OrderedDict
 import numpy as np
 import cgen as c
 import psutil
+import sympy
 
+from devito.cgen_utils import ccode
+from devito.data import FULL
 from devito.ir.equations import DummyEq
 from devito.ir.iet import (FindSymbols, FindNodes, Transformer, Block, Expression,
-                           LocalExpression, List, Iteration, retrieve_iteration_tree,
-                           filter_iterations, IsPerfectIteration, COLLAPSED)
+                           LocalExpression, List, Iteration, Conditional,
+                           retrieve_iteration_tree, filter_iterations, IsPerfectIteration,
+                           COLLAPSED, PARALLEL, SEQUENTIAL)
 from devito.parameters import configuration
-from devito.types import Constant, Symbol
+from devito.tools import filter_ordered
+from devito.types import Constant, Dimension, Symbol
+from devito.types.dense import SubFunction
+from devito.types.sparse import AbstractSparseFunction, ColouringFunction
 
 
 def ncores():
@@ -32,8 +39,20 @@ class Ompizer(object):
     """Use a collapse clause if the number of available physical cores is
     greater than this threshold."""
 
+    REDUCTION = 2**17
+    """Privatize an array section, for a reduction, only if it does not exceed
+    this number of bytes. The thread-private copies typically live on the threads'
+    stacks, which are rather small by default; larger sections are instead
+    incremented through ``omp atomic`` pragmas."""
+
+    COLOURING = 512
+    """Inject sparse points colour by colour, rather than through ``omp atomic``
+    updates, if the number of sparse points is at least this threshold."""
+
     lang = {
         'for': lambda i: c.Pragma('omp for collapse(%d) schedule(static)' % i),
+        'for-reduction': lambda i, j: c.Pragma('omp for collapse(%d) schedule(static) '
+                                               'reduction(+:%s)' % (i, j)),
         'par-region': lambda i: c.Pragma('omp parallel num_threads(nt) %s' % i),
         'simd-for': c.Pragma('omp simd'),
         'simd-for-aligned': lambda i, j: c.Pragma('omp simd aligned(%s:%d)' % (i, j)),
@@ -62,6 +81,112 @@ class Ompizer(object):
         else:
             return nparallel
 
+    def _make_reductions(self, root, collapsed):
+        """
+        Split the increments within ``root`` into reductions, that is those
+        whose target is invariant w.r.t. the ``collapsed`` Iterations, and
+        those that must be performed atomically.
+
+        Returns
+        -------
+        reductions : list of str
+            The array sections to be reduced, in OpenMP syntax.
+        atomics : list of Expression
+            The increments requiring an ``omp atomic`` pragma.
+        """
+        collapsed = set().union(*[i.dim._defines for i in collapsed])
+        inner = set().union(*[i.dim._defines for i in FindNodes(Iteration).visit(root)])
+        inner -= collapsed
+
+        sections = OrderedDict()
+        atomics = []
+        for e in FindNodes(Expression).visit(root):
+            if not e.is_Increment:
+                continue
+            lhs = e.expr.lhs
+            if not lhs.is_Indexed or any(i.free_symbols & collapsed for i in lhs.indices):
+                # E.g., an injection, with different threads hitting the same
+                # grid point
+                atomics.append(e)
+                continue
+            f = lhs.function
+            full = [(0, None if f.is_Array else f._C_get_field(FULL, d).size)
+                    for d in f.dimensions]
+            privatized = [bool(i.free_symbols & inner) for i in lhs.indices]
+            if privatized != sorted(privatized):
+                # E.g., `x[j, 1]`, with `j` an inner Dimension -- the section
+                # would not be contiguous, so the whole array gets privatized
+                privatized = [True]*len(privatized)
+            # The whole extent of the privatized Dimensions, which must trail the
+            # others, as OpenMP array sections are contiguous
+            section = [j if p else (i, 1)
+                       for i, j, p in zip(lhs.indices, full, privatized)]
+            if f.is_Array:
+                nbytes = None
+            else:
+                shape = [i for i, p in zip(f.shape_allocated, privatized) if p]
+                nbytes = np.dtype(f.dtype).itemsize*int(np.prod(shape))
+            sections.setdefault(f, []).append((e, tuple(section), nbytes))
+
+        # An object also incremented atomically can't be privatized, or else the
+        # atomic increments would write through the thread-private copy
+        unsafe = {e.expr.lhs.function for e in atomics if e.expr.lhs.is_Indexed}
+
+        reductions = []
+        for f, v in sections.items():
+            handle = filter_ordered(i for _, i, _ in v)
+            nbytes = v[0][2]
+            if f in unsafe or len(handle) > 1 or nbytes is None or\
+                    nbytes > self.REDUCTION:
+                # Multiple (possibly overlapping) sections of the same object
+                # cannot be reduced, nor can locally allocated arrays be sized,
+                # nor should too large sections be privatized
+                atomics.extend(e for e, _, _ in v)
+            else:
+                reductions.append('%s%s' % (f.name, ''.join('[%s:%s]' % (ccode(i),
+                                                                         ccode(j))
+                                                            for i, j in handle[0])))
+
+        return reductions, atomics
+
+    def _make_colouring(self, root, parallel):
+        """
+        Turn ``root``, an injection of sparse points into a grid, into a sequence
+        of parallel loops, one per colour, such that the sparse points of a given
+        colour never increment the same grid point. This way, the ``omp atomic``
+        pragmas can be dropped, at the price of a barrier per colour. Return None
+        if ``root`` doesn't iterate over the sparse points of exactly one
+        colourable AbstractSparseFunction, or if there are too few of them.
+        """
+        sparse = filter_ordered(i.parent if isinstance(i, SubFunction) else i
+                                for i in FindSymbols().visit(root))
+        sparse = [i for i in sparse if isinstance(i, AbstractSparseFunction)
+                  and i._sparse_dim is root.dim and i._colouring_extent]
+        if len(sparse) != 1 or sparse[0].npoint < self.COLOURING:
+            return None
+        f = sparse[0]
+
+        points, offsets = f._colouring
+        colour = offsets.indices[0]
+        point = Dimension(name='k_%s' % f.name)
+        lb, ub = [Symbol(name='%s_%s' % (colour.name, i), dtype=np.int32)
+                  for i in ['lb', 'ub']]
+
+        # The sparse points of the current colour; the iteration bounds of
+        # `root`, which may have been overridden at runtime, are still honoured
+        body = [LocalExpression(DummyEq(root.dim, points[point])),
+                Conditional(sympy.And(root.dim >= root.symbolic_min,
+                                      root.dim <= root.symbolic_max), root.nodes)]
+        inner = Iteration(body, point, (lb, ub, 1), pragmas=parallel,
+                          properties=(PARALLEL, COLLAPSED(1)))
+
+        # The sequential loop over the colours
+        body = [LocalExpression(DummyEq(lb, offsets[colour])),
+                LocalExpression(DummyEq(ub, offsets[colour + 1] - 1)),
+                inner]
+        return Iteration(body, colour, (colour.symbolic_min, colour.symbolic_max - 1, 1),
+                         properties=SEQUENTIAL)
+
     def _make_parallel_tree(self, root, candidates):
         """Return a mapper to parallelize the Iterations within ``root``."""
         ncollapse = self._ncollapse(root, candidates)
@@ -73,10 +198,23 @@ class Ompizer(object):
         # Introduce the `omp for` pragma
         mapper = OrderedDict()
         if root.is_ParallelAtomic:
+            # Increments into the same location(s) across all threads become
+            # reductions over thread-private copies, rather than serializing
+            # on `omp atomic` pragmas
+            reductions, atomics = self._make_reductions(root, candidates[:ncollapse])
+            if reductions:
+                parallel = self.lang['for-reduction'](ncollapse, ','.join(reductions))
+                pragmas = root.pragmas + (parallel,)
+
+            # Atomic-free injection of large sets of sparse points
+            if atomics and ncollapse == 1:
+                coloured = self._make_colouring(root, parallel)
+                if coloured is not None:
+                    mapper[root] = coloured
+                    return mapper
+
             # Introduce the `omp atomic` pragmas
-            exprs = FindNodes(Expression).visit(root)
-            subs = {i: List(header=self.lang['atomic'], body=i)
-                    for i in exprs if i.is_Increment}
+            subs = {i: List(header=self.lang['atomic'], body=i) for i in atomics}
             handle = Transformer(subs).visit(root)
             mapper[root] = handle._rebuild(pragmas=pragmas, properties=properties)
         else:
@@ -131,6 +269,9 @@ class Ompizer(object):
         if mapper:
             nt = NThreads()
             eq = LocalExpression(DummyEq(Symbol(name='nt', dtype=np.int32), nt))
-            return List(body=[eq, processed]), {'input': [nt]}
+            # The colourings of the sparse points are also Operator parameters
+            colourings = [i for i in FindSymbols().visit(processed)
+                          if isinstance(i, ColouringFunction)]
+            return List(body=[eq, processed]), {'input': [nt] + colourings}
         else:
             return List(body=processed), {}
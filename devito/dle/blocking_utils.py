@@ -7,7 +7,8 @@ from devito.symbolics import as_symbol, xreplace_indices
 from devito.tools import as_tuple, flatten
 from devito.types import IncrDimension
 
-__all__ = ['BlockDimension', 'fold_blockable_tree', 'unfold_blocked_tree']
+__all__ = ['BlockDimension', 'TileDimension', 'fold_blockable_tree',
+           'unfold_blocked_tree']
 
 
 def fold_blockable_tree(node, exclude_innermost=False):
@@ -290,3 +291,17 @@ class BlockDimension(IncrDimension):
             else:
                 # Avoid OOB
                 return {self.step.name: 1}
+
+
+class TileDimension(BlockDimension):
+
+    """
+    A BlockDimension over the tiles of a temporally blocked Iteration nest.
+    The tile size along the time Dimension is the number of timesteps computed
+    within a tile.
+    """
+
+    def _arg_defaults(self, **kwargs):
+        # A few timesteps per tile, and tiles wide enough that the skewing
+        # doesn't eat up most of the data reuse
+        return {self.step.name: 4 if self.root.is_Time else 32}
@@ -18,7 +18,8 @@ This dictionary may be modified at backend-initialization time."""
 
 default_options = {
     'blockinner': False,
-    'blockalways': False
+    'blockalways': False,
+    'blocktime': False
 }
 """Default values for the supported optimization options.
 This dictionary may be modified at backend-initialization time."""
@@ -62,6 +63,10 @@ def transform(iet, mode='basic', options=None):
         - ``blockalways``: Pass True to unconditionally apply loop blocking, even when
                            the compiler heuristically thinks that it might not be
                            profitable and/or dangerous for performance.
+        - ``blocktime``: Pass True to block time-marching loops across the time
+                         Dimension too (skewed wavefront tiling), so that several
+                         timesteps are computed over a tile before moving on to
+                         the next one.
     """
     assert isinstance(iet, Node)
 
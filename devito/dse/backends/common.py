@@ -5,6 +5,7 @@ from time import time
 from devito.symbolics import estimate_cost, freeze, pow_to_mul
 
 from devito.logger import dse
+from devito.profiling import PeakMemory, record_compile_stage
 from devito.tools import flatten, generator
 
 __all__ = ['AbstractRewriter', 'State', 'dse_pass']
@@ -13,10 +14,20 @@ __all__ = ['AbstractRewriter', 'State', 'dse_pass']
 def dse_pass(func):
 
     def wrapper(self, state, **kwargs):
+        counts = OrderedDict()
+        counts['exprs-before'] = sum(len(c.exprs) for c in state.clusters)
+        if self.profile:
+            if state.ops:
+                counts['ops-before'] = list(state.ops.values())[-1]
+            else:
+                candidates = [c.exprs for c in state.clusters if c.is_dense]
+                counts['ops-before'] = estimate_cost(flatten(candidates))
+
         # Invoke the DSE pass on each Cluster
         tic = time()
-        state.update(flatten([func(self, c, state.template, **kwargs)
-                              for c in state.clusters]))
+        with PeakMemory() as memory:
+            state.update(flatten([func(self, c, state.template, **kwargs)
+                                  for c in state.clusters]))
         toc = time()
 
         # Profiling
@@ -25,6 +36,10 @@ def dse_pass(func):
         if self.profile:
             candidates = [c.exprs for c in state.clusters if c.is_dense]
             state.ops[key] = estimate_cost(flatten(candidates))
+            counts['ops-after'] = state.ops[key]
+        counts['exprs-after'] = sum(len(c.exprs) for c in state.clusters)
+        record_compile_stage('dse.%s' % func.__name__.lstrip('_'), toc - tic, memory.peak,
+                             **counts)
 
     return wrapper
 
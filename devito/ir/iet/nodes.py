@@ -797,6 +797,10 @@ class HaloSpot(List):
     def mask(self):
         return self.halo_scheme.mask
 
+    @property
+    def amounts(self):
+        return self.halo_scheme.amounts
+
     @property
     def is_Redundant(self):
         return REDUNDANT in self.properties
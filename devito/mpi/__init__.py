@@ -1,3 +1,4 @@
 from devito.mpi.distributed import *  # noqa
+from devito.mpi.planner import *  # noqa
 from devito.mpi.routines import *  # noqa
 from devito.mpi.halo_scheme import *  # noqa
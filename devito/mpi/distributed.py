@@ -9,6 +9,8 @@ import numpy as np
 from cgen import Struct, Value
 
 from devito.data import LEFT, CENTER, RIGHT, Decomposition
+from devito.logger import perf
+from devito.mpi.planner import plan_decomposition
 from devito.parameters import configuration
 from devito.tools import EnrichedTuple, as_tuple, ctypes_to_cstr, is_integer
 from devito.types import CompositeObject, Object
@@ -37,6 +39,10 @@ except ImportError:
         def Comm(self):
             return None
 
+        @property
+        def Request(self):
+            return None
+
 
 __all__ = ['Distributor', 'SparseDistributor', 'MPI']
 
@@ -161,9 +167,23 @@ class Distributor(AbstractDistributor):
     comm : MPI communicator, optional
         The set of processes over which the domain is distributed. Defaults to
         MPI.COMM_WORLD.
+    topology : tuple of ints or str, optional
+        The number of processes along each Dimension. If ``'auto'``, the
+        topology minimising the predicted halo traffic is selected (see
+        :func:`plan_decomposition`). Defaults to a topology as close as possible
+        to a hypercube.
+    cost : tuple of array_like or array_like, optional
+        The per-point computational cost, preferably as a tuple of per-Dimension
+        costs, or as an array of shape ``shape`` (see :func:`plan_decomposition`).
+        If supplied, the Dimensions are split non-uniformly so as to balance the
+        cost, rather than the number of points, across the processes.
+    radius : int or tuple of ints, optional
+        The stencil radius along each Dimension, used to predict the halo
+        traffic. Defaults to 1.
     """
 
-    def __init__(self, shape, dimensions, input_comm=None):
+    def __init__(self, shape, dimensions, input_comm=None, topology=None, cost=None,
+                 radius=1):
         super(Distributor, self).__init__(shape, dimensions)
 
         if configuration['mpi']:
@@ -185,11 +205,19 @@ class Distributor(AbstractDistributor):
             # However, `MPI.Compute_dims` is distro-dependent, so we have to enforce
             # some properties through our own wrapper (e.g., OpenMPI v3 does not
             # guarantee that 9 ranks are arranged into a 3x3 grid when shape=(9, 9))
-            topology = compute_dims(self._input_comm.size, len(shape))
-            # At this point MPI's dimension 0 corresponds to the rightmost element
-            # in `topology`. This is in reverse to `shape`'s ordering. Hence, we
-            # now restore consistency
-            self._topology = tuple(reversed(topology))
+            nprocs = self._input_comm.size
+            if topology is None:
+                topology = compute_dims(nprocs, len(shape))
+                # At this point MPI's dimension 0 corresponds to the rightmost
+                # element in `topology`. This is in reverse to `shape`'s ordering.
+                # Hence, we now restore consistency
+                topology = tuple(reversed(topology))
+            elif topology == 'auto':
+                # Let the planner pick the topology minimising the halo traffic
+                topology = None
+            self._plan = plan_decomposition(shape, nprocs, radius=radius, cost=cost,
+                                            topology=topology)
+            self._topology = self._plan.topology
 
             if self._input_comm is not input_comm:
                 # By default, Devito arranges processes into a cartesian topology.
@@ -204,10 +232,15 @@ class Distributor(AbstractDistributor):
             self._input_comm = None
             self._comm = MPI.COMM_NULL
             self._topology = tuple(1 for _ in range(len(shape)))
+            self._plan = plan_decomposition(shape, 1, radius=radius,
+                                            topology=self._topology)
 
         # The domain decomposition
-        self._decomposition = [Decomposition(np.array_split(range(i), j), c)
-                               for i, j, c in zip(shape, self.topology, self.mycoords)]
+        self._decomposition = [Decomposition(i, c)
+                               for i, c in zip(self._plan.ranges, self.mycoords)]
+
+        if self.is_parallel and self.myrank == 0:
+            perf("Domain decomposition: %s" % self._plan)
 
     def __del__(self):
         if self._input_comm is not None:
@@ -242,6 +275,14 @@ class Distributor(AbstractDistributor):
     def topology(self):
         return self._topology
 
+    @property
+    def plan(self):
+        """
+        The DecompositionPlan, which also provides the predicted halo traffic
+        and load imbalance.
+        """
+        return self._plan
+
     @cached_property
     def all_coords(self):
         """
@@ -131,13 +131,23 @@ class HaloScheme(object):
 
     @cached_property
     def mask(self):
+        return {f: HaloMask([(k, bool(v)) for k, v in amounts.items()])
+                for f, amounts in self.amounts.items()}
+
+    @cached_property
+    def amounts(self):
+        """
+        A mapper ``Function -> {(Dimension, DataSide): amount}``, telling how
+        many points of halo must be exchanged along each side of each non-fixed
+        Dimension of a Function. The amount is 0 if no exchange is required.
+        """
         mapper = {}
         for f, v in self.fmapper.items():
-            needed = [(i.dim, i.side) for i in v.halos]
+            needed = {(i.dim, i.side): i.amount for i in v.halos}
             for i in product(f.dimensions, [LEFT, RIGHT]):
                 if i[0] in v.loc_indices:
                     continue
-                mapper.setdefault(f, HaloMask())[i] = i in needed
+                mapper.setdefault(f, OrderedDict())[i] = needed.get(i, 0)
         return mapper
 
 
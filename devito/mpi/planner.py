@@ -0,0 +1,292 @@
+from functools import reduce
+from operator import mul
+
+import numpy as np
+from cached_property import cached_property
+
+from devito.tools import as_tuple
+
+__all__ = ['DecompositionPlan', 'plan_decomposition']
+
+
+class DecompositionPlan(object):
+
+    """
+    A domain decomposition, that is an arrangement of the MPI processes into a
+    cartesian topology, along with the -- possibly non-uniform -- split of each
+    Dimension over the processes.
+
+    Parameters
+    ----------
+    shape : tuple of ints
+        The shape of the decomposed domain.
+    topology : tuple of ints
+        The number of processes along each Dimension.
+    splits : tuple of tuple of ints
+        For each Dimension, the size of the chunks assigned to the processes.
+    radius : int or tuple of ints, optional
+        The stencil radius along each Dimension, that is the width of the halo
+        exchanged between neighbouring processes. Defaults to 1.
+    cost : array_like or tuple of array_like, optional
+        The per-point computational cost, either as an array of shape ``shape``
+        or as a tuple of per-Dimension costs (see :func:`plan_decomposition`).
+        Defaults to a unit cost everywhere.
+    """
+
+    def __init__(self, shape, topology, splits, radius=1, cost=None):
+        self._shape = as_tuple(shape)
+        self._topology = as_tuple(topology)
+        self._splits = tuple(as_tuple(i) for i in splits)
+        self._radius = _normalize_radius(radius, len(self._shape))
+        self._cost = _normalize_cost(cost, self._shape)
+
+        assert len(self._shape) == len(self._topology) == len(self._splits)
+        assert all(len(i) == j for i, j in zip(self._splits, self._topology))
+        assert all(sum(i) == j for i, j in zip(self._splits, self._shape))
+
+    def __repr__(self):
+        return "DecompositionPlan(topology=%s, volume=%d)" % (self.topology,
+                                                              self.volume)
+
+    def __str__(self):
+        return ("topology=%s, splits=%s, halo volume=%d points per exchange "
+                "(%d on the busiest rank), load imbalance=%.2f" %
+                (self.topology, self.splits, self.volume, self.max_volume,
+                 self.imbalance))
+
+    @property
+    def shape(self):
+        return self._shape
+
+    @property
+    def topology(self):
+        return self._topology
+
+    @property
+    def splits(self):
+        return self._splits
+
+    @property
+    def radius(self):
+        return self._radius
+
+    @property
+    def nprocs(self):
+        return reduce(mul, self.topology, 1)
+
+    @cached_property
+    def ranges(self):
+        """For each Dimension, the global indices assigned to each process."""
+        return tuple(tuple(np.split(np.arange(n), np.cumsum(s)[:-1]))
+                     for n, s in zip(self.shape, self.splits))
+
+    @cached_property
+    def volumes(self):
+        """
+        The predicted number of halo points sent by each process at each halo
+        exchange, as an array of shape ``topology``. Only the faces are taken
+        into account, as the edges and corners are comparatively negligible.
+        """
+        ndim = len(self.shape)
+        sizes = [np.array(i).reshape(_axis(d, ndim)) for d, i in enumerate(self.splits)]
+        ret = np.zeros(self.topology, dtype=np.int64)
+        for d, (p, r) in enumerate(zip(self.topology, self.radius)):
+            # Number of neighbours along `d`
+            neighbours = np.full(p, 2)
+            neighbours[0] -= 1
+            neighbours[-1] -= 1
+            term = r*neighbours.reshape(_axis(d, ndim))
+            for e, i in enumerate(sizes):
+                if e != d:
+                    term = term*i
+            ret = ret + term
+        return ret
+
+    @property
+    def volume(self):
+        """The predicted number of halo points exchanged at each halo exchange."""
+        return int(self.volumes.sum())
+
+    @property
+    def max_volume(self):
+        """The largest number of halo points sent by a single process."""
+        return int(self.volumes.max())
+
+    @cached_property
+    def costs(self):
+        """The computational cost of each process, as an array of shape ``topology``."""
+        ndim = len(self.shape)
+        if self._cost is None:
+            ret = np.ones(self.topology)
+            for d, i in enumerate(self.splits):
+                ret = ret*np.array(i).reshape(_axis(d, ndim))
+            return ret
+        elif isinstance(self._cost, tuple):
+            ret = np.ones(self.topology)
+            for d, (c, i) in enumerate(zip(self._cost, self.splits)):
+                c = np.add.reduceat(c, np.concatenate([[0], np.cumsum(i)[:-1]]))
+                ret = ret*c.reshape(_axis(d, ndim))
+            return ret
+        ret = self._cost
+        for d, i in enumerate(self.splits):
+            ret = np.add.reduceat(ret, np.concatenate([[0], np.cumsum(i)[:-1]]), axis=d)
+        return ret
+
+    @property
+    def imbalance(self):
+        """
+        The ratio between the largest and the average computational cost of the
+        processes; 1 means perfect load balance.
+        """
+        costs = self.costs
+        return float(costs.max()/costs.mean())
+
+
+def plan_decomposition(shape, nprocs, radius=1, cost=None, topology=None):
+    """
+    Decompose a domain over a set of MPI processes so that the halo traffic is
+    minimised and, optionally, the computational cost is balanced.
+
+    Parameters
+    ----------
+    shape : tuple of ints
+        The shape of the domain to be decomposed.
+    nprocs : int
+        The number of MPI processes.
+    radius : int or tuple of ints, optional
+        The stencil radius along each Dimension. Defaults to 1.
+    cost : tuple of array_like or array_like, optional
+        The per-point computational cost. If supplied, each Dimension is split
+        so that the processes get, as much as possible, the same cost rather
+        than the same number of points. For example, the points in an absorbing
+        boundary layer may be given a higher cost than those in the physical
+        domain. Preferably a tuple of per-Dimension costs, that is one 1D array
+        of size ``shape[d]`` for each Dimension ``d``; the cost of a point is
+        then the product of the costs of its indices. Each Dimension is split
+        based on its own costs only, so these may also be the marginals of a
+        non-separable cost, i.e. its sums over all of the other Dimensions.
+        Alternatively, an array of shape ``shape``.
+    topology : tuple of ints, optional
+        The number of processes along each Dimension. If not supplied, the
+        topology minimising the predicted halo volume is selected among all
+        possible factorizations of ``nprocs``; ties are broken in favour of
+        the most balanced topology.
+
+    Examples
+    --------
+    An elongated domain is better cut across its longest Dimension:
+
+    >>> plan = plan_decomposition((400, 100), 4)
+    >>> plan.topology
+    (4, 1)
+    >>> plan.volume
+    600
+
+    While a cost makes the split non-uniform:
+
+    >>> cost = ([3, 3, 1, 1, 1, 1, 1, 1], [1, 1, 1, 1])
+    >>> plan_decomposition((8, 4), 2, cost=cost, topology=(2, 1)).splits
+    ((2, 6), (4,))
+    """
+    shape = as_tuple(shape)
+    ndim = len(shape)
+    radius = _normalize_radius(radius, ndim)
+    cost = _normalize_cost(cost, shape)
+
+    if topology is not None:
+        topology = as_tuple(topology)
+        if len(topology) != ndim or reduce(mul, topology, 1) != nprocs:
+            raise ValueError("Illegal topology `%s` for %d processes over a "
+                             "%d-dimensional domain" % (topology, nprocs, ndim))
+        candidates = [topology]
+    else:
+        candidates = [i for i in _factorizations(nprocs, ndim)
+                      if all(p <= n for p, n in zip(i, shape))]
+        if not candidates:
+            raise ValueError("Cannot decompose a domain of shape `%s` over %d "
+                             "processes" % (shape, nprocs))
+
+    plans = [DecompositionPlan(shape, i, _split(shape, i, cost), radius, cost)
+             for i in candidates]
+
+    # Minimise the total halo traffic, then the traffic on the busiest process.
+    # Among equivalent plans, prefer the most "cubic" topology (e.g., 2x2 rather
+    # than 4x1), as in `MPI_Dims_create`
+    key = lambda i: (i.volume, i.max_volume, round(i.imbalance, 6),
+                     sorted(i.topology, reverse=True), i.topology)
+    return min(plans, key=key)
+
+
+def _normalize_radius(radius, ndim):
+    radius = as_tuple(radius)
+    if len(radius) == 1:
+        radius = radius*ndim
+    if len(radius) != ndim:
+        raise ValueError("Expected %d radii, got `%s`" % (ndim, radius))
+    return radius
+
+
+def _normalize_cost(cost, shape):
+    """
+    Turn ``cost`` into either a tuple of 1D arrays, one for each Dimension,
+    or an array of shape ``shape``.
+    """
+    if cost is None:
+        return None
+    if isinstance(cost, tuple):
+        cost = tuple(np.asarray(i, dtype=np.float64) for i in cost)
+        if tuple(i.shape for i in cost) != tuple((n,) for n in shape):
+            raise ValueError("The per-Dimension costs must have sizes `%s` (got `%s`)"
+                             % (shape, tuple(i.shape for i in cost)))
+    else:
+        cost = np.asarray(cost)
+        if cost.shape != shape:
+            raise ValueError("The cost map must have shape `%s` (got `%s`)"
+                             % (shape, cost.shape))
+    if not all(np.all(i > 0) for i in as_tuple(cost)):
+        raise ValueError("The cost must be strictly positive")
+    return cost
+
+
+def _axis(d, ndim):
+    """The shape to broadcast a 1D array along the `d`-th of `ndim` axes."""
+    return tuple(-1 if i == d else 1 for i in range(ndim))
+
+
+def _factorizations(n, ndim):
+    """All ordered ways of writing `n` as a product of `ndim` positive integers."""
+    if ndim == 1:
+        return [(n,)]
+    ret = []
+    for i in range(1, n + 1):
+        if n % i == 0:
+            ret.extend((i,) + j for j in _factorizations(n // i, ndim - 1))
+    return ret
+
+
+def _split(shape, topology, cost=None):
+    """
+    Split each Dimension into as many chunks as processes along it. Without a
+    cost, the chunks differ by at most one point; otherwise, the chunks carry,
+    as much as possible, the same cost.
+    """
+    ret = []
+    for d, (n, p) in enumerate(zip(shape, topology)):
+        if cost is None:
+            ret.append(tuple(len(i) for i in np.array_split(range(n), p)))
+            continue
+        # The cost marginal along `d`
+        if isinstance(cost, tuple):
+            cumcost = np.cumsum(cost[d])
+        else:
+            axes = tuple(i for i in range(len(shape)) if i != d)
+            cumcost = np.cumsum(cost.sum(axis=axes))
+        ends = []
+        for k in range(1, p):
+            end = int(np.argmin(np.abs(cumcost - k*cumcost[-1]/p))) + 1
+            # Each process must get at least one point
+            end = max(end, (ends[-1] if ends else 0) + 1)
+            end = min(end, n - (p - k))
+            ends.append(end)
+        ret.append(tuple(np.diff([0] + ends + [n])))
+    return tuple(tuple(int(i) for i in j) for j in ret)
@@ -1,19 +1,31 @@
 import abc
 from collections import OrderedDict
-from ctypes import c_void_p
+from ctypes import c_int, c_void_p, sizeof
 from functools import reduce
 from itertools import product
 from operator import mul
 
-from sympy import Integer
+import cgen as c
+import numpy as np
+from frozendict import frozendict
+from sympy import Integer, Max, Min, Mod, sympify
 
-from devito.data import OWNED, HALO, NOPAD, LEFT, RIGHT
+from devito.data import OWNED, HALO, NOPAD, LEFT, CENTER, RIGHT
+from devito.cgen_utils import ccode
+from devito.exceptions import InvalidArgument
 from devito.ir.equations import DummyEq
-from devito.ir.iet import (ArrayCast, Call, Callable, Conditional, Expression,
-                           Iteration, List, iet_insert_C_decls, PARALLEL)
-from devito.symbolics import CondNe, FieldFromPointer, Macro
-from devito.tools import dtype_to_mpitype, flatten
-from devito.types import Array, Dimension, Symbol, LocalObject
+from devito.ir.iet import (ArrayCast, Call, Callable, Conditional, Element, Expression,
+                           HaloSpot, Iteration, List, Node, FindNodes, Transformer,
+                           iet_insert_C_decls, retrieve_iteration_tree, PARALLEL)
+from devito.ir.support import Backward
+from devito.mpi.distributed import MPI
+from devito.mpi.halo_scheme import Halo, HaloScheme, HaloSchemeEntry
+from devito.symbolics import (Byref, CondEq, CondNe, FieldFromPointer, Macro,
+                              retrieve_indexed)
+from devito.tools import (as_tuple, dtype_to_cstr, dtype_to_mpitype, filter_ordered,
+                          flatten)
+from devito.types import (Array, CompositeObject, Constant, Dimension, Symbol,
+                          LocalObject)
 
 __all__ = ['HaloExchangeBuilder']
 
@@ -22,15 +34,112 @@ class HaloExchangeBuilder(object):
 
     """
     Build IET-based routines to implement MPI halo exchange.
+
+    Parameters
+    ----------
+    threaded : bool
+        True if the generated code is multi-threaded, False otherwise.
+    mode : str, optional
+        The halo exchange scheme. Accepted: ``basic`` (default), ``full``,
+        ``overlap``, ``persistent``, ``wide``.
     """
 
-    def __new__(cls, threaded):
-        obj = object.__new__(BasicHaloExchangeBuilder)
+    def __new__(cls, threaded, mode='basic'):
+        try:
+            obj = object.__new__(modes[mode])
+        except KeyError:
+            raise ValueError("Unknown halo exchange mode `%s`; accepted: %s"
+                             % (mode, list(modes)))
         obj.__init__(threaded)
         return obj
 
-    def __init__(self, threaded):
+    def __init__(self, threaded, mode=None):
         self._threaded = threaded
+        self._objs = []
+        self._exchanges = []
+
+    @property
+    def objs(self):
+        """
+        The Objects, such as message buffers, required by the Calls produced
+        by ``make``, which must be supplied by the caller at runtime.
+        """
+        return list(self._objs)
+
+    @property
+    def exchanges(self):
+        """
+        The halo exchanges performed by the Calls produced by ``make``. This is
+        a list with one entry for each HaloSpot, that is a list of 3-tuples
+        ``(f, fixed, amounts)``, one for each DiscreteFunction ``f`` exchanged.
+        ``fixed`` are the Dimensions along which ``f`` is accessed at a fixed
+        index, while ``amounts`` tells how many points of halo are exchanged
+        along each ``(dim, side)``.
+        """
+        return list(self._exchanges)
+
+    @classmethod
+    def footprint(cls, exchanges, args):
+        """
+        The size, in bytes, of the message buffers required by the halo
+        exchanges ``exchanges`` (see ``exchanges``) when running with the
+        arguments ``args``.
+
+        Returns
+        -------
+        functions : dict
+            A mapper from DiscreteFunction names to the size of the buffers
+            allocated, at peak, to exchange their halo.
+        total : int
+            The peak size of all of the buffers allocated at the same time.
+        """
+        # By default, the messages are exchanged one at a time, each through a
+        # pair of send/recv buffers freed as soon as the message is delivered
+        functions = OrderedDict()
+        for i in exchanges:
+            for f, nbytes in cls._footprint_msgs(i, args):
+                functions[f.name] = max([functions.get(f.name, 0)] + nbytes)
+        return functions, max(functions.values(), default=0)
+
+    @classmethod
+    def _footprint_msgs(cls, exchanges, args):
+        """
+        The size, in bytes, of the pair of send/recv buffers of each message
+        in a group of halo exchanges taking place at the same HaloSpot.
+        """
+        ret = []
+        for f, fixed, amounts in exchanges:
+            # The amounts may be parametric, e.g. in the `exchange_period`
+            amounts = {k: int(sympify(v).subs({i: args[i.name]
+                                               for i in sympify(v).free_symbols}))
+                       for k, v in amounts.items()}
+            itemsize = np.dtype(f.dtype).itemsize
+            ret.append((f, [2*itemsize*i for i in cls._msg_sizes(f, fixed, amounts)]))
+        return ret
+
+    @classmethod
+    def _msg_sizes(cls, f, fixed, amounts):
+        """
+        The number of points in each message of a halo exchange of ``f``; this
+        mirrors the message shapes produced by ``_make_msgs``.
+        """
+        ret = []
+        for d in f.dimensions:
+            if d in fixed:
+                continue
+            others = [f._size_nopad[i] for i in f.dimensions
+                      if i not in fixed and i is not d]
+            for side in [LEFT, RIGHT]:
+                if amounts[(d, side)]:
+                    ret.append(amounts[(d, side)]*reduce(mul, others, 1))
+        return ret
+
+    def prepare(self, iet):
+        """
+        Transform ``iet`` prior to the construction of the halo exchanges, for
+        example to reshape the HaloSpots. By default, ``iet`` is returned as is.
+        """
+        return iet
 
     @abc.abstractmethod
     def make(self, halo_spots):
@@ -45,10 +154,20 @@ class HaloExchangeBuilder(object):
             * ``copy``, called twice by ``sendrecv``, to implement, for example,
               data gathering prior to an MPI_Send, and data scattering following
               an MPI recv.
+
+        Returns
+        -------
+        callables : list of Callable
+            The Callables implementing the halo exchanges.
+        calls : dict
+            A mapper from HaloSpots to the Calls performing the halo exchanges.
+            The Calls are placed in the IET through ``place``.
         """
         calls = OrderedDict()
         generated = OrderedDict()
         for hs in halo_spots:
+            self._exchanges.append([(f, tuple(v.loc_indices), hs.amounts[f])
+                                    for f, v in hs.fmapper.items()])
             for f, v in hs.fmapper.items():
                 # Sanity check
                 assert f.is_Function
@@ -67,27 +186,116 @@ class HaloExchangeBuilder(object):
                     gather, extra = self._make_copy(df, v.loc_indices)
                     scatter, _ = self._make_copy(df, v.loc_indices, swap=True)
                     sendrecv = self._make_sendrecv(df, v.loc_indices, extra)
-                    generated[f.ndim] = [gather, scatter, sendrecv]
+                    generated[f.ndim] = [gather, scatter] + list(as_tuple(sendrecv))
                 # `haloupdate` is generic by construction -- it only needs to be
-                # generated once for each (`ndim`, `mask`)
+                # generated once for each (`ndim`, `amounts`)
                 if (f.ndim, v) not in generated:
                     uniquekey = len([i for i in generated if isinstance(i, tuple)])
-                    generated[(f.ndim, v)] = [self._make_haloupdate(df, v.loc_indices,
-                                                                    hs.mask[f], extra,
-                                                                    uniquekey)]
+                    haloupdate = self._make_haloupdate(df, v.loc_indices,
+                                                       hs.amounts[f], extra, uniquekey)
+                    generated[(f.ndim, v)] = list(as_tuple(haloupdate))
 
                 # `haloupdate` Call construction
-                comm = f.grid.distributor._obj_comm
-                nb = f.grid.distributor._obj_neighborhood
-                loc_indices = list(v.loc_indices.values())
-                args = [f, comm, nb] + loc_indices + extra
-                call = Call(generated[(f.ndim, v)][0].name, args)
+                call = self._call_haloupdate(generated[(f.ndim, v)], f, hs, extra)
                 calls.setdefault(hs, []).append(call)
 
         return flatten(generated.values()), calls
 
+    def place(self, iet, calls):
+        """
+        Transform ``iet`` by placing the Calls produced by ``make``.
+        """
+        mapper = {k: List(body=v + list(k.body)) for k, v in calls.items()}
+        return Transformer(mapper, nested=True).visit(iet)
+
+    def _call_haloupdate(self, haloupdate, f, hs, extra=None):
+        """
+        Construct the Call(s) to the Callable(s) ``haloupdate``, performing a halo
+        exchange for the DiscreteFunction ``f`` as described by the HaloSpot ``hs``.
+        """
+        extra = extra or []
+        comm = f.grid.distributor._obj_comm
+        nb = f.grid.distributor._obj_neighborhood
+        loc_indices = list(hs.fmapper[f].loc_indices.values())
+        args = [f, comm, nb] + loc_indices + extra
+        return Call(haloupdate[0].name, args)
+
+    def _make_msgs(self, f, fixed, amounts):
+        """
+        Describe the messages required for a halo exchange of ``f``, as a list of
+        6-tuples ``(sides, sizes, ofsg, ofss, fromrank, torank)``. ``sides`` is a
+        tuple of ``(dim, side)`` pairs, telling the direction data is sent to;
+        ``sizes`` the message shape; ``ofsg`` and ``ofss`` the offsets at which
+        data is, respectively, gathered and scattered; ``fromrank`` and ``torank``
+        the peers.
+
+        ``amounts`` tells how many points of halo are needed along each
+        ``(dim, side)``; the messages are trimmed accordingly, and no message
+        is built for the sides requiring no halo.
+
+        The messages along different Dimensions must be exchanged one after the
+        other, as the corners propagate through successive rounds.
+        """
+        distributor = f.grid.distributor
+        nb = distributor._obj_neighborhood
+
+        opposite = {LEFT: RIGHT, RIGHT: LEFT}
+
+        msgs = []
+        for d in f.dimensions:
+            if d in fixed:
+                continue
+
+            name = ''.join('r' if i is d else 'c' for i in distributor.dimensions)
+            rpeer = FieldFromPointer(name, nb)
+            name = ''.join('l' if i is d else 'c' for i in distributor.dimensions)
+            lpeer = FieldFromPointer(name, nb)
+
+            for side, fromrank, torank in [(LEFT, rpeer, lpeer), (RIGHT, lpeer, rpeer)]:
+                # Sending to `side` fills the opposite halo of the peer
+                amount = amounts[(d, opposite[side])]
+                if not amount:
+                    continue
+
+                sizes = []
+                ofsg = []
+                ofss = []
+                for d1 in f.dimensions:
+                    if d1 in fixed:
+                        ofsg.append(fixed[d1])
+                        ofss.append(fixed[d1])
+                    elif d1 is d:
+                        ofs0, ofs1 = self._make_ofs(f, d, side, amount)
+                        sizes.append(amount)
+                        ofsg.append(ofs0)
+                        ofss.append(ofs1)
+                    else:
+                        meta = f._C_get_field(NOPAD, d1)
+                        sizes.append(meta.size)
+                        ofsg.append(meta.offset)
+                        ofss.append(meta.offset)
+                msgs.append((((d, side),), sizes, ofsg, ofss, fromrank, torank))
+
+        return msgs
+
+    def _make_ofs(self, f, d, side, amount):
+        """
+        The offsets along ``d`` at which ``amount`` points are gathered from the
+        OWNED region on ``side`` and scattered into the HALO region on the
+        opposite side. Only the points adjacent to the DOMAIN region are
+        exchanged.
+        """
+        owned = f._C_get_field(OWNED, d, side)
+        if side is LEFT:
+            halo = f._C_get_field(HALO, d, RIGHT)
+            return owned.offset, halo.offset
+        else:
+            halo = f._C_get_field(HALO, d, LEFT)
+            return (owned.offset + owned.size - amount,
+                    halo.offset + halo.size - amount)
+
     @abc.abstractmethod
-    def _make_haloupdate(self, f, fixed, halos, **kwargs):
+    def _make_haloupdate(self, f, fixed, amounts, **kwargs):
         """
         Construct a Callable performing, for a given DiscreteFunction, a halo exchange.
         """
@@ -200,7 +408,7 @@ class BasicHaloExchangeBuilder(HaloExchangeBuilder):
                       [fromrank, torank, comm] + extra)
         return Callable('sendrecv%dd' % f.ndim, iet, 'void', parameters, ('static',))
 
-    def _make_haloupdate(self, f, fixed, mask, extra=None, uniquekey=None):
+    def _make_haloupdate(self, f, fixed, amounts, extra=None, uniquekey=None):
         extra = extra or []
         distributor = f.grid.distributor
         nb = distributor._obj_neighborhood
@@ -208,54 +416,758 @@ class BasicHaloExchangeBuilder(HaloExchangeBuilder):
 
         fixed = {d: Symbol(name="o%s" % d.root) for d in fixed}
 
-        # Build a mapper `(dim, side, region) -> (size, ofs)` for `f`. `size` and
-        # `ofs` are symbolic objects. This mapper tells what data values should be
-        # sent (OWNED) or received (HALO) given dimension and side
-        mapper = {}
-        for d0, side, region in product(f.dimensions, (LEFT, RIGHT), (OWNED, HALO)):
-            if d0 in fixed:
+        body = []
+        for _, sizes, ofsg, ofss, fromrank, torank in self._make_msgs(f, fixed, amounts):
+            args = [f] + sizes + ofsg + ofss + [fromrank, torank, comm] + extra
+            body.append(Call('sendrecv%dd' % f.ndim, args))
+
+        if uniquekey is None:
+            uniquekey = ''.join(str(i) for i in amounts.values())
+        name = 'haloupdate%dd%s' % (f.ndim, uniquekey)
+        iet = List(body=body)
+        parameters = [f, comm, nb] + list(fixed.values()) + extra
+        return Callable(name, iet, 'void', parameters, ('static',))
+
+
+class FullHaloExchangeBuilder(BasicHaloExchangeBuilder):
+
+    """
+    Build routines for MPI halo exchanges completing in a single communication
+    round.
+
+    Rather than exchanging the halo one Dimension at a time, so that the corners
+    propagate through successive rounds, the messages to and from all of the
+    neighbours -- including the diagonal ones, that is 26 in 3D -- are posted at
+    once, by ``halostart``, and then completed, by ``halowait``. The state of the
+    in-flight messages is carried by MPIMsg objects, provided at runtime.
+    """
+
+    @classmethod
+    def footprint(cls, exchanges, args):
+        # All of the messages of a HaloSpot are in flight at the same time
+        functions = OrderedDict()
+        total = 0
+        for i in exchanges:
+            msgs = cls._footprint_msgs(i, args)
+            for f, nbytes in msgs:
+                functions[f.name] = max(functions.get(f.name, 0), sum(nbytes))
+            total = max(total, sum(sum(nbytes) for _, nbytes in msgs))
+        return functions, total
+
+    @classmethod
+    def _msg_sizes(cls, f, fixed, amounts):
+        opposite = {LEFT: RIGHT, CENTER: CENTER, RIGHT: LEFT}
+        dims = [d for d in f.dimensions if d not in fixed]
+
+        ret = []
+        for sides in product([LEFT, CENTER, RIGHT], repeat=len(dims)):
+            if all(i is CENTER for i in sides) or\
+                    any(not amounts[(d, opposite[i])] for d, i in zip(dims, sides)
+                        if i is not CENTER):
                 continue
+            sizes = [f._size_domain[d] if i is CENTER else amounts[(d, opposite[i])]
+                     for d, i in zip(dims, sides)]
+            ret.append(reduce(mul, sizes, 1))
+        return ret
+
+    def _call_haloupdate(self, haloupdate, f, hs, extra=None):
+        extra = extra or []
+        halostart, halowait = haloupdate
+        comm = f.grid.distributor._obj_comm
+        nb = f.grid.distributor._obj_neighborhood
+        loc_indices = list(hs.fmapper[f].loc_indices.values())
+
+        # One `struct msg` for each message in flight
+        msgs = []
+        for i in halostart.parameters:
+            if isinstance(i, MPIMsg):
+                msgs.append(MPIMsg(name='msg%d' % len(self._objs)))
+                self._objs.append(msgs[-1])
+
+        start = Call(halostart.name, [f, comm, nb] + loc_indices + msgs + extra)
+        wait = Call(halowait.name, [f, nb] + loc_indices + msgs + extra)
+        return start, wait
+
+    def place(self, iet, calls):
+        # First all messages are posted, then all of them are completed
+        calls = {hs: [i for i, _ in v] + [i for _, i in v] for hs, v in calls.items()}
+        return super(FullHaloExchangeBuilder, self).place(iet, calls)
+
+    def _make_msgs(self, f, fixed, amounts):
+        distributor = f.grid.distributor
+        nb = distributor._obj_neighborhood
+        dims = [d for d in f.dimensions if d not in fixed]
+
+        opposite = {LEFT: RIGHT, CENTER: CENTER, RIGHT: LEFT}
+        names = {LEFT: 'l', CENTER: 'c', RIGHT: 'r'}
+
+        msgs = []
+        for sides in product([LEFT, CENTER, RIGHT], repeat=len(dims)):
+            sides = OrderedDict(zip(dims, sides))
+            # Only the (dim, side) pairs requiring a halo exchange; sending to
+            # `side` fills the opposite halo of the peer
+            if all(i is CENTER for i in sides.values()) or\
+                    any(not amounts[(d, opposite[i])] for d, i in sides.items()
+                        if i is not CENTER):
+                continue
+
             sizes = []
-            offsets = []
-            for d1 in f.dimensions:
-                if d1 in fixed:
-                    offsets.append(fixed[d1])
+            ofsg = []
+            ofss = []
+            for d in f.dimensions:
+                if d in fixed:
+                    ofsg.append(fixed[d])
+                    ofss.append(fixed[d])
+                elif sides[d] is CENTER:
+                    # The whole DOMAIN along `d`
+                    hl = f._C_get_field(HALO, d, LEFT)
+                    hr = f._C_get_field(HALO, d, RIGHT)
+                    ofs = f._C_get_field(OWNED, d, LEFT).offset
+                    sizes.append(f._C_get_field(NOPAD, d).size - hl.size - hr.size)
+                    ofsg.append(ofs)
+                    ofss.append(ofs)
                 else:
-                    meta = f._C_get_field(region if d0 is d1 else NOPAD, d1, side)
-                    offsets.append(meta.offset)
-                    sizes.append(meta.size)
-            mapper[(d0, side, region)] = (sizes, offsets)
+                    # Sending OWNED data to `side`, receiving from the opposite side
+                    amount = amounts[(d, opposite[sides[d]])]
+                    ofs0, ofs1 = self._make_ofs(f, d, sides[d], amount)
+                    sizes.append(amount)
+                    ofsg.append(ofs0)
+                    ofss.append(ofs1)
 
-        body = []
-        for d in f.dimensions:
-            if d in fixed:
-                continue
+            torank = ''.join(names[sides.get(i, CENTER)] for i in distributor.dimensions)
+            fromrank = ''.join(names[opposite[sides.get(i, CENTER)]]
+                               for i in distributor.dimensions)
+            sides = tuple((d, i) for d, i in sides.items() if i is not CENTER)
+            msgs.append((sides, sizes, ofsg, ofss, FieldFromPointer(fromrank, nb),
+                         FieldFromPointer(torank, nb)))
 
-            name = ''.join('r' if i is d else 'c' for i in distributor.dimensions)
-            rpeer = FieldFromPointer(name, nb)
-            name = ''.join('l' if i is d else 'c' for i in distributor.dimensions)
-            lpeer = FieldFromPointer(name, nb)
+        return msgs
+
+    def _make_alloc(self, f, buf, count):
+        """
+        Construct a node allocating, on the heap, a buffer ``buf`` of ``count``
+        items of type ``f.dtype``.
+        """
+        return Element(c.Statement("posix_memalign((void**)&%s, %d, %s*sizeof(%s))"
+                                   % (buf, f._data_alignment, ccode(count),
+                                      dtype_to_cstr(f.dtype))))
+
+    def _make_sendrecv(self, f, fixed, extra=None):
+        extra = extra or []
+        comm = f.grid.distributor._obj_comm
+
+        sizes = [Dimension(name='buf_%s' % d.root).symbolic_size for d in f.dimensions
+                 if d not in fixed]
+
+        ofsg = [Symbol(name='og%s' % d.root) for d in f.dimensions]
+        ofss = [Symbol(name='os%s' % d.root) for d in f.dimensions]
+
+        fromrank = Symbol(name='fromrank')
+        torank = Symbol(name='torank')
+
+        msg = MPIMsg(name='msg')
+        bufg = FieldFromPointer(msg._C_field_bufg, msg)
+        bufs = FieldFromPointer(msg._C_field_bufs, msg)
+        rrecv = Byref(str(FieldFromPointer(msg._C_field_rrecv, msg)))
+        rsend = Byref(str(FieldFromPointer(msg._C_field_rsend, msg)))
 
-            if mask[(d, LEFT)]:
-                # Sending to left, receiving from right
-                lsizes, loffsets = mapper[(d, LEFT, OWNED)]
-                rsizes, roffsets = mapper[(d, RIGHT, HALO)]
-                args = [f] + lsizes + loffsets + roffsets + [rpeer, lpeer, comm] + extra
-                body.append(Call('sendrecv%dd' % f.ndim, args))
+        # The buffers must outlive the sendrecv; they are freed in the wait
+        count = reduce(mul, sizes, 1)
+        allocs = [self._make_alloc(f, i, count) for i in [bufs, bufg]]
 
-            if mask[(d, RIGHT)]:
-                # Sending to right, receiving from left
-                rsizes, roffsets = mapper[(d, RIGHT, OWNED)]
-                lsizes, loffsets = mapper[(d, LEFT, HALO)]
-                args = [f] + rsizes + roffsets + loffsets + [lpeer, rpeer, comm] + extra
-                body.append(Call('sendrecv%dd' % f.ndim, args))
+        gather = Call('gather%dd' % f.ndim, [bufg] + sizes + [f] + ofsg + extra)
+        scatter = Call('scatter%dd' % f.ndim, [bufs] + sizes + [f] + ofss + extra)
+
+        # The `gather` is unnecessary if sending to MPI.PROC_NULL
+        gather = Conditional(CondNe(torank, Macro('MPI_PROC_NULL')), gather)
+        # The `scatter` must be guarded as we must not alter the halo values along
+        # the domain boundary, where the sender is actually MPI.PROC_NULL
+        scatter = Conditional(CondNe(fromrank, Macro('MPI_PROC_NULL')), scatter)
+
+        recv = Call('MPI_Irecv', [bufs, count, Macro(dtype_to_mpitype(f.dtype)),
+                                  fromrank, Integer(13), comm, rrecv])
+        send = Call('MPI_Isend', [bufg, count, Macro(dtype_to_mpitype(f.dtype)),
+                                  torank, Integer(13), comm, rsend])
+
+        waitrecv = Call('MPI_Wait', [rrecv, Macro('MPI_STATUS_IGNORE')])
+        waitsend = Call('MPI_Wait', [rsend, Macro('MPI_STATUS_IGNORE')])
+        frees = [Call('free', [i]) for i in [bufs, bufg]]
+
+        iet = List(body=allocs + [recv, gather, send])
+        parameters = [f] + sizes + ofsg + [fromrank, torank, comm, msg] + extra
+        sendrecv = Callable('isendrecv%dd' % f.ndim, iet, 'void', parameters,
+                            ('static',))
+
+        iet = List(body=[waitsend, waitrecv, scatter] + frees)
+        parameters = [f] + sizes + ofss + [fromrank, msg] + extra
+        wait = Callable('wait%dd' % f.ndim, iet, 'void', parameters, ('static',))
+
+        return sendrecv, wait
+
+    def _make_haloupdate(self, f, fixed, amounts, extra=None, uniquekey=None):
+        extra = extra or []
+        distributor = f.grid.distributor
+        nb = distributor._obj_neighborhood
+        comm = distributor._obj_comm
+
+        fixed = {d: Symbol(name="o%s" % d.root) for d in fixed}
+
+        msgs = []
+        start = []
+        wait = []
+        for sides, sizes, ofsg, ofss, fromrank, torank in\
+                self._make_msgs(f, fixed, amounts):
+            msg = MPIMsg(name='m%s' % ''.join('%s%s' % (d.root, side.name[0])
+                                              for d, side in sides))
+            msgs.append(msg)
+            args = [f] + sizes + ofsg + [fromrank, torank, comm, msg] + extra
+            start.append(Call('isendrecv%dd' % f.ndim, args))
+            args = [f] + sizes + ofss + [fromrank, msg] + extra
+            wait.append(Call('wait%dd' % f.ndim, args))
 
         if uniquekey is None:
-            uniquekey = ''.join(str(int(i)) for i in mask.values())
-        name = 'haloupdate%dd%s' % (f.ndim, uniquekey)
-        iet = List(body=body)
-        parameters = [f, comm, nb] + list(fixed.values()) + extra
-        return Callable(name, iet, 'void', parameters, ('static',))
+            uniquekey = ''.join(str(i) for i in amounts.values())
+
+        name = 'halostart%dd%s' % (f.ndim, uniquekey)
+        parameters = [f, comm, nb] + list(fixed.values()) + msgs + extra
+        halostart = Callable(name, List(body=start), 'void', parameters, ('static',))
+
+        name = 'halowait%dd%s' % (f.ndim, uniquekey)
+        parameters = [f, nb] + list(fixed.values()) + msgs + extra
+        halowait = Callable(name, List(body=wait), 'void', parameters, ('static',))
+
+        return halostart, halowait
+
+
+class OverlapHaloExchangeBuilder(FullHaloExchangeBuilder):
+
+    """
+    Build routines for MPI halo exchanges overlapping communication and
+    computation.
+
+    The halo exchanges are performed as in ``FullHaloExchangeBuilder``. However,
+    the loop nest following a HaloSpot is split into a CORE region, which does not
+    read the halo and is therefore computed while the messages are in flight, and
+    REMAINDER regions, computed once ``halowait`` has returned.
+    """
+
+    def place(self, iet, calls):
+        mapper = {}
+        for node in FindNodes(Node).visit(iet):
+            for children in node.children:
+                # Search for sequences of HaloSpots followed by the code they guard
+                halo_spots = []
+                for i in as_tuple(children) + (None,):
+                    if i in calls:
+                        halo_spots.append(i)
+                        continue
+                    if halo_spots:
+                        mapper.update(self._overlap(halo_spots, i, calls))
+                    halo_spots = []
+        return Transformer(mapper).visit(iet)
+
+    def _overlap(self, halo_spots, nest, calls):
+        """
+        Overlap the halo exchanges described by ``halo_spots`` with the
+        computation of the CORE region of ``nest``.
+        """
+        start = [i for hs in halo_spots for i, _ in calls[hs]]
+        wait = [i for hs in halo_spots for _, i in calls[hs]]
+
+        mapper = {hs: None for hs in halo_spots}
+        regions = self._make_regions(halo_spots, nest)
+        if regions is None:
+            # Cannot overlap; still correct, but communication is exposed
+            mapper[halo_spots[0]] = List(body=start + wait)
+        else:
+            core, remainder = regions
+            mapper[nest] = List(body=start + [core] + wait + remainder)
+        return mapper
+
+    def _make_regions(self, halo_spots, nest):
+        """
+        Split ``nest`` into a CORE region, which does not access the halo, and
+        REMAINDER regions, one for each side of each Dimension along which a
+        halo exchange is performed. Return None if ``nest`` cannot be split.
+        """
+        if nest is None or not nest.is_Iteration:
+            return None
+
+        # Reordering the iterations is only legal in absence of dependences
+        trees = retrieve_iteration_tree(nest)
+        if len(trees) != 1 or any(not i.is_Parallel for i in trees[0]):
+            return None
+
+        # The amount of halo required along each side of each Dimension
+        widths = OrderedDict()
+        for hs in halo_spots:
+            for v in hs.fmapper.values():
+                for d, side, amount in v.halos:
+                    handle = widths.setdefault(d, {LEFT: 0, RIGHT: 0})
+                    handle[side] = max(handle[side], amount)
+
+        iterations = [i for i in trees[0] if i.dim in widths]
+        if len(iterations) != len(widths) or any(i.offsets != (0, 0) for i in iterations):
+            return None
+
+        core = OrderedDict()
+        for i in iterations:
+            core[i] = (i.symbolic_min + widths[i.dim][LEFT],
+                       i.symbolic_max - widths[i.dim][RIGHT])
+
+        remainder = []
+        for n, i in enumerate(iterations):
+            _min, _max = i.symbolic_bounds
+            lsize, rsize = widths[i.dim][LEFT], widths[i.dim][RIGHT]
+            # The REMAINDER regions are clamped so that, even if the local
+            # domain is smaller than the halo, no point is computed twice
+            bounds = OrderedDict([(j, core[j]) for j in iterations[:n]])
+            if lsize > 0:
+                bounds[i] = (_min, Min(_min + lsize - 1, _max))
+                remainder.append(self._make_region(nest, bounds))
+            if rsize > 0:
+                bounds[i] = (Max(_max - rsize + 1, _min + lsize), _max)
+                remainder.append(self._make_region(nest, bounds))
+
+        return self._make_region(nest, core), remainder
+
+    def _make_region(self, nest, bounds):
+        mapper = {i: i._rebuild(limits=(_min, _max, i.limits[2]))
+                  for i, (_min, _max) in bounds.items()}
+        return Transformer(mapper, nested=True).visit(nest)
+
+
+class PersistentHaloExchangeBuilder(OverlapHaloExchangeBuilder):
+
+    """
+    Build routines for MPI halo exchanges overlapping communication and
+    computation, using persistent MPI requests.
+
+    As opposed to ``OverlapHaloExchangeBuilder``, the gather/scatter buffers are
+    allocated, and the MPI requests initialized (``MPI_Send_init``/``MPI_Recv_init``),
+    only once per Operator invocation, by ``haloinit``, and released by ``halofree``
+    once the time loop is over. ``halostart`` then simply gathers the data and
+    starts all requests, while ``halowait`` completes them through a single
+    ``MPI_Waitall`` before scattering the received data. The messages of all of
+    the Functions exchanged at the same HaloSpot share one set of requests, so
+    that there is exactly one ``MPI_Startall``/``MPI_Waitall`` pair per HaloSpot.
+    """
+
+    def __init__(self, threaded, mode=None):
+        super(PersistentHaloExchangeBuilder, self).__init__(threaded, mode)
+        self._prologue = []
+        self._epilogue = []
+
+    @classmethod
+    def footprint(cls, exchanges, args):
+        # The buffers are allocated once, and retained for the whole run
+        functions = OrderedDict()
+        for i in exchanges:
+            for f, nbytes in cls._footprint_msgs(i, args):
+                functions[f.name] = functions.get(f.name, 0) + sum(nbytes)
+        return functions, sum(functions.values())
+
+    def make(self, halo_spots):
+        # As opposed to the other builders, the halo exchanges of all of the
+        # Functions in a HaloSpot are performed by a single set of Callables, so
+        # that all of their messages are started and completed at once
+        calls = OrderedDict()
+        copies = OrderedDict()
+        generated = OrderedDict()
+        for hs in halo_spots:
+            self._exchanges.append([(f, tuple(v.loc_indices), hs.amounts[f])
+                                    for f, v in hs.fmapper.items()])
+            dfs = []
+            for n, (f, v) in enumerate(hs.fmapper.items()):
+                # Sanity check
+                assert f.is_Function
+                assert f.grid is not None
+
+                # The generic `a0`, `a1`, ..., as `a` in ``HaloExchangeBuilder.make``
+                df = f.__class__.__base__(name='a%d' % n, grid=f.grid,
+                                          shape=f.shape_global, dimensions=f.dimensions)
+                dfs.append(df)
+                # `gather` and `scatter` only need to be generated once for each `ndim`
+                if f.ndim not in copies:
+                    gather, extra = self._make_copy(df, v.loc_indices)
+                    scatter, _ = self._make_copy(df, v.loc_indices, swap=True)
+                    copies[f.ndim] = ([gather, scatter], extra)
+                extra = copies[f.ndim][1]
+
+            # The Callables only need to be generated once for each sequence of
+            # (`ndim`, `amounts`)
+            key = tuple((f.ndim, v) for f, v in hs.fmapper.items())
+            if key not in generated:
+                fixed = [v.loc_indices for v in hs.fmapper.values()]
+                amounts = [hs.amounts[f] for f in hs.fmapper]
+                generated[key] = self._make_haloupdate(dfs, fixed, amounts, extra,
+                                                       len(generated))
+
+            call = self._call_haloupdate(generated[key], list(hs.fmapper), hs, extra)
+            calls.setdefault(hs, []).append(call)
+
+        return flatten([i for i, _ in copies.values()] + list(generated.values())), calls
+
+    def _call_haloupdate(self, haloupdate, f, hs, extra=None):
+        extra = extra or []
+        haloinit, halostart, halowait, halofree = haloupdate
+        comm = f[0].grid.distributor._obj_comm
+        nb = f[0].grid.distributor._obj_neighborhood
+        loc_indices = [j for i in f for j in hs.fmapper[i].loc_indices.values()]
+
+        # One `struct msgs` for each HaloSpot
+        nmsgs = [i.nmsgs for i in halostart.parameters if isinstance(i, MPIMsgs)]
+        msgs = MPIMsgs(name='msgs%d' % len(self._objs), nmsgs=nmsgs.pop())
+        self._objs.append(msgs)
+
+        self._prologue.append(Call(haloinit.name, f + [comm, nb, msgs]))
+        self._epilogue.append(Call(halofree.name, [msgs]))
+
+        start = Call(halostart.name, f + [nb] + loc_indices + [msgs] + extra)
+        wait = Call(halowait.name, f + [nb] + loc_indices + [msgs] + extra)
+        return start, wait
+
+    def place(self, iet, calls):
+        iet = super(PersistentHaloExchangeBuilder, self).place(iet, calls)
+        return List(body=self._prologue + [iet] + self._epilogue)
+
+    def _make_sendrecv(self, f, fixed, extra=None):
+        # The MPI calls are performed directly within `halostart` and `halowait`
+        return None
+
+    def _make_haloupdate(self, f, fixed, amounts, extra=None, uniquekey=None):
+        """
+        As opposed to the other builders, ``f``, ``fixed`` and ``amounts`` are
+        sequences, with one entry for each of the Functions exchanged at the
+        same HaloSpot.
+        """
+        extra = extra or []
+        distributor = f[0].grid.distributor
+        nb = distributor._obj_neighborhood
+        comm = distributor._obj_comm
+
+        fixed = [OrderedDict((d, Symbol(name="o%s%d" % (d.root, n))) for d in i)
+                 for n, i in enumerate(fixed)]
+
+        msgs = [(i, m) for i, j, k in zip(f, fixed, amounts)
+                for m in self._make_msgs(i, j, k)]
+        obj = MPIMsgs(name='msgs', nmsgs=len(msgs))
+        reqs = FieldFromPointer(obj._C_field_reqs, obj)
+
+        init = []
+        start = []
+        wait = []
+        free = []
+        for n, (i, (_, sizes, ofsg, ofss, fromrank, torank)) in enumerate(msgs):
+            bufg = Macro('%s[%d]' % (FieldFromPointer(obj._C_field_bufg, obj), n))
+            bufs = Macro('%s[%d]' % (FieldFromPointer(obj._C_field_bufs, obj), n))
+            rrecv = Byref('%s[%d]' % (reqs, 2*n))
+            rsend = Byref('%s[%d]' % (reqs, 2*n + 1))
+
+            # `MPI_Startall` starts the requests in an arbitrary order, so each
+            # message has its own tag, as several of them may be exchanged with
+            # the same peer
+            count = reduce(mul, sizes, 1)
+            init.extend([self._make_alloc(i, j, count) for j in [bufs, bufg]])
+            init.append(Call('MPI_Recv_init', [bufs, count,
+                                               Macro(dtype_to_mpitype(i.dtype)),
+                                               fromrank, Integer(13 + n), comm, rrecv]))
+            init.append(Call('MPI_Send_init', [bufg, count,
+                                               Macro(dtype_to_mpitype(i.dtype)),
+                                               torank, Integer(13 + n), comm, rsend]))
+
+            # The `gather` is unnecessary if sending to MPI.PROC_NULL
+            gather = Call('gather%dd' % i.ndim, [bufg] + sizes + [i] + ofsg + extra)
+            start.append(Conditional(CondNe(torank, Macro('MPI_PROC_NULL')), gather))
+            # The `scatter` must be guarded as we must not alter the halo values along
+            # the domain boundary, where the sender is actually MPI.PROC_NULL
+            scatter = Call('scatter%dd' % i.ndim, [bufs] + sizes + [i] + ofss + extra)
+            wait.append(Conditional(CondNe(fromrank, Macro('MPI_PROC_NULL')), scatter))
+
+            free.extend([Call('MPI_Request_free', [j]) for j in [rrecv, rsend]])
+            free.extend([Call('free', [j]) for j in [bufs, bufg]])
+
+        start.append(Call('MPI_Startall', [2*len(msgs), reqs]))
+        wait.insert(0, Call('MPI_Waitall', [2*len(msgs), reqs,
+                                            Macro('MPI_STATUSES_IGNORE')]))
+
+        if uniquekey is None:
+            uniquekey = ''.join(str(j) for i in amounts for j in i.values())
+        suffix = '%s%s' % (''.join('%dd' % i.ndim for i in f), uniquekey)
+        fixed = [j for i in fixed for j in i.values()]
+
+        name = 'haloinit%s' % suffix
+        parameters = f + [comm, nb, obj]
+        haloinit = Callable(name, List(body=init), 'void', parameters, ('static',))
+
+        name = 'halostart%s' % suffix
+        parameters = f + [nb] + fixed + [obj] + extra
+        halostart = Callable(name, List(body=start), 'void', parameters, ('static',))
+
+        name = 'halowait%s' % suffix
+        parameters = f + [nb] + fixed + [obj] + extra
+        halowait = Callable(name, List(body=wait), 'void', parameters, ('static',))
+
+        name = 'halofree%s' % suffix
+        halofree = Callable(name, List(body=free), 'void', [obj], ('static',))
+
+        return haloinit, halostart, halowait, halofree
+
+
+class WideHaloExchangeBuilder(BasicHaloExchangeBuilder):
+
+    """
+    Build routines for communication-avoiding MPI halo exchanges.
+
+    Within a time loop, the halo is exchanged only once every ``k`` timesteps,
+    ``k`` being the runtime parameter ``exchange_period``. Each exchange is wide
+    enough for the subsequent ``k`` timesteps: in between, the loop nest is
+    computed redundantly over a ghost region, which extends into the halo along
+    the sides shared with a neighbour and shrinks by one stencil radius at each
+    timestep. The largest legal ``k`` is dictated by the halo of the Functions
+    (see the ``halo-depth`` configuration parameter). The time loops that cannot
+    be transformed this way (e.g., because they contain more than one loop nest)
+    retain the basic halo exchanges.
+    """
+
+    def __init__(self, threaded, mode=None):
+        super(WideHaloExchangeBuilder, self).__init__(threaded, mode)
+        self._period = None
+        self._distributor = None
+        self._neighbours = OrderedDict()
+
+    def prepare(self, iet):
+        candidates = OrderedDict()
+        for i in FindNodes(Iteration).visit(iet):
+            if i.dim.is_Time:
+                analysis = self._analyze(i)
+                if analysis is not None:
+                    candidates[i] = analysis
+                    self._distributor = list(analysis[1][0].fmapper)[0].grid.distributor
+        if not candidates:
+            return iet
+
+        self._period = ExchangePeriod(maximum=min(v[-1] for v in candidates.values()))
+        self._objs.append(self._period)
+
+        prologues = OrderedDict()
+        mapper = {}
+        for i, v in candidates.items():
+            prologues[i], handle = self._widen(i, *v[:-1])
+            mapper.update(handle)
+
+        # The read-only Functions are exchanged only once, before the time loop
+        iet = Transformer({k: List(body=v + [k])
+                           for k, v in prologues.items() if v}).visit(iet)
+        iet = Transformer(mapper, nested=True).visit(iet)
+
+        self._objs.extend(self._neighbours.values())
+
+        return iet
+
+    def _analyze(self, timeloop):
+        """
+        Check whether ``timeloop`` can be made communication-avoiding. If so,
+        return a 5-tuple ``(nest, halo_spots, reads, radius, maximum)``, where
+        ``reads`` maps each ``(Function, time offset)`` to exchange to its local
+        indices and to the halo it reads along each ``(Dimension, DataSide)``;
+        ``radius`` is the amount by which the ghost region shrinks at each
+        timestep; and ``maximum`` is the largest legal exchange period.
+        Otherwise, return None.
+        """
+        # Only a sequence of HaloSpots followed by a single loop nest is supported,
+        # with no other computation within the time loop except for scalar temporaries
+        halo_spots = FindNodes(HaloSpot).visit(timeloop)
+        nests = filter_ordered(i[1] for i in retrieve_iteration_tree(timeloop)
+                               if len(i) > 1)
+        if not halo_spots or len(nests) != 1:
+            return None
+        nest = nests.pop()
+        siblings = [as_tuple(c) for n in FindNodes(Node).visit(timeloop)
+                    for c in n.children if nest in as_tuple(c)]
+        if len(siblings) != 1:
+            return None
+        preceding = list(siblings[0][:siblings[0].index(nest)])
+        if preceding[-len(halo_spots):] != halo_spots:
+            return None
+        exprs = FindNodes(Expression).visit(nest)
+        if any(i not in exprs and not i.is_scalar
+               for i in FindNodes(Expression).visit(timeloop)):
+            return None
+
+        # The loop nest must iterate over all and only the distributed Dimensions,
+        # so that the ghost region may be computed by extending the loop bounds
+        distributor = list(halo_spots[0].fmapper)[0].grid.distributor
+        if self._distributor not in (None, distributor):
+            return None
+        dims = distributor.dimensions
+        iterations = FindNodes(Iteration).visit(nest)
+        if any(i.dim not in dims or i.offsets != (0, 0) for i in iterations) or \
+                set(dims) != set(i.dim for i in iterations):
+            return None
+
+        writes = OrderedDict()
+        reads = OrderedDict()
+        for e in exprs:
+            if e.is_Increment:
+                return None
+            accesses = [(i, False) for i in retrieve_indexed(e.expr.rhs, mode='all')]
+            if e.is_tensor:
+                accesses.append((e.expr.lhs, True))
+            for i, is_write in accesses:
+                f = i.function
+                if not f.is_DiscreteFunction or f.grid is None or \
+                        f.grid.distributor is not distributor:
+                    return None
+                loc_indices = {}
+                offset = None
+                amounts = OrderedDict()
+                for d, idx in zip(f.dimensions, i.indices):
+                    if d in dims:
+                        v = idx - d - f._size_halo[d].left
+                        if not v.is_Integer:
+                            return None
+                        amounts[(d, LEFT)] = max(-int(v), 0)
+                        amounts[(d, RIGHT)] = max(int(v), 0)
+                    elif d.is_Time:
+                        offset = sympify(idx.offset if getattr(idx, 'is_Modulo', False)
+                                         else idx - d)
+                        if not offset.is_Integer:
+                            return None
+                        offset = int(offset)
+                        loc_indices[d] = idx
+                    else:
+                        return None
+                if is_write:
+                    if any(amounts.values()):
+                        return None
+                    writes.setdefault(f, set()).add(offset)
+                else:
+                    handle = reads.setdefault((f, offset), (loc_indices, amounts))[1]
+                    for k, v in amounts.items():
+                        handle[k] = max(handle[k], v)
+
+        for f, v in writes.items():
+            if len(v) > 1:
+                return None
+            written = set(v).pop()
+            # The same time slot being written may only be read pointwise
+            if any(amounts.values() for (g, offset), (_, amounts) in reads.items()
+                   if g is f and offset == written):
+                return None
+            # The other time slots must be those computed in the preceding timesteps
+            offsets = sorted(i for g, i in reads if g is f and i != written)
+            if timeloop.direction is Backward:
+                expected = list(range(written + 1, written + 1 + len(offsets)))
+            else:
+                expected = list(range(written - len(offsets), written))
+            if offsets != expected:
+                return None
+        reads = OrderedDict([(k, v) for k, v in reads.items()
+                             if k[1] not in writes.get(k[0], [])])
+        # A read-only, time-varying Function would need an exchange at every timestep
+        if any(f not in writes and offset is not None for f, offset in reads) or \
+                not any(f in writes for f, _ in reads):
+            return None
+
+        radius = OrderedDict([(k, 0) for k in product(dims, [LEFT, RIGHT])])
+        for _, amounts in reads.values():
+            for k, v in amounts.items():
+                radius[k] = max(radius[k], v)
+
+        # The exchanged (and, in between, redundantly computed) halo must fit in
+        # the allocated halo of each Function, as well as in the local domain of
+        # each MPI rank, from which the messages are gathered
+        sizes = {d: min(len(i) for i in v)
+                 for d, v in zip(distributor.dimensions, distributor.decomposition)}
+        bounds = []
+        for (f, _), (_, amounts) in reads.items():
+            for (d, side), v in amounts.items():
+                if radius[(d, side)]:
+                    halo = getattr(f._size_halo[d], side.name)
+                    bounds.append((min(halo, sizes[d]) - v) // radius[(d, side)] + 1)
+        for f in writes:
+            for (d, side), v in radius.items():
+                if v:
+                    bounds.append(getattr(f._size_halo[d], side.name) // v + 1)
+        maximum = min(bounds)
+        if maximum < 2:
+            return None
+
+        return nest, halo_spots, reads, radius, maximum
+
+    def _widen(self, timeloop, nest, halo_spots, reads, radius):
+        """
+        Make ``timeloop`` communication-avoiding. Return the HaloSpots to be
+        placed before ``timeloop`` along with a mapper to transform its body.
+        """
+        k = self._period
+        dim = timeloop.dim
+        if timeloop.direction is Backward:
+            phase = Mod(dim.symbolic_max - dim, k)
+        else:
+            phase = Mod(dim - dim.symbolic_min, k)
+
+        # Each halo exchange must serve the subsequent `k` timesteps
+        prologue = []
+        exchanges = []
+        for (f, offset), (loc_indices, amounts) in reads.items():
+            halos = tuple(Halo(d, side, v + (k - 1)*radius[(d, side)])
+                          for (d, side), v in amounts.items() if radius[(d, side)])
+            hs = HaloSpot(HaloScheme(fmapper={f: HaloSchemeEntry(frozendict(loc_indices),
+                                                                 halos)}))
+            if offset is None:
+                prologue.append(hs)
+            else:
+                exchanges.append(hs)
+
+        # The ghost region shrinks by `radius` at each timestep until the next
+        # halo exchange. No ghost region is computed along the domain boundary
+        ghosts = Symbol(name='ghosts', dtype=np.int32)
+        ext = OrderedDict()
+        for (d, side), v in radius.items():
+            ext[(d, side)] = ghosts*v*self._neighbour(d, side) if v else 0
+        mapper = {}
+        for i in FindNodes(Iteration).visit(nest):
+            _min, _max, incr = i.limits
+            mapper[i] = i._rebuild(limits=(_min - ext[(i.dim, LEFT)],
+                                           _max + ext[(i.dim, RIGHT)], incr))
+
+        mapper = {nest: Transformer(mapper, nested=True).visit(nest)}
+        mapper.update({hs: None for hs in halo_spots})
+        mapper[halo_spots[0]] = List(body=[Conditional(CondEq(phase, 0), exchanges),
+                                           Expression(DummyEq(ghosts, k - 1 - phase))])
+
+        return prologue, mapper
+
+    def _neighbour(self, d, side):
+        """
+        A Constant whose value is 1 if the calling MPI rank has a neighbour
+        along the given Dimension and DataSide, 0 otherwise.
+        """
+        key = (d, side)
+        if key not in self._neighbours:
+            value = int(self._distributor.neighborhood[d][side] != MPI.PROC_NULL)
+            self._neighbours[key] = Constant(name='nb_%s%s' % (d.name, side.name[0]),
+                                             dtype=np.int32, value=value)
+        return self._neighbours[key]
+
+    def _make_haloupdate(self, f, fixed, amounts, extra=None, uniquekey=None):
+        haloupdate = super(WideHaloExchangeBuilder, self)._make_haloupdate(
+            f, fixed, amounts, extra, uniquekey
+        )
+        if any(self._period in sympify(i).free_symbols for i in amounts.values()):
+            haloupdate = haloupdate._rebuild(
+                parameters=haloupdate.parameters + (self._period,)
+            )
+        return haloupdate
+
+    def _call_haloupdate(self, haloupdate, f, hs, extra=None):
+        call = super(WideHaloExchangeBuilder, self)._call_haloupdate(haloupdate, f,
+                                                                     hs, extra)
+        if self._period in haloupdate[0].parameters:
+            call = Call(call.name, call.params + (self._period,))
+        return call
 
 
 class MPIStatusObject(LocalObject):
@@ -278,3 +1190,115 @@ class MPIRequestObject(LocalObject):
 
     # Pickling support
     _pickle_args = ['name']
+
+
+class MPIMsg(CompositeObject):
+
+    """
+    A ``struct msg``, carrying the state of an in-flight halo exchange message;
+    that is, the gather and scatter buffers, as well as the MPI requests.
+    """
+
+    _C_field_bufg = 'bufg'
+    _C_field_bufs = 'bufs'
+    _C_field_rrecv = 'rrecv'
+    _C_field_rsend = 'rsend'
+
+    if MPI._sizeof(MPI.Request) == sizeof(c_int):
+        c_mpirequest = type('MPI_Request', (c_int,), {})
+    else:
+        c_mpirequest = type('MPI_Request', (c_void_p,), {})
+
+    fields = [
+        (_C_field_bufg, c_void_p),
+        (_C_field_bufs, c_void_p),
+        (_C_field_rrecv, c_mpirequest),
+        (_C_field_rsend, c_mpirequest)
+    ]
+
+    def __init__(self, name):
+        super(MPIMsg, self).__init__(name, 'msg', self.fields)
+
+    @property
+    def _arg_names(self):
+        return (self.name,)
+
+    def _arg_values(self, **kwargs):
+        if self.name in kwargs:
+            return {self.name: kwargs.pop(self.name)}
+        else:
+            return self._arg_defaults()
+
+    # Pickling support
+    _pickle_args = ['name']
+
+
+class MPIMsgs(CompositeObject):
+
+    """
+    A ``struct msgs``, carrying the state of all of the messages exchanged at
+    a HaloSpot; that is, the gather and scatter buffers, as well as the persistent
+    MPI requests, stored contiguously so that they can be started and completed
+    all at once.
+    """
+
+    _C_field_bufg = 'bufg'
+    _C_field_bufs = 'bufs'
+    _C_field_reqs = 'reqs'
+
+    def __init__(self, name, nmsgs):
+        self.nmsgs = nmsgs
+        fields = [
+            (self._C_field_bufg, c_void_p*nmsgs),
+            (self._C_field_bufs, c_void_p*nmsgs),
+            (self._C_field_reqs, MPIMsg.c_mpirequest*(2*nmsgs))
+        ]
+        super(MPIMsgs, self).__init__(name, 'msgs%d' % nmsgs, fields)
+
+    @property
+    def _arg_names(self):
+        return (self.name,)
+
+    def _arg_values(self, **kwargs):
+        if self.name in kwargs:
+            return {self.name: kwargs.pop(self.name)}
+        else:
+            return self._arg_defaults()
+
+    # Pickling support
+    _pickle_args = ['name', 'nmsgs']
+
+
+class ExchangePeriod(Constant):
+
+    """
+    The number of timesteps between two consecutive halo exchanges in the
+    communication-avoiding scheme. ``maximum``, the largest value the halo of
+    the Functions can accommodate, is also the default value.
+    """
+
+    def __new__(cls, maximum, **kwargs):
+        obj = super(ExchangePeriod, cls).__new__(cls, name='exchange_period',
+                                                 dtype=np.int32, value=maximum)
+        obj.maximum = maximum
+        return obj
+
+    def _arg_check(self, args, intervals):
+        super(ExchangePeriod, self)._arg_check(args, intervals)
+        if not 1 <= args[self.name] <= self.maximum:
+            raise InvalidArgument("Illegal `%s=%d`; must be in [1, %d], as the "
+                                  "halo of the Functions cannot accommodate more "
+                                  "timesteps" % (self.name, args[self.name],
+                                                 self.maximum))
+
+    _pickle_kwargs = Constant._pickle_kwargs + ['maximum']
+
+
+modes = {
+    'basic': BasicHaloExchangeBuilder,
+    'full': FullHaloExchangeBuilder,
+    'overlap': OverlapHaloExchangeBuilder,
+    'persistent': PersistentHaloExchangeBuilder,
+    'wide': WideHaloExchangeBuilder
+}
+"""The available halo exchange schemes."""
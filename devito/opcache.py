@@ -0,0 +1,370 @@
+"""
+A persistent, on-disk cache of Operators.
+
+The lowering of symbolic equations into C code (clusterization, DSE, IET
+construction, DLE) is entirely performed in Python and may take tens of seconds
+for complex kernels. Once an Operator has been JIT-compiled, the outcome of the
+lowering (parameters, profiler sections, data space, IET, ...) as well as the
+compiled shared object are stored in a directory shared by all processes running
+on the same node. Upon constructing an Operator from the same equations in
+another process, the lowering is skipped and the shared object simply loaded.
+
+The data carriers (Functions, Constants, ...) are never stored. They are rather
+stored by name, and upon a warm start they are bound to the objects appearing in
+the user-provided equations.
+"""
+
+from collections import OrderedDict
+from io import BytesIO
+from pathlib import Path
+import os
+import pickle
+import stat
+
+try:
+    import cloudpickle
+except ImportError:
+    cloudpickle = None
+
+from devito.compiler import load, save
+from devito.dle import NThreads
+from devito.logger import debug, warning
+from devito.parameters import configuration
+from devito.symbolics import retrieve_functions
+from devito.tools import Signer, as_tuple, filter_ordered, make_tempdir
+from devito.types import Dimension, Grid
+
+__all__ = ['OperatorCache', 'opcache']
+
+
+class OperatorCache(object):
+
+    """
+    A size-bounded, on-disk cache of JIT-compiled Operators.
+
+    Entries are keyed on a digest of the input equations, the symbolic objects
+    appearing in them, the Operator construction arguments, the JIT-relevant
+    ``configuration`` items, as well as the Devito and compiler versions. When the
+    total size of the cache exceeds ``options['max-size']`` bytes, the least
+    recently used entries are evicted.
+    """
+
+    _suffix = '.opc'
+
+    def __init__(self, path=None):
+        self._path = path
+        self.stats = OrderedDict([('hits', 0), ('misses', 0), ('stores', 0),
+                                  ('evictions', 0)])
+        # The untrusted directories already reported to the user
+        self._untrusted = set()
+
+    @property
+    def path(self):
+        """The directory hosting the cache entries."""
+        if self._path is None:
+            path = options['path'] or make_tempdir('opcache', mode=0o700)
+        else:
+            path = self._path
+        path = Path(path)
+        path.mkdir(mode=0o700, parents=True, exist_ok=True)
+        return path
+
+    @property
+    def trusted(self):
+        """
+        True if the cache directory is owned by the current user and is not
+        writable by anyone else, False otherwise. As the cache entries are
+        unpickled, an entry planted by another user could execute arbitrary code.
+        """
+        path = self.path
+        try:
+            st = path.stat()
+        except OSError:
+            return False
+        if st.st_uid == os.getuid() and not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+            return True
+        if path not in self._untrusted:
+            self._untrusted.add(path)
+            warning("Disabling the Operator cache, as `%s` is not owned by the "
+                    "current user or is writable by others" % path)
+        return False
+
+    @property
+    def enabled(self):
+        return (bool(configuration['opcache']) and cloudpickle is not None and
+                self.trusted)
+
+    @property
+    def entries(self):
+        """
+        The cache entries, as ``(path, size)`` pairs, from the least to the
+        most recently used.
+        """
+        entries = []
+        for i in self.path.glob('*%s' % self._suffix):
+            try:
+                stat = i.stat()
+            except OSError:
+                # Presumably evicted by another process in the meanwhile
+                continue
+            entries.append((stat.st_mtime, i, stat.st_size))
+        return [(i, size) for _, i, size in sorted(entries)]
+
+    @property
+    def nbytes(self):
+        """The current size of the cache, in bytes."""
+        return sum(size for _, size in self.entries)
+
+    def key(self, operator, expressions, **kwargs):
+        """
+        A unique key for the Operator built out of ``expressions`` and ``kwargs``.
+        """
+        # Entries stored by other Devito versions, or built by other compilers,
+        # are never reused
+        from devito import __version__
+        compiler = operator._compiler
+        items = [type(operator).__name__, __version__,
+                 '%s-%s' % (compiler.cc, compiler.version)]
+        items.extend(str(i) for i in sorted(kwargs.items(), key=lambda i: i[0]))
+
+        dimensions = []
+        for e in expressions:
+            items.append('%s<%s>' % (e.__class__.__name__, e))
+            if e.subdomain is not None:
+                items.append(e.subdomain.name)
+                dimensions.extend(e.subdomain.dimension_map.values())
+            dimensions.extend(i for i in e.free_symbols if isinstance(i, Dimension))
+
+        for _, i in sorted(retrieve_carriers(expressions).items()):
+            items.extend(signature_items(i))
+            dimensions.extend(i.indices)
+
+        for i in sorted(filter_ordered(dimensions), key=lambda i: i.name):
+            items.extend(signature_items(i))
+
+        return Signer._digest(configuration, *items)
+
+    def load(self, operator, key, expressions):
+        """
+        Populate ``operator`` with the cache entry ``key``, if any.
+
+        Returns
+        -------
+        bool
+            True on cache hit, False otherwise.
+        """
+        entry = self.path.joinpath(key).with_suffix(self._suffix)
+        try:
+            with open(str(entry), 'rb') as f:
+                unpickler = CarriersUnpickler(f, retrieve_carriers(expressions))
+                soname, binary, state = unpickler.load()
+        except OSError:
+            self.stats['misses'] += 1
+            debug("Operator cache miss `%s`" % key)
+            return False
+        except UnboundCarrier as e:
+            # The cached Operator uses data carriers unknown to the caller
+            self.stats['misses'] += 1
+            debug("Operator cache miss `%s` (unbound `%s`)" % (key, e))
+            return False
+        except Exception as e:
+            # A corrupted or stale entry (e.g., one no longer matching the
+            # definition of some of the pickled classes), which gets dropped
+            self.stats['misses'] += 1
+            warning("Dropping unreadable Operator cache entry `%s` [%s]" % (key, e))
+            try:
+                entry.unlink()
+            except OSError:
+                # Presumably evicted by another process in the meanwhile
+                pass
+            return False
+
+        operator.__dict__.update(state)
+        operator._soname = soname
+
+        # Skip JIT compilation -- the shared object just needs to be loaded
+        save(soname, binary, operator._compiler)
+        operator._lib = load(soname)
+        operator._lib.name = soname
+
+        # Record the access for the LRU eviction policy
+        try:
+            os.utime(str(entry))
+        except OSError:
+            pass
+
+        self.stats['hits'] += 1
+        debug("Operator cache hit `%s`" % key)
+        return True
+
+    def store(self, operator, key, carriers):
+        """
+        Store the JIT-compiled ``operator`` as the cache entry ``key``. The
+        data carriers in ``carriers``, a mapper from names to objects, are
+        stored by name.
+        """
+        entry = self.path.joinpath(key).with_suffix(self._suffix)
+        if entry.is_file():
+            return
+
+        exclude = ['_lib', '_cfunction', '_args', '_state', '_soname', '_opcache_key',
+                   '_opcache_carriers', '_compiler']
+        state = {k: v for k, v in operator.__dict__.items() if k not in exclude}
+        state['_opcache_key'] = key
+        with open(operator._lib._name, 'rb') as f:
+            binary = f.read()
+
+        buf = BytesIO()
+        try:
+            CarriersPickler(buf, carriers).dump((operator._soname, binary, state))
+        except Exception as e:
+            warning("Couldn't store Operator `%s` in the Operator cache [%s]"
+                    % (operator.name, e))
+            return
+
+        # Write then rename, so that concurrent readers never see partial entries
+        tmpfile = entry.with_suffix('.%d.tmp' % os.getpid())
+        with open(str(tmpfile), 'wb') as f:
+            f.write(buf.getvalue())
+        os.replace(str(tmpfile), str(entry))
+
+        self.stats['stores'] += 1
+        debug("Operator cache store `%s` [%d bytes]" % (key, len(buf.getvalue())))
+
+        self.evict()
+
+    def evict(self, nbytes=None):
+        """
+        Evict the least recently used entries until the cache size drops
+        below ``nbytes``, which defaults to ``options['max-size']``.
+        """
+        nbytes = options['max-size'] if nbytes is None else nbytes
+        entries = self.entries
+        total = sum(size for _, size in entries)
+        for i, size in entries:
+            if total <= nbytes:
+                break
+            try:
+                i.unlink()
+            except OSError:
+                # Presumably evicted by another process in the meanwhile
+                continue
+            total -= size
+            self.stats['evictions'] += 1
+
+    def clear(self):
+        """Drop all entries from the cache."""
+        self.evict(0)
+
+
+class UnboundCarrier(Exception):
+    pass
+
+
+class CarriersPickler(cloudpickle.CloudPickler if cloudpickle else pickle.Pickler):
+
+    """
+    Pickle all objects, except for the data carriers in ``carriers``, a mapper
+    from names to objects, which are rather stored by name so that they can be
+    later bound to the user-provided objects. So are their Grids. Any other data
+    carrier, such as those introduced by the compiler, is pickled by value.
+    """
+
+    def __init__(self, f, carriers):
+        super(CarriersPickler, self).__init__(f)
+        self.carriers = carriers
+        self.grids = {}
+        for k, v in carriers.items():
+            grid = getattr(v, 'grid', None)
+            if grid is not None:
+                self.grids.setdefault(id(grid), k)
+
+    def persistent_id(self, obj):
+        if isinstance(obj, Grid):
+            try:
+                return ('grid', self.grids[id(obj)], None)
+            except KeyError:
+                return None
+        if is_carrier(obj) and self.carriers.get(obj.name) is obj.function:
+            if obj is obj.function:
+                return ('carrier', obj.name, None)
+            else:
+                return ('carrier', obj.name, tuple(obj.args))
+        return None
+
+
+class CarriersUnpickler(pickle.Unpickler):
+
+    def __init__(self, f, mapper):
+        super(CarriersUnpickler, self).__init__(f)
+        self.mapper = mapper
+
+    def persistent_load(self, pid):
+        kind, name, args = pid
+        try:
+            function = self.mapper[name]
+        except KeyError:
+            raise UnboundCarrier(name)
+        if kind == 'grid':
+            return function.grid
+        return function if args is None else function.func(*args)
+
+
+def is_carrier(obj):
+    """True if ``obj`` carries user-provided data, False otherwise."""
+    if isinstance(obj, type) or isinstance(obj, NThreads):
+        # Classes aren't carriers, nor is `nthreads`, which is introduced by
+        # the DLE and hence never among the user-provided objects
+        return False
+    try:
+        return obj.is_DiscreteFunction or obj.is_Constant
+    except AttributeError:
+        return False
+
+
+def retrieve_carriers(expressions):
+    """Map names to data carriers for all data carriers in ``expressions``."""
+    found = []
+    for e in as_tuple(expressions):
+        found.extend(i.function for i in retrieve_functions(e))
+        found.extend(i for i in e.free_symbols if is_carrier(i))
+    # Also the objects reachable from the carriers, e.g. the grid spacing
+    # symbols and the SparseFunction coordinates
+    for i in list(found):
+        found.extend(getattr(i, j) for j in getattr(i, '_sub_functions', ()))
+        try:
+            found.extend(i.grid.spacing_symbols)
+        except AttributeError:
+            pass
+    return OrderedDict([(i.name, i) for i in found if is_carrier(i)])
+
+
+def signature_items(obj):
+    """
+    The items uniquely identifying the symbolic object ``obj`` from the code
+    generation standpoint. These are the arguments required to reconstruct
+    ``obj``, except for those carrying data.
+    """
+    cls = obj._pickle_reconstruct or type(obj)
+    items = [cls.__name__]
+    for i in obj._pickle_args + obj._pickle_kwargs:
+        if i in ('grid', 'initializer', '_value') or i.endswith('_data'):
+            continue
+        items.append('%s=%s' % (i, getattr(obj, i)))
+    return items
+
+
+options = {
+    'path': os.environ.get('DEVITO_OPCACHE_PATH'),
+    'max-size': 2**30
+}
+"""Operator cache options."""
+
+
+# Should Devito reuse the Operators stored in the persistent cache, rather
+# than performing the whole lowering process?
+configuration.add('opcache', 0, [0, 1], lambda i: bool(i), False)
+
+
+opcache = OperatorCache()
+"""The process-wide Operator cache."""
@@ -1,23 +1,33 @@
 from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
 from functools import reduce
+from numbers import Number
 from operator import mul
 
 from cached_property import cached_property
+from sympy import sympify
 import ctypes
+import numpy as np
+import os
+import threading
 
 from devito.compiler import jit_compile, load, save
 from devito.dle import transform
 from devito.dse import rewrite
 from devito.equation import Eq
-from devito.exceptions import InvalidOperator
+from devito.exceptions import InvalidArgument, InvalidOperator
 from devito.logger import info, perf, warning
+from devito.mpi import MPI
 from devito.ir.equations import LoweredEq
 from devito.ir.clusters import clusterize
 from devito.ir.iet import (Callable, List, MetaCall, iet_build, iet_insert_C_decls,
                            ArrayCast, derive_parameters)
 from devito.ir.stree import st_build
+from devito.opcache import opcache, retrieve_carriers
 from devito.parameters import configuration
-from devito.profiling import create_profile
+from devito.profiling import (CompilationProfile, MemoryEstimate, compile_stage,
+                              create_profile)
 from devito.symbolics import indexify
 from devito.tools import Signer, ReducerMap, as_tuple, flatten, filter_sorted, split
 
@@ -45,6 +55,9 @@ class Operator(Callable):
         * dle : str
             Aggressiveness of the Devito Loop Engine for loop-level
             optimization. Defaults to ``configuration['dle']``.
+        * mpi : str
+            The MPI halo exchange scheme, in case of MPI execution. Defaults
+            to ``configuration['mpi']``.
 
     Examples
     --------
@@ -122,7 +135,9 @@ class Operator(Callable):
     refer to the relevant documentation.
     """
 
-    _default_headers = ['#define _POSIX_C_SOURCE 200809L']
+    _default_headers = ['#define _POSIX_C_SOURCE 200809L',
+                        '#define MIN(a,b) (((a) < (b)) ? (a) : (b))',
+                        '#define MAX(a,b) (((a) > (b)) ? (a) : (b))']
     _default_includes = ['stdlib.h', 'math.h', 'sys/time.h']
     _default_globals = []
 
@@ -150,14 +165,33 @@ class Operator(Callable):
         # References to local or external routines
         self._func_table = OrderedDict()
 
+        # The HaloExchangeBuilder class and the halo exchanges it generated, if any
+        self._halo_exchanges = None
+
         # Internal state. May be used to store information about previous runs,
         # autotuning reports, etc
         self._state = {}
 
+        # Track the time and memory spent in each compilation stage
+        self._state['compile-timings'] = CompilationProfile()
+
+        # Attempt a warm start from the persistent Operator cache, which, on
+        # cache hit, entirely bypasses the lowering process
+        self._opcache_key = None
+        self._opcache_carriers = None
+        if opcache.enabled:
+            with self._profile_compilation('opcache'):
+                self._opcache_key = opcache.key(self, expressions, **kwargs)
+                self._opcache_carriers = retrieve_carriers(expressions)
+                hit = opcache.load(self, self._opcache_key, expressions)
+            if hit:
+                return
+
         # Expression lowering: indexification, substitution rules, specialization
-        expressions = [indexify(i) for i in expressions]
-        expressions = self._apply_substitutions(expressions, subs)
-        expressions = self._specialize_exprs(expressions)
+        with self._profile_compilation('lowering'):
+            expressions = [indexify(i) for i in expressions]
+            expressions = self._apply_substitutions(expressions, subs)
+            expressions = self._specialize_exprs(expressions)
 
         # Expression analysis
         self.input = filter_sorted(flatten(e.reads for e in expressions))
@@ -166,29 +200,42 @@ class Operator(Callable):
 
         # Group expressions based on their iteration space and data dependences,
         # and apply the Devito Symbolic Engine (DSE) for flop optimization
-        clusters = clusterize(expressions)
-        clusters = rewrite(clusters, mode=set_dse_mode(dse))
+        with self._profile_compilation('clusterize'):
+            clusters = clusterize(expressions)
+        with self._profile_compilation('dse'):
+            clusters = rewrite(clusters, mode=set_dse_mode(dse))
         self._dtype, self._dspace = clusters.meta
 
         # Lower Clusters to a Schedule tree
-        stree = st_build(clusters)
+        with self._profile_compilation('st_build'):
+            stree = st_build(clusters)
 
         # Lower Schedule tree to an Iteration/Expression tree (IET)
-        iet = iet_build(stree)
-        iet, self._profiler = self._profile_sections(iet)
-        iet = self._generate_mpi(iet, **kwargs)
-        iet = self._specialize_iet(iet, **kwargs)
-        iet = iet_insert_C_decls(iet)
-        iet = self._build_casts(iet)
-
-        # Derive parameters as symbols not defined in the kernel itself
-        parameters = self._build_parameters(iet)
+        with self._profile_compilation('iet_build'):
+            iet = iet_build(stree)
+            iet, self._profiler = self._profile_sections(iet)
+        with self._profile_compilation('mpi'):
+            iet = self._generate_mpi(iet, **kwargs)
+        with self._profile_compilation('dle'):
+            iet = self._specialize_iet(iet, **kwargs)
+        with self._profile_compilation('iet_finalize'):
+            iet = iet_insert_C_decls(iet)
+            iet = self._build_casts(iet)
+
+            # Derive parameters as symbols not defined in the kernel itself
+            parameters = self._build_parameters(iet)
 
         # Finish instantiation
         super(Operator, self).__init__(self.name, iet, 'int', parameters, ())
 
     # Compilation
 
+    @contextmanager
+    def _profile_compilation(self, stage):
+        """Track the time and memory spent in the compilation stage ``stage``."""
+        with self._state['compile-timings'], compile_stage(stage):
+            yield
+
     def _apply_substitutions(self, expressions, subs):
         """
         Transform ``expressions`` by: ::
@@ -257,29 +304,32 @@ class Operator(Callable):
         # Process data-carriers (first overrides, then fill up with whatever is needed)
         args = ReducerMap()
         args.update([p._arg_values(**kwargs) for p in self.input if p.name in kwargs])
-        args.update([p._arg_values() for p in self.input if p.name not in args])
+        # Note: the overrides are still visible, as some defaults (e.g., those
+        # of SubFunctions) may depend on them
+        args.update([p._arg_values(**kwargs) for p in self.input if p.name not in args])
         args = args.reduce_all()
 
-        # All DiscreteFunctions should be defined on the same Grid
-        functions = [kwargs.get(p, p) for p in self.input if p.is_DiscreteFunction]
-        mapper = ReducerMap([('grid', i.grid) for i in functions if i.grid])
-        try:
-            grid = mapper.unique('grid')
-        except (KeyError, ValueError):
-            if mapper and configuration['mpi']:
-                raise RuntimeError("Multiple `Grid`s found before `apply`")
-            grid = None
-
-        # Process dimensions (derived go after as they might need/affect their parents)
-        derived, main = split(self.dimensions, lambda i: i.is_Derived)
-        for p in main:
-            args.update(p._arg_values(args, self._dspace[p], grid, **kwargs))
-        for p in derived:
-            args.update(p._arg_values(args, self._dspace[p], grid, **kwargs))
+        # Process dimensions
+        args = self._prepare_dimension_arguments(args, **kwargs)
 
         # Sanity check
         for p in self.input:
             p._arg_check(args, self._dspace[p])
+        for p in self.output:
+            # E.g., a Function whose allocator maps a file read-only; writing
+            # to it from within the generated code would segfault
+            if p.is_DiscreteFunction and not args[p.name].flags.writeable:
+                raise InvalidArgument("Runtime value of `%s` is read-only, but "
+                                      "`%s` is written by the Operator"
+                                      % (p.name, p.name))
+        if self._halo_exchanges is not None:
+            # Likewise, the halo of a read-only Function may not be exchanged
+            for hs in self._halo_exchanges[1]:
+                for f, _, _ in hs:
+                    if not args[f.name].flags.writeable:
+                        raise InvalidArgument("Runtime value of `%s` is read-only, "
+                                              "but its halo is exchanged by the "
+                                              "Operator" % f.name)
 
         # Turn arguments into a format suitable for the generated code
         # E.g., instead of NumPy arrays for Functions, the generated code expects
@@ -308,6 +358,30 @@ class Operator(Callable):
 
         return args
 
+    def _prepare_dimension_arguments(self, args, **kwargs):
+        """
+        Process runtime arguments passed to ``.apply()`` to derive the values
+        of the Dimensions, given the arguments ``args`` of the data-carriers.
+        """
+        # All DiscreteFunctions should be defined on the same Grid
+        functions = [kwargs.get(p, p) for p in self.input if p.is_DiscreteFunction]
+        mapper = ReducerMap([('grid', i.grid) for i in functions if i.grid])
+        try:
+            grid = mapper.unique('grid')
+        except (KeyError, ValueError):
+            if mapper and configuration['mpi']:
+                raise RuntimeError("Multiple `Grid`s found before `apply`")
+            grid = None
+
+        # Process dimensions (derived go after as they might need/affect their parents)
+        derived, main = split(self.dimensions, lambda i: i.is_Derived)
+        for p in main:
+            args.update(p._arg_values(args, self._dspace[p], grid, **kwargs))
+        for p in derived:
+            args.update(p._arg_values(args, self._dspace[p], grid, **kwargs))
+
+        return args
+
     def _postprocess_arguments(self, args, **kwargs):
         """Process runtime arguments upon returning from ``.apply()``."""
         for p in self.output:
@@ -347,7 +421,10 @@ class Operator(Callable):
         Operator, reagardless of how many times this method is invoked.
         """
         if self._lib is None:
-            jit_compile(self._soname, str(self.ccode), self._compiler)
+            with self._profile_compilation('codegen'):
+                code = str(self.ccode)
+            with self._profile_compilation('jit'):
+                jit_compile(self._soname, code, self._compiler)
 
     @property
     def cfunction(self):
@@ -357,6 +434,9 @@ class Operator(Callable):
             self._lib = load(self._soname)
             self._lib.name = self._soname
 
+            if getattr(self, '_opcache_key', None) is not None:
+                opcache.store(self, self._opcache_key, self._opcache_carriers)
+
         if self._cfunction is None:
             self._cfunction = getattr(self._lib, self.name)
             # Associate a C type to each argument for runtime type check
@@ -452,6 +532,111 @@ class Operator(Callable):
         # Output summary of performance achieved
         return self._profile_output(args)
 
+    def apply_async(self, **kwargs):
+        """
+        Execute the Operator asynchronously.
+
+        The runtime arguments are processed in the calling thread, as in
+        ``apply``, while the execution takes place in a separate thread; the
+        generated code runs without holding the GIL, so the calling thread can
+        meanwhile perform other work, such as I/O or NumPy computation.
+
+        Operators accessing the same data are run in submission order: an
+        Operator is only started once all previously submitted Operators writing
+        into the Functions it accesses, or reading from the Functions it writes
+        into, have completed. It is the caller's responsibility not to access
+        the data of a Function while an in-flight Operator is writing into it.
+
+        The runtime arguments are only processed once the conflicting in-flight
+        Operators have completed, as this may access the data of the Functions
+        (e.g., the scattering of the sparse points across the MPI ranks).
+        Autotuning, which requires running the Operator, is not supported.
+
+        An Operator performing MPI communications is run synchronously, in the
+        calling thread, unless MPI was initialized with ``MPI.THREAD_MULTIPLE``
+        support, as otherwise MPI may not be called from another thread.
+
+        Parameters
+        ----------
+        **kwargs
+            Runtime argument overrides, as in ``apply``.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            A Future whose result is the performance summary, as returned
+            by ``apply``.
+
+        Examples
+        --------
+        >>> from devito import Eq, Grid, TimeFunction, Operator
+        >>> grid = Grid(shape=(3, 3))
+        >>> u = TimeFunction(name='u', grid=grid)
+        >>> op = Operator(Eq(u.forward, u + 1))
+        >>> future = op.apply_async(time_M=10)
+        >>> summary = future.result()
+        """
+        if kwargs.get('autotune', False) not in (False, 'off'):
+            raise ValueError("Autotuning is not supported by `apply_async`")
+        kwargs['autotune'] = False
+
+        # The memory accessed by the Operator, that is that of the Functions or
+        # of their runtime overrides. This, rather than the arguments, identify
+        # the dependencies, as the arguments of some Functions (e.g., the
+        # SparseFunctions under MPI) are temporaries built by `arguments`
+        functions = [p for p in self.input if p.is_DiscreteFunction]
+        reads = {buffer_key(kwargs.get(p.name, p)) for p in functions}
+        writes = {buffer_key(kwargs.get(p.name, p)) for p in functions
+                  if p in self.output}
+
+        sync = (any(p.grid is not None and p.grid.distributor.is_parallel
+                    for p in functions) and
+                MPI.Query_thread() < MPI.THREAD_MULTIPLE)
+
+        # Building the arguments may access the data of the Functions
+        wait(async_executor.dependencies(reads, writes))
+        args = self.arguments(**kwargs)
+
+        # Each in-flight Operator needs its own timers
+        args[self._profiler.name] = ctypes.byref(self._profiler.timer.dtype._type_())
+
+        arg_values = [args[p.name] for p in self.parameters]
+        cfunction = self.cfunction
+
+        def run():
+            cfunction(*arg_values)
+            self._postprocess_arguments(args, **kwargs)
+            return self._profile_output(args)
+
+        return async_executor.submit(run, reads, writes, sync=sync)
+
+    def bind(self, **kwargs):
+        """
+        Bind the Operator to a set of runtime arguments, for repeated execution.
+
+        The runtime arguments are processed, validated and converted into C types
+        once and for all, as in ``apply``. The returned :class:`BoundOperator`
+        may then be invoked any number of times at nearly zero Python overhead,
+        which is especially useful for short-running Operators called within a
+        Python loop (e.g., checkpointing, time-stepping drivers).
+
+        Parameters
+        ----------
+        **kwargs
+            Runtime argument overrides, as in ``apply``.
+
+        Examples
+        --------
+        >>> from devito import Eq, Grid, TimeFunction, Operator
+        >>> grid = Grid(shape=(3, 3))
+        >>> u = TimeFunction(name='u', grid=grid)
+        >>> op = Operator(Eq(u.forward, u + 1))
+        >>> bound = op.bind(time_M=0)
+        >>> for i in range(10):
+        ...     bound(time_m=i, time_M=i)
+        """
+        return BoundOperator(self, **kwargs)
+
     def _profile_output(self, args):
         """Produce a performance summary of the profiled sections."""
         summary = self._profiler.summary(args, self._dtype)
@@ -496,6 +681,93 @@ class Operator(Callable):
 
         return summary
 
+    def estimate_memory(self, **kwargs):
+        """
+        Predict the memory footprint, in bytes, of running the Operator on the
+        calling MPI rank, without allocating any data.
+
+        Parameters
+        ----------
+        **kwargs
+            The same runtime arguments that would be passed to ``apply``.
+
+        Returns
+        -------
+        MemoryEstimate
+            The bytes required by each DiscreteFunction, temporary Array and
+            halo exchange buffer. In an MPI context, this is a collective
+            operation, and the total footprint of each rank is also gathered.
+
+        Notes
+        -----
+        The buffers used by the SparseFunctions to route the sparse points to
+        the owning MPI ranks depend on the point coordinates, hence they are
+        not accounted for.
+
+        Examples
+        --------
+        >>> from devito import Eq, Grid, TimeFunction, Operator
+        >>> grid = Grid(shape=(100, 100))
+        >>> u = TimeFunction(name='u', grid=grid, save=20)
+        >>> op = Operator(Eq(u.forward, u + 1))
+        >>> estimate = op.estimate_memory()
+
+        ``u`` takes 20 timesteps of 102x102 float32 values, the halo included
+
+        >>> estimate['functions']['u']
+        832320
+        """
+        # Process data-carriers, without touching their data
+        args = ReducerMap()
+        functions = OrderedDict()
+        padding = 0
+        for p in self.input:
+            if p.is_DiscreteFunction:
+                new = kwargs.get(p.name, p)
+                if isinstance(new, np.ndarray):
+                    for i, s, o in zip(p.indices, new.shape, p.staggered):
+                        size = s + o - sum(p._size_nodomain[i])
+                        args.update(i._arg_defaults(size=size))
+                    functions[p.name] = new.nbytes
+                else:
+                    for i, s, o in zip(p.indices, new.shape, new.staggered):
+                        args.update(i._arg_defaults(_min=0, size=s+o))
+                    itemsize = np.dtype(new.dtype).itemsize
+                    functions[p.name] = reduce(mul, new.shape_allocated, 1)*itemsize
+                    padding += (functions[p.name] -
+                                reduce(mul, new._shape_with_inhalo, 1)*itemsize)
+            elif p.is_Scalar:
+                args.update(p._arg_values(**kwargs))
+        args = args.reduce_all()
+
+        # Process dimensions
+        args = self._prepare_dimension_arguments(args, **kwargs)
+
+        # The temporaries are sized by the Dimension arguments
+        temporaries = OrderedDict()
+        for i in derive_parameters(self):
+            if i.is_Array and (i._mem_heap or i._mem_stack):
+                size = sympify(reduce(mul, i.symbolic_shape, 1))
+                size = size.subs({k: args[k.name] for k in size.free_symbols})
+                temporaries[i.name] = int(size)*np.dtype(i.dtype).itemsize
+
+        # The halo exchange buffers
+        if self._halo_exchanges is not None:
+            heb, exchanges = self._halo_exchanges
+            communication, peak = heb.footprint(exchanges, args)
+        else:
+            communication, peak = None, 0
+
+        estimate = MemoryEstimate(functions, temporaries, communication, padding, peak)
+
+        grids = {i.grid for i in self.input if i.is_DiscreteFunction and i.grid}
+        if len(grids) == 1:
+            distributor = grids.pop().distributor
+            if distributor.is_parallel:
+                estimate.ranks = distributor.comm.allgather(estimate.total)
+
+        return estimate
+
     def __call__(self, **kwargs):
         self.apply(**kwargs)
 
@@ -547,9 +819,237 @@ class Operator(Callable):
             save(self._soname, binary, self._compiler)
 
 
+class BoundOperator(object):
+
+    """
+    An Operator bound to a set of runtime arguments. Use ``Operator.bind``
+    rather than instantiating this class directly.
+
+    Calling a BoundOperator runs the JIT-compiled function with the bound
+    arguments. The minimum and maximum points of the non-distributed Dimensions
+    (e.g., ``time_m`` and ``time_M``) as well as scalar Constants can be changed
+    at call time; these values are patched in place, and only the bounds of
+    the affected Dimensions are re-checked. Any other override triggers a
+    complete re-binding. Overrides are sticky, i.e. they also apply to the
+    subsequent calls.
+    """
+
+    def __init__(self, operator, **kwargs):
+        self.operator = operator
+        self._bind(**kwargs)
+
+    def _bind(self, **kwargs):
+        op = self.operator
+
+        self._kwargs = kwargs
+        self.args = dict(op.arguments(**kwargs))
+
+        # A function pointer without `argtypes`, so that ctypes performs no
+        # type checking/conversion at every call
+        op.cfunction
+        self._cfunction = op._lib[op.name]
+
+        # Convert all scalars into C types once and for all. The values of the
+        # patchable scalars will later be overwritten in place
+        self._cargs = []
+        scalars = {}
+        for p in op.parameters:
+            v = self.args[p.name]
+            if isinstance(v, Number):
+                v = p._C_ctype(v)
+                scalars[p.name] = v
+            self._cargs.append(v)
+
+        grids = {p.grid for p in op.input if p.is_DiscreteFunction and p.grid}
+        grid = grids.pop() if len(grids) == 1 else None
+
+        # The (size, interval) pairs to check the Dimension bounds against
+        checks = {}
+        for p in op.input:
+            if not p.is_DiscreteFunction:
+                continue
+            intervals = op._dspace[p]
+            shape = p._C_as_ndarray(self.args[p.name]).shape
+            for d, s in zip(p.indices, shape):
+                checks.setdefault(d, []).append((s, intervals[d]))
+
+        # The patchable scalars, as `name -> (ctypes obj, arg name, dimension,
+        # checks)` entries; `d=v` is a shortcut for `d_M=v`, as in `apply`
+        self._patchable = {}
+        for d in op.dimensions:
+            if d.is_Derived or (grid is not None and grid.is_distributed(d)):
+                continue
+            if d.min_name in scalars and d.max_name in scalars:
+                for k, v in [(d.min_name, d.min_name), (d.max_name, d.max_name),
+                             (d.name, d.max_name)]:
+                    self._patchable[k] = (scalars[v], v, d, checks.get(d))
+        for p in op.input:
+            if p.is_Constant and p.name in scalars:
+                self._patchable[p.name] = (scalars[p.name], p.name, None, None)
+
+        # The objects to be post-processed upon returning from the C function
+        self._outputs = [(p, p.name) for p in op.output]
+
+        # Under MPI, the SparseFunctions must be re-distributed at every call,
+        # which may also change the Dimension bounds, so all arguments must
+        # be re-derived
+        self._rebind = (grid is not None and grid.distributor.nprocs > 1 and
+                        any(p.is_SparseFunction for p in op.input))
+
+    def __call__(self, **kwargs):
+        op = self.operator
+
+        if self._rebind:
+            self._bind(**{**self._kwargs, **kwargs})
+        elif kwargs:
+            if all(k in self._patchable and isinstance(v, Number)
+                   for k, v in kwargs.items()):
+                self._patch(**kwargs)
+            else:
+                # Not just scalar overrides, resort to a complete re-binding
+                self._bind(**{**self._kwargs, **kwargs})
+
+        # Reset the profiler timers
+        op._profiler.timer.reset()
+
+        self._cfunction(*self._cargs)
+
+        # Post-process runtime arguments (e.g., gather sparse data under MPI)
+        for p, k in self._outputs:
+            p._arg_apply(self.args[k], self._kwargs.get(k))
+
+    def _patch(self, **kwargs):
+        values = {self._patchable[k][1]: v for k, v in kwargs.items()}
+
+        # Check the new Dimension bounds before patching anything
+        for k in kwargs:
+            _, _, d, checks = self._patchable[k]
+            if checks:
+                bounds = {i: values.get(i, self.args[i]) for i in
+                          (d.min_name, d.max_name)}
+                for s, interval in checks:
+                    d._arg_check(bounds, s, interval)
+
+        for k, v in kwargs.items():
+            obj, name, _, _ = self._patchable[k]
+            obj.value = v
+            self.args[name] = v
+        self._kwargs.update(values)
+
+    @property
+    def summary(self):
+        """A performance summary of the most recent call."""
+        return self.operator._profiler.summary(self.args, self.operator._dtype)
+
+
+class AsyncExecutor(object):
+
+    """
+    A pool of threads to run Operators asynchronously.
+
+    Operators accessing the same data are serialized: an Operator writing into
+    some data is run only after all previously submitted Operators accessing
+    the same data have completed, while an Operator reading some data is
+    run only after all previously submitted Operators writing into it.
+
+    Parameters
+    ----------
+    max_workers : int, optional
+        The maximum number of Operators running concurrently. Defaults to the
+        number of available cores.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor = None
+        self._lock = threading.Lock()
+        # Map the accessed data to the in-flight `(future, is_write)` accessing them
+        self._inflight = {}
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    def dependencies(self, reads, writes):
+        """
+        The in-flight Futures that an Operator reading from ``reads`` and writing
+        into ``writes`` depends on.
+        """
+        with self._lock:
+            return self._dependencies(reads, writes)
+
+    def _dependencies(self, reads, writes):
+        # Drop the completed accesses
+        for k, v in list(self._inflight.items()):
+            v = [(f, w) for f, w in v if not f.done()]
+            if v:
+                self._inflight[k] = v
+            else:
+                self._inflight.pop(k)
+
+        deps = {f for k in writes for f, _ in self._inflight.get(k, [])}
+        deps.update(f for k in reads for f, w in self._inflight.get(k, []) if w)
+        return deps
+
+    def submit(self, func, reads, writes, sync=False):
+        """
+        Schedule the execution of ``func``, which reads from and writes into the
+        data identified by ``reads`` and ``writes``, respectively. If ``sync`` is
+        True, ``func`` is rather run in the calling thread, as soon as its
+        dependencies have completed, and the returned Future is already done.
+        """
+        with self._lock:
+            deps = self._dependencies(reads, writes)
+
+            if sync:
+                future = Future()
+            else:
+                # Since the work queue is FIFO, all `deps` are either running or
+                # completed by the time `func` is picked up by a worker, so no
+                # deadlock
+                future = self.executor.submit(self._run, func, deps)
+
+            for k in reads | writes:
+                self._inflight.setdefault(k, []).append((future, k in writes))
+
+        if sync:
+            try:
+                future.set_result(self._run(func, deps))
+            except Exception as e:
+                future.set_exception(e)
+
+        return future
+
+    @staticmethod
+    def _run(func, deps):
+        wait(deps)
+        return func()
+
+
+async_executor = AsyncExecutor()
+"""The executor of ``Operator.apply_async``."""
+
+
 # Misc helpers
 
 
+def buffer_key(obj):
+    """
+    A key identifying the memory underlying ``obj``, a DiscreteFunction or a
+    NumPy array. Objects aliasing the same memory have the same key.
+    """
+    if not isinstance(obj, np.ndarray):
+        if obj._data is None:
+            # Allocate the memory, which no in-flight Operator may be accessing
+            obj._data_buffer
+        obj = obj._data
+    while isinstance(obj, np.ndarray) and obj.base is not None:
+        obj = obj.base
+    return id(obj)
+
+
 def set_dse_mode(mode):
     if not mode:
         return 'noop'
@@ -112,6 +112,7 @@ env_vars_mapper = {
     'DEVITO_ISA': 'isa',
     'DEVITO_PLATFORM': 'platform',
     'DEVITO_PROFILING': 'profiling',
+    'DEVITO_PROFILING_MEMORY': 'profiling-memory',
     'DEVITO_BACKEND': 'backend',
     'DEVITO_CODEGEN': 'codegen',
     'DEVITO_DEVELOP': 'develop-mode',
@@ -120,11 +121,14 @@ env_vars_mapper = {
     'DEVITO_DLE_OPTIONS': 'dle-options',
     'DEVITO_OPENMP': 'openmp',
     'DEVITO_MPI': 'mpi',
+    'DEVITO_HALO_DEPTH': 'halo-depth',
     'DEVITO_AUTOTUNING': 'autotuning',
     'DEVITO_LOGGING': 'log-level',
     'DEVITO_FIRST_TOUCH': 'first-touch',
     'DEVITO_DEBUG_COMPILER': 'debug-compiler',
-    'DEVITO_IGNORE_UNKNOWN_PARAMS': 'ignore-unknowns'
+    'DEVITO_IGNORE_UNKNOWN_PARAMS': 'ignore-unknowns',
+    'DEVITO_OPCACHE': 'opcache',
+    'DEVITO_ALLOCATOR': 'allocator'
 }
 
 
@@ -204,10 +208,11 @@ class switchconfig(object):
             for k, v in self.params.items():
                 previous[k] = configuration[k]
                 configuration[k] = v
-            result = func(*args, **kwargs)
-            for k, v in self.params.items():
-                configuration[k] = previous[k]
-            return result
+            try:
+                return func(*args, **kwargs)
+            finally:
+                for k, v in self.params.items():
+                    configuration[k] = previous[k]
         return wrapper
 
 
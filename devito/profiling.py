@@ -1,9 +1,13 @@
 from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
 from ctypes import c_double
 from functools import reduce
 from operator import mul
 from pathlib import Path
+from time import time
 import os
+import threading
+import tracemalloc
 
 from cached_property import cached_property
 
@@ -16,7 +20,8 @@ from devito.symbolics import estimate_cost
 from devito.tools import flatten
 from devito.types import CompositeObject
 
-__all__ = ['Timer', 'create_profile']
+__all__ = ['Timer', 'CompilationProfile', 'MemoryEstimate', 'create_profile',
+           'compilation_profile']
 
 
 class Profiler(object):
@@ -233,6 +238,253 @@ PerfEntry = namedtuple('PerfEntry', 'time gflopss gpointss oi ops itershapes')
 """Runtime profiling data for a :class:`Section`."""
 
 
+class CompilationProfile(OrderedDict):
+
+    """
+    A special dictionary to track the time and memory spent in the various
+    stages of the compilation of one or more Operators -- e.g., clusterization,
+    each DSE and DLE pass, code generation, JIT compilation.
+
+    Each stage is mapped to an OrderedDict with the cumulative wall time
+    (``time``), the number of invocations (``calls``), and the peak memory
+    allocated over the stage, as traced by ``tracemalloc``, in bytes
+    (``memory``). The peak memory is only tracked if
+    ``configuration['profiling-memory']`` is set, and is 0 otherwise. For the
+    DSE passes, the number of expressions (``exprs-before``, ``exprs-after``)
+    and the operation count (``ops-before``, ``ops-after``) before and after
+    the pass are also tracked. A stage invoked several times (e.g., a DSE pass
+    applied to multiple Clusters) has its values accumulated, except for the
+    peak memory, of which the largest is retained.
+
+    A CompilationProfile can be used as a context manager, in which case all
+    stages entered via ``compile_stage`` get recorded into it.
+    """
+
+    _active = threading.local()
+
+    def add(self, stage, elapsed, memory, **counts):
+        entry = self.setdefault(stage, OrderedDict([('time', 0.), ('calls', 0),
+                                                    ('memory', 0)]))
+        entry['time'] += elapsed
+        entry['calls'] += 1
+        entry['memory'] = max(entry['memory'], memory)
+        for k, v in counts.items():
+            entry[k] = entry.get(k, 0) + v
+
+    def merge(self, other):
+        """Accumulate the stages of ``other`` into self."""
+        for stage, entry in other.items():
+            mine = self.setdefault(stage, OrderedDict([('time', 0.), ('calls', 0),
+                                                       ('memory', 0)]))
+            for k, v in entry.items():
+                mine[k] = max(mine[k], v) if k == 'memory' else mine.get(k, 0) + v
+
+    @property
+    def timings(self):
+        return OrderedDict([(k, v['time']) for k, v in self.items()])
+
+    def report(self):
+        """A human-readable table of the tracked stages."""
+        rows = ["%-40s %10s %6s %10s %s" % ('stage', 'time [s]', 'calls',
+                                            'mem [MB]', 'counts')]
+        for stage, entry in self.items():
+            counts = ", ".join("%s=%s" % (k, v) for k, v in entry.items()
+                               if k not in ('time', 'calls', 'memory'))
+            rows.append("%-40s %10.3f %6d %10.1f %s" % (stage, entry['time'],
+                                                        entry['calls'],
+                                                        entry['memory']/2**20,
+                                                        counts))
+        return "\n".join(rows)
+
+    @classmethod
+    def active(cls):
+        """The CompilationProfiles currently tracking compilation stages."""
+        try:
+            return cls._active.stack
+        except AttributeError:
+            cls._active.stack = []
+            return cls._active.stack
+
+    def __enter__(self):
+        self.active().append(self)
+        return self
+
+    def __exit__(self, *args):
+        self.active().remove(self)
+
+
+compilation_profile = CompilationProfile()
+"""The process-wide aggregated compilation profile."""
+
+
+class MemoryEstimate(OrderedDict):
+
+    """
+    A special dictionary to track the predicted memory footprint, in bytes, of
+    an Operator run on the calling MPI rank.
+
+    Three categories are tracked, each of which is mapped to an OrderedDict from
+    object names to bytes:
+
+        * ``functions``, the data of the DiscreteFunctions, including the halo
+          and the padding as well as all of the timesteps of the saved
+          TimeFunctions;
+        * ``temporaries``, the Arrays allocated by the Operator itself, such as
+          those introduced by the DSE;
+        * ``communication``, the buffers of the MPI halo exchanges, at their
+          peak, for each of the DiscreteFunctions exchanged.
+
+    In an MPI context, ``ranks`` is the total footprint of each rank.
+    """
+
+    def __init__(self, functions=None, temporaries=None, communication=None,
+                 padding=0, peak_communication=None, ranks=None):
+        super(MemoryEstimate, self).__init__()
+        self['functions'] = OrderedDict(functions or [])
+        self['temporaries'] = OrderedDict(temporaries or [])
+        self['communication'] = OrderedDict(communication or [])
+        self.padding = padding
+        if peak_communication is None:
+            peak_communication = sum(self['communication'].values())
+        self.peak_communication = peak_communication
+        self.ranks = ranks or [self.total]
+
+    @property
+    def functions(self):
+        return sum(self['functions'].values())
+
+    @property
+    def temporaries(self):
+        return sum(self['temporaries'].values())
+
+    @property
+    def communication(self):
+        """The peak size of all of the halo exchange buffers."""
+        return self.peak_communication
+
+    @property
+    def total(self):
+        return self.functions + self.temporaries + self.communication
+
+    def report(self):
+        """A human-readable table of the predicted memory footprint."""
+        rows = ["%-40s %12s" % ('object', 'size [MB]')]
+        for category, entries in self.items():
+            for k, v in entries.items():
+                rows.append("%-40s %12.1f" % ('%s/%s' % (category, k), v/2**20))
+        rows.append("%-40s %12.1f" % ('of which padding', self.padding/2**20))
+        rows.append("%-40s %12.1f" % ('total', self.total/2**20))
+        if len(self.ranks) > 1:
+            rows.append("%-40s %12.1f" % ('total, busiest rank', max(self.ranks)/2**20))
+        return "\n".join(rows)
+
+
+class PeakMemory(object):
+
+    """
+    Track, through ``tracemalloc``, the peak memory allocated within a region
+    of code, in bytes. Regions may be nested, in which case the peak of the
+    enclosing region accounts for the nested ones.
+
+    Memory is only tracked if ``configuration['profiling-memory']`` is set;
+    otherwise, a PeakMemory is a no-op and its ``peak`` is 0. Tracing is started
+    on entering the first region, unless already active, and only stopped if it
+    was started here; a tracing session started elsewhere is never stopped,
+    restarted or reset. Within such a session, the peak reached since the last
+    region boundary is only observed if it exceeds all of the previous ones,
+    otherwise the memory traced at the boundary is used as a lower bound.
+
+    Memory allocated before entering a region, and released within it, is not
+    accounted for. The nesting of the regions is tracked per thread, while the
+    traced memory is process-wide, so regions entered by concurrent threads
+    account for each other's allocations.
+    """
+
+    _local = threading.local()
+    _lock = threading.Lock()
+    _owned = False
+    _users = 0
+
+    def __init__(self):
+        self.enabled = bool(configuration['profiling-memory'])
+        self.offset = 0
+        self.peak = 0
+
+    @classmethod
+    def _state(cls):
+        try:
+            return cls._local.state
+        except AttributeError:
+            cls._local.state = {'stack': [], 'base': 0, 'hwm': 0}
+            return cls._local.state
+
+    @classmethod
+    def _fold(cls):
+        state = cls._state()
+        current, peak = tracemalloc.get_traced_memory()
+        hwm = peak
+        if peak <= state['hwm']:
+            # The peak wasn't reached since the last fold
+            peak = current
+        for i in state['stack']:
+            i.peak = max(i.peak, i.offset + peak - state['base'])
+            i.offset += current - state['base']
+        if cls._owned and hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+            hwm = current
+        state['base'] = current
+        state['hwm'] = hwm
+
+    def __enter__(self):
+        if not self.enabled:
+            return self
+        with PeakMemory._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                PeakMemory._owned = True
+            if PeakMemory._owned:
+                PeakMemory._users += 1
+            self._fold()
+        self._state()['stack'].append(self)
+        return self
+
+    def __exit__(self, *args):
+        if not self.enabled:
+            return
+        with PeakMemory._lock:
+            self._fold()
+            self._state()['stack'].remove(self)
+            if PeakMemory._owned:
+                PeakMemory._users -= 1
+                if PeakMemory._users == 0:
+                    tracemalloc.stop()
+                    PeakMemory._owned = False
+
+
+def record_compile_stage(stage, elapsed, memory, **counts):
+    """
+    Record the time and peak memory spent in a compilation stage into the
+    innermost active CompilationProfile, if any, as well as into the
+    process-wide ``compilation_profile``.
+    """
+    active = CompilationProfile.active()
+    if active:
+        active[-1].add(stage, elapsed, memory, **counts)
+    compilation_profile.add(stage, elapsed, memory, **counts)
+
+
+@contextmanager
+def compile_stage(stage):
+    """Track the time and peak memory spent in a compilation stage."""
+    tic = time()
+    memory = PeakMemory()
+    try:
+        with memory:
+            yield
+    finally:
+        record_compile_stage(stage, time() - tic, memory.peak)
+
+
 def create_profile(name):
     """Create a new :class:`Profiler`."""
     if configuration['log-level'] == 'DEBUG':
@@ -258,6 +510,7 @@ profiler_registry = {
     'advisor': AdvisorProfiler
 }
 configuration.add('profiling', 'basic', list(profiler_registry), impacts_jit=False)
+configuration.add('profiling-memory', 0, [0, 1], lambda i: bool(i), False)
 
 
 def locate_intel_advisor():
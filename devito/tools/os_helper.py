@@ -24,13 +24,14 @@ class change_directory(object):
         os.chdir(self.savedPath)
 
 
-def make_tempdir(prefix=None):
+def make_tempdir(prefix=None, mode=0o777):
     """Create a temporary directory having a deterministic name. The directory
-    is created within the default OS temporary directory."""
+    is created within the default OS temporary directory, with permissions
+    ``mode`` (modified by the umask), unless it already exists."""
     if prefix is None:
         name = 'devito-uid%s' % os.getuid()
     else:
         name = 'devito-%s-uid%s' % (str(prefix), os.getuid())
     tmpdir = Path(gettempdir()).joinpath(name)
-    tmpdir.mkdir(parents=True, exist_ok=True)
+    tmpdir.mkdir(mode=mode, parents=True, exist_ok=True)
     return tmpdir
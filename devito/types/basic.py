@@ -4,7 +4,7 @@ import gc
 from collections import namedtuple
 from operator import mul
 from functools import reduce
-from ctypes import POINTER, Structure, byref
+from ctypes import Array as CArray, POINTER, Structure, byref
 
 import numpy as np
 import sympy
@@ -924,7 +924,14 @@ class CompositeObject(Object):
 
     @cached_property
     def _C_typedecl(self):
-        return Struct(self.pname, [Value(ctypes_to_cstr(j), i) for i, j in self.pfields])
+        fields = []
+        for i, j in self.pfields:
+            if issubclass(j, CArray):
+                # A fixed-size array, e.g. `int field[4]`
+                fields.append(Value(ctypes_to_cstr(j._type_), '%s[%d]' % (i, j._length_)))
+            else:
+                fields.append(Value(ctypes_to_cstr(j), i))
+        return Struct(self.pname, fields)
 
     # Pickling support
     _pickle_args = ['name', 'pname', 'pfields']
@@ -1,6 +1,8 @@
 from collections import namedtuple
 from ctypes import POINTER, Structure, c_void_p, c_int, cast, byref
 from functools import wraps
+import io
+import os
 
 import numpy as np
 from psutil import virtual_memory
@@ -90,6 +92,12 @@ class DiscreteFunction(AbstractCachedFunction, ArgProvider):
                 debug("Allocating memory for %s%s" % (self.name, self.shape_allocated))
                 self._data = Data(self.shape_allocated, self.dtype,
                                   modulo=self._mask_modulo, allocator=self._allocator)
+                if self._allocator.preserves_data:
+                    # E.g., a reopened memory-mapped file -- the allocated memory
+                    # already carries the data values
+                    if self._allocator.is_readonly:
+                        self._data.setflags(write=False)
+                    return func(self)
                 if self._first_touch:
                     assign(self, 0)
                 if callable(self._initializer):
@@ -527,6 +535,168 @@ class DiscreteFunction(AbstractCachedFunction, ArgProvider):
             return tuple(self._distributor.glb_slices.get(d, slice(0, s))
                          for s, d in zip(self.shape, self.dimensions))
 
+    def from_file(self, filename):
+        """
+        Load the domain data values from a file.
+
+        Parameters
+        ----------
+        filename : str
+            The file, either a ``.npy`` file or a raw binary file storing an
+            array of shape ``shape_global`` and type ``dtype`` in row-major
+            format.
+
+        Notes
+        -----
+        In an MPI context, this method must be called by all ranks. Each rank
+        reads its own subdomain only, through collective MPI-IO; hence, the
+        global array is never materialized.
+        """
+        self._from_file(filename)
+
+    def to_file(self, filename):
+        """
+        Save the domain data values to a file.
+
+        Parameters
+        ----------
+        filename : str
+            The file. If the extension is ``.npy``, the NumPy format is used,
+            otherwise the data values are written in raw binary format, as an
+            array of shape ``shape_global`` in row-major format.
+
+        Notes
+        -----
+        In an MPI context, this method must be called by all ranks. Each rank
+        writes its own subdomain only, through collective MPI-IO.
+        """
+        self._to_file(filename)
+
+    def _from_file(self, filename, index=()):
+        """
+        Load the domain data values from a file. If ``index`` is supplied, the
+        file rather provides the data values of ``self.data[index]``.
+        """
+        shape = self.shape_global[len(index):]
+        distributor = self._distributor
+        if distributor is not None and distributor.is_parallel:
+            # Rank 0 inspects the file, then all ranks read their subdomain
+            # through a collective MPI-IO call. Any failure on rank 0 is
+            # broadcast, so that it is raised by all ranks
+            if distributor.myrank == 0:
+                try:
+                    info = self._inspect_file(filename, shape)
+                except Exception as e:
+                    info = e
+            else:
+                info = None
+            info = distributor.comm.bcast(info, root=0)
+            if isinstance(info, Exception):
+                raise info
+            fshape, fortran_order, dtype, offset = info
+            if fortran_order:
+                raise ValueError("`%s` must be in row-major format" % filename)
+            if fshape != shape:
+                raise ValueError("`%s` has shape %s, expected %s" %
+                                 (filename, fshape, shape))
+            array = np.empty(self.data_ro_domain._local[index].shape, dtype=dtype)
+            fh = MPI.File.Open(distributor.comm, str(filename), MPI.MODE_RDONLY)
+            filetype = self._make_file_view(fh, shape, offset, dtype, index)
+            fh.Read_all(array)
+            filetype.Free()
+            fh.Close()
+        else:
+            if str(filename).endswith('.npy'):
+                array = np.load(filename, mmap_mode='r')
+            else:
+                array = np.memmap(filename, dtype=self.dtype, mode='r')
+                if array.size == np.prod(shape):
+                    array = array.reshape(shape)
+            if array.shape != shape:
+                raise ValueError("`%s` has shape %s, expected %s" %
+                                 (filename, array.shape, shape))
+            array = array[self.local_indices[len(index):]]
+        self.data._local[index] = array
+
+    def _inspect_file(self, filename, shape):
+        """
+        Retrieve the shape, the ordering, the type and the offset of the data
+        values stored in a file.
+        """
+        if str(filename).endswith('.npy'):
+            with open(filename, 'rb') as f:
+                version = np.lib.format.read_magic(f)
+                if version == (1, 0):
+                    header = np.lib.format.read_array_header_1_0(f)
+                else:
+                    header = np.lib.format.read_array_header_2_0(f)
+                fshape, fortran_order, dtype = header
+                offset = f.tell()
+        else:
+            dtype = np.dtype(self.dtype)
+            offset = 0
+            fortran_order = False
+            nbytes = os.path.getsize(filename)
+            fshape = shape if nbytes == np.prod(shape)*dtype.itemsize else\
+                (nbytes // dtype.itemsize,)
+        return fshape, fortran_order, dtype, offset
+
+    def _to_file(self, filename, index=()):
+        """
+        Save the domain data values to a file. If ``index`` is supplied, only
+        the data values of ``self.data[index]`` are saved.
+        """
+        shape = self.shape_global[len(index):]
+        distributor = self._distributor
+        if distributor is not None and distributor.is_parallel:
+            # Rank 0 writes the header, if any, then all ranks write their
+            # subdomain through a collective MPI-IO call
+            dtype = np.dtype(self.dtype)
+            if str(filename).endswith('.npy'):
+                header = io.BytesIO()
+                np.lib.format.write_array_header_1_0(header, {
+                    'descr': np.lib.format.dtype_to_descr(dtype),
+                    'fortran_order': False,
+                    'shape': shape
+                })
+                header = header.getvalue()
+            else:
+                header = b''
+            fh = MPI.File.Open(distributor.comm, str(filename),
+                               MPI.MODE_WRONLY | MPI.MODE_CREATE)
+            # Drop any previous content
+            fh.Set_size(0)
+            if distributor.myrank == 0 and header:
+                fh.Write_at(0, header)
+            filetype = self._make_file_view(fh, shape, len(header), dtype, index)
+            fh.Write_all(np.ascontiguousarray(self.data_ro_domain._local[index]))
+            filetype.Free()
+            fh.Close()
+        else:
+            if str(filename).endswith('.npy'):
+                array = np.lib.format.open_memmap(filename, mode='w+',
+                                                  dtype=self.dtype, shape=shape)
+            else:
+                array = np.memmap(filename, dtype=self.dtype, mode='w+', shape=shape)
+            array[:] = self.data_ro_domain._local[index]
+            array.flush()
+            del array
+
+    def _make_file_view(self, fh, shape, offset, dtype, index=()):
+        """
+        Restrict the MPI file handle ``fh``, which stores an array of shape
+        ``shape`` starting at byte ``offset``, to the subdomain of the calling
+        rank. Return the MPI datatype describing the subdomain, which must be
+        freed by the caller once done.
+        """
+        etype = MPI._typedict[np.dtype(dtype).char]
+        starts = [i.start for i in self.local_indices[len(index):]]
+        subsizes = self.data_ro_domain._local[index].shape
+        filetype = etype.Create_subarray(shape, subsizes, starts, order=MPI.ORDER_C)
+        filetype.Commit()
+        fh.Set_view(offset, etype, filetype)
+        return filetype
+
     @cached_property
     def space_dimensions(self):
         """Tuple of Dimensions defining the physical space."""
@@ -591,6 +761,10 @@ class DiscreteFunction(AbstractCachedFunction, ArgProvider):
         """
         dataobj = byref(self._C_ctype._type_())
         dataobj._obj.data = data.ctypes.data_as(c_void_p)
+        # The dataobj only carries a raw pointer, so `data` must be kept alive
+        # for as long as the dataobj is in use (e.g., `data` may be a temporary,
+        # such as the sparse data scattered across the MPI ranks)
+        dataobj._obj._data = data
         dataobj._obj.size = (c_int*self.ndim)(*data.shape)
         # MPI-related fields
         dataobj._obj.npsize = (c_int*self.ndim)(*[i - sum(j) for i, j in
@@ -657,6 +831,11 @@ class DiscreteFunction(AbstractCachedFunction, ArgProvider):
         if MPI.COMM_WORLD.size > 1 and self._distributor is None:
             raise RuntimeError("`%s` cannot perform a halo exchange as it has "
                                "no Grid attached" % self.name)
+        if self._data is not None and not self._data.flags.writeable:
+            # E.g., a file mapped read-only. The data can't be modified, so the
+            # halo is never dirty, and it retains the values stored in the file
+            self._is_halo_dirty = False
+            return
         if self._in_flight:
             raise RuntimeError("`%s` cannot initiate a halo exchange as previous "
                                "exchanges are still in flight" % self.name)
@@ -952,7 +1131,18 @@ class Function(DiscreteFunction, Differentiable):
                 halo = (left_points, right_points)
             else:
                 raise TypeError("`space_order` must be int or 3-tuple of ints")
-            return tuple(halo if i.is_Space else (0, 0) for i in self.indices)
+            # With MPI, a deeper halo along the distributed Dimensions, if
+            # requested, allows less frequent halo exchanges (see `mpi='wide'`)
+            grid = kwargs.get('grid')
+            if isinstance(space_order, int) and grid is not None and \
+                    grid.distributor.is_parallel:
+                deep = tuple(i*configuration['halo-depth'] for i in halo)
+                distributed = grid.distributor.dimensions
+            else:
+                deep = halo
+                distributed = ()
+            return tuple((0, 0) if not i.is_Space else deep if i in distributed
+                         else halo for i in self.indices)
 
     def __padding_setup__(self, **kwargs):
         padding = kwargs.get('padding', 0)
@@ -1219,6 +1409,37 @@ class TimeFunction(Function):
     def _time_buffering_default(self):
         return self._time_buffering and not isinstance(self.save, Buffer)
 
+    def from_file(self, filename, time=None):
+        """
+        Load the domain data values from a file.
+
+        Parameters
+        ----------
+        filename : str
+            The file, either a ``.npy`` file or a raw binary file storing an
+            array in row-major format.
+        time : int, optional
+            If supplied, the file provides a single snapshot, that is an array
+            of shape ``shape_global[1:]``, which is loaded into ``data[time]``.
+            Otherwise, the file provides all of the time slots.
+        """
+        self._from_file(filename, () if time is None else (time,))
+
+    def to_file(self, filename, time=None):
+        """
+        Save the domain data values to a file.
+
+        Parameters
+        ----------
+        filename : str
+            The file. If the extension is ``.npy``, the NumPy format is used,
+            otherwise the data values are written in raw binary format.
+        time : int, optional
+            If supplied, only the snapshot ``data[time]`` is saved. Otherwise,
+            all of the time slots are saved.
+        """
+        self._to_file(filename, () if time is None else (time,))
+
     def _arg_check(self, args, intervals):
         super(TimeFunction, self)._arg_check(args, intervals)
         key_time_size = args[self.name].shape[self._time_position]
@@ -1252,7 +1473,8 @@ class SubFunction(Function):
             raise RuntimeError("`%s` is a SubFunction, so it can't be assigned "
                                "a value dynamically" % self.name)
         else:
-            return self._parent._arg_defaults(alias=self._parent).reduce_all()
+            return self._parent._arg_defaults(alias=self._parent,
+                                              subfuncs_only=True).reduce_all()
 
     @property
     def parent(self):
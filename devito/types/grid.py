@@ -44,6 +44,21 @@ class Grid(ArgProvider):
     comm : MPI communicator, optional
         The set of processes over which the grid is distributed. Only relevant in
         case of MPI execution.
+    topology : tuple of ints or str, optional
+        The number of MPI processes along each dimension. If ``'auto'``, the
+        topology minimising the halo traffic is selected. Only relevant in case
+        of MPI execution.
+    cost : tuple of array_like or array_like, optional
+        The computational cost of each grid point, used to balance the load
+        across the MPI processes (e.g., the points in an absorbing boundary layer
+        may be more expensive than those in the physical domain). Preferably a
+        tuple with one 1D array for each dimension, as the cost of the points
+        along that dimension; alternatively, an array of shape ``shape``. Only
+        relevant in case of MPI execution.
+    radius : int or tuple of ints, optional
+        The stencil radius along each dimension (e.g., half the space order),
+        used to predict the halo traffic when selecting the topology. Defaults
+        to 1. Only relevant in case of MPI execution.
 
     Examples
     --------
@@ -95,7 +110,7 @@ class Grid(ArgProvider):
 
     def __init__(self, shape, extent=None, origin=None, dimensions=None,
                  time_dimension=None, dtype=np.float32, subdomains=None,
-                 comm=None):
+                 comm=None, topology=None, cost=None, radius=1):
         self._shape = as_tuple(shape)
         self._extent = as_tuple(extent or tuple(1. for _ in self.shape))
         self._dtype = dtype
@@ -135,7 +150,12 @@ class Grid(ArgProvider):
         else:
             raise ValueError("`time_dimension` must be None or of type TimeDimension")
 
-        self._distributor = Distributor(self.shape, self.dimensions, comm)
+        # The domain decomposition is recomputed upon unpickling
+        self._topology = topology
+        self._cost = cost
+        self._radius = radius
+        self._distributor = Distributor(self.shape, self.dimensions, comm,
+                                        topology, cost, radius)
 
     def __repr__(self):
         return "Grid[extent=%s, shape=%s, dimensions=%s]" % (
@@ -274,7 +294,9 @@ class Grid(ArgProvider):
     def __setstate__(self, state):
         for k, v in state.items():
             setattr(self, k, v)
-        self._distributor = Distributor(self.shape, self.dimensions)
+        self._distributor = Distributor(self.shape, self.dimensions,
+                                        topology=self._topology, cost=self._cost,
+                                        radius=self._radius)
 
 
 class SubDomain(object):
@@ -1,4 +1,5 @@
 from collections import OrderedDict
+from functools import wraps
 from itertools import product
 
 import sympy
@@ -11,7 +12,7 @@ from devito.finite_differences import Differentiable, generate_fd_shortcuts
 from devito.logger import warning
 from devito.mpi import MPI, SparseDistributor
 from devito.symbolics import indexify, retrieve_function_carriers
-from devito.tools import (ReducerMap, flatten, prod, powerset,
+from devito.tools import (ReducerMap, as_tuple, flatten, prod, powerset,
                           filter_ordered, memoized_meth)
 from devito.types.dense import DiscreteFunction, Function, SubFunction
 from devito.types.dimension import Dimension, ConditionalDimension, DefaultDimension
@@ -21,6 +22,22 @@ __all__ = ['SparseFunction', 'SparseTimeFunction', 'PrecomputedSparseFunction',
            'PrecomputedSparseTimeFunction']
 
 
+def _dist_cached(func):
+    """
+    Decorator. Cache the value of a property describing how the sparse points
+    are routed across the MPI ranks. The cache is dropped by ``_dist_refresh``
+    once the sparse points have moved.
+    """
+    @wraps(func)
+    def wrapper(self):
+        try:
+            return self._dist_plan[func.__name__]
+        except KeyError:
+            ret = self._dist_plan[func.__name__] = func(self)
+            return ret
+    return property(wrapper)
+
+
 class AbstractSparseFunction(DiscreteFunction, Differentiable):
 
     """
@@ -42,6 +59,15 @@ class AbstractSparseFunction(DiscreteFunction, Differentiable):
             self._npoint = kwargs['npoint']
             self._space_order = kwargs.get('space_order', 0)
 
+            # The MPI routing plan, computed lazily and cached until the sparse
+            # points move; see `_dist_refresh`
+            self._dist_plan = {}
+            self._dist_snapshot = None
+
+            # The colouring of the sparse points, computed lazily and cached
+            # until the sparse points move; see `_colouring_data`
+            self._colouring_cache = None
+
             # Dynamically add derivative short-cuts
             self._fd = generate_fd_shortcuts(self)
 
@@ -66,6 +92,19 @@ class AbstractSparseFunction(DiscreteFunction, Differentiable):
             shape = (glb_npoint[grid.distributor.myrank],)
         return shape
 
+    def __distributor_setup__(self, **kwargs):
+        """
+        A `SparseDistributor` handles the SparseFunction decomposition based on
+        physical ownership, and allows to convert between global and local indices.
+        """
+        return SparseDistributor(kwargs['npoint'], self._sparse_dim,
+                                 kwargs['grid'].distributor)
+
+    @cached_property
+    def _decomposition(self):
+        mapper = {self._sparse_dim: self._distributor.decomposition[self._sparse_dim]}
+        return tuple(mapper.get(d) for d in self.dimensions)
+
     @property
     def npoint(self):
         return self.shape[self._sparse_position]
@@ -105,18 +144,92 @@ class AbstractSparseFunction(DiscreteFunction, Differentiable):
         return ret
 
     @property
+    def _colouring_extent(self):
+        """
+        The number of grid points, along each Dimension, touched by the injection
+        of a single sparse point, or None if self's sparse points cannot be
+        coloured.
+        """
+        return None
+
+    def _colouring_gridpoints(self):
+        """
+        The *reference* grid point of each sparse point seen by the calling MPI
+        rank, as an array of shape ``(npoint, grid.dim)``.
+        """
+        raise NotImplementedError
+
+    @cached_property
+    def _colouring(self):
+        """
+        The SubFunctions describing a colouring of the sparse points, that is
+        a partitioning of the sparse points such that the injection supports of
+        two points with the same colour never overlap. The points of colour ``c``
+        are ``points[offsets[c]:offsets[c+1]]``.
+        """
+        points = ColouringFunction(name='%s_colour_points' % self.name, dtype=np.int32,
+                                   dimensions=(self._sparse_dim,), shape=(self.npoint,),
+                                   space_order=0, parent=self)
+        offsets = ColouringFunction(name='%s_colour_offsets' % self.name,
+                                    dtype=np.int32,
+                                    dimensions=(Dimension(name='c_%s' % self.name),),
+                                    shape=(self.npoint + 1,), space_order=0, parent=self)
+        return points, offsets
+
+    def _colouring_data(self):
+        """
+        Compute the arrays carried by the ``_colouring`` SubFunctions. The grid
+        is split into blocks wider than ``_colouring_extent``; points in distinct
+        blocks with the same parity along all Dimensions cannot interfere with
+        each other, so each block contributes at most one point to each colour.
+        The colouring is recomputed only once the sparse points have moved
+        to different grid cells.
+        """
+        gridpoints = np.asarray(self._colouring_gridpoints(), dtype=np.int64)
+        gridpoints = gridpoints.reshape(-1, self.grid.dim)
+        if self._colouring_cache is not None:
+            cached, ret = self._colouring_cache
+            if np.array_equal(cached, gridpoints):
+                return ret
+
+        if len(gridpoints) == 0:
+            ret = (np.zeros(0, dtype=np.int32), np.zeros(1, dtype=np.int32))
+        else:
+            # The extra grid point absorbs any rounding discrepancy between
+            # numpy and the generated code when computing the reference points
+            blocks = gridpoints // (self._colouring_extent + 1)
+            parity = (blocks % 2) @ (2**np.arange(self.grid.dim))
+            # The rank of each point within its own block
+            _, inverse = np.unique(blocks, axis=0, return_inverse=True)
+            inverse = inverse.reshape(-1)
+            order = np.argsort(inverse, kind='mergesort')
+            starts = np.searchsorted(inverse[order], inverse[order], side='left')
+            rank = np.empty(len(gridpoints), dtype=np.int64)
+            rank[order] = np.arange(len(gridpoints)) - starts
+            colour = rank*2**self.grid.dim + parity
+
+            points = np.argsort(colour, kind='mergesort').astype(np.int32)
+            _, counts = np.unique(colour, return_counts=True)
+            offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int32)
+            ret = (points, offsets)
+
+        self._colouring_cache = (gridpoints, ret)
+        return ret
+
+    @_dist_cached
     def _dist_datamap(self):
         """
         Mapper ``M : MPI rank -> required sparse data``.
         """
         ret = {}
         for i, s in enumerate(self._support):
-            # Sparse point `i` is "required" by the following ranks
-            for r in self.grid.distributor.glb_to_rank(s):
+            # Sparse point `i` is "required" by the following ranks. Note: the
+            # support may consist of a single grid point, or none at all
+            for r in as_tuple(self.grid.distributor.glb_to_rank(s)):
                 ret.setdefault(r, []).append(i)
         return {k: filter_ordered(v) for k, v in ret.items()}
 
-    @property
+    @_dist_cached
     def _dist_scatter_mask(self):
         """
         A mask to index into ``self.data``, which creates a new data array that
@@ -131,7 +244,7 @@ class AbstractSparseFunction(DiscreteFunction, Differentiable):
         ret[self._sparse_position] = mask
         return ret
 
-    @property
+    @_dist_cached
     def _dist_subfunc_scatter_mask(self):
         """
         This method is analogous to :meth:`_dist_scatter_mask`, although
@@ -140,7 +253,7 @@ class AbstractSparseFunction(DiscreteFunction, Differentiable):
         """
         return self._dist_scatter_mask[self._sparse_position]
 
-    @property
+    @_dist_cached
     def _dist_gather_mask(self):
         """
         A mask to index into the ``data`` received upon returning from
@@ -149,12 +262,12 @@ class AbstractSparseFunction(DiscreteFunction, Differentiable):
         array can thus be used to populate ``self.data``.
         """
         ret = list(self._dist_scatter_mask)
-        mask = ret[self._sparse_position]
-        ret[self._sparse_position] = [mask.tolist().index(i)
-                                      for i in filter_ordered(mask)]
+        # The position of the first occurrence of each sparse point
+        _, ret[self._sparse_position] = np.unique(ret[self._sparse_position],
+                                                  return_index=True)
         return ret
 
-    @property
+    @_dist_cached
     def _dist_count(self):
         """
         A 2-tuple of comm-sized iterables, which tells how many sparse points
@@ -178,7 +291,7 @@ class AbstractSparseFunction(DiscreteFunction, Differentiable):
         ret += tuple(i for i, d in enumerate(self.indices) if d is not self._sparse_dim)
         return ret
 
-    @property
+    @_dist_cached
     def _dist_alltoall(self):
         """
         The metadata necessary to perform an ``MPI_Alltoallv`` distributing the
@@ -220,20 +333,115 @@ class AbstractSparseFunction(DiscreteFunction, Differentiable):
 
         return sshape, scount, sdisp, rshape, rcount, rdisp
 
-    @property
+    @_dist_cached
     def _dist_subfunc_alltoall(self):
         """
         The metadata necessary to perform an ``MPI_Alltoallv`` distributing
-        self's SubFunction values across the MPI ranks needing them.
+        self's SubFunction values across the MPI ranks needing them, as a mapper
+        from SubFunctions to metadata. The sparse Dimension is expected to be
+        the outermost Dimension of each SubFunction.
         """
-        raise NotImplementedError
+        ssparse, rsparse = self._dist_count
+
+        ret = {}
+        for f in [getattr(self, i) for i in self._sub_functions]:
+            # Number of values carried by each sparse point
+            size = prod(f.shape[1:])
+
+            # Per-rank count of send/recv values
+            scount = [i*size for i in ssparse]
+            rcount = [i*size for i in rsparse]
+
+            # Per-rank displacement of send/recv values (it's actually all
+            # contiguous, but the Alltoallv needs this information anyway)
+            sdisp = np.concatenate([[0], np.cumsum(scount)[:-1]])
+            rdisp = np.concatenate([[0], tuple(np.cumsum(rcount))[:-1]])
+
+            # Total shape of send/recv values
+            sshape = (sum(ssparse),) + f.shape[1:]
+            rshape = (sum(rsparse),) + f.shape[1:]
+
+            ret[f] = (sshape, scount, sdisp, rshape, rcount, rdisp)
+
+        return ret
+
+    def _dist_subfunc_alltoallv(self, f):
+        """
+        Send out the values of the SubFunction ``f`` physically owned by the
+        calling MPI rank to the MPI ranks needing them. Return the values
+        received by the calling MPI rank.
+        """
+        comm = self.grid.distributor.comm
+        mpitype = MPI._typedict[np.dtype(f.dtype).char]
+
+        # Pack (reordered) values so that they can be sent out via an Alltoallv
+        data = f.data_ro_domain._local
+        data = np.ascontiguousarray(data[self._dist_subfunc_scatter_mask])
+        # Send out the values
+        _, scount, sdisp, rshape, rcount, rdisp = self._dist_subfunc_alltoall[f]
+        scattered = np.empty(shape=rshape, dtype=f.dtype)
+        comm.Alltoallv([data, scount, sdisp, mpitype],
+                       [scattered, rcount, rdisp, mpitype])
+
+        return scattered
+
+    def _dist_refresh(self):
+        """
+        Drop the cached MPI routing plan if the sparse points have moved, on
+        any MPI rank, since it was computed. The sparse points may be moved
+        through any view of self's SubFunctions, including views handed out
+        before the plan was computed, so their values are compared against a
+        snapshot taken along with the plan. This is a collective operation.
+        """
+        snapshot = [getattr(self, i).data_ro_domain._local for i in self._sub_functions]
+        moved = self._dist_snapshot is None or\
+            any(not np.array_equal(i, j) for i, j in zip(snapshot, self._dist_snapshot))
+        comm = self.grid.distributor.comm
+        if comm.allreduce(moved, op=MPI.LOR):
+            self._dist_plan = {}
+        self._dist_snapshot = [np.array(i) for i in snapshot]
 
-    def _dist_scatter(self):
+    def _dist_scatter(self, data=None):
         """
         A ``numpy.ndarray`` containing up-to-date data values belonging
         to the calling MPI rank. A data value belongs to a given MPI rank R
         if its coordinates fall within R's local domain.
         """
+        data = data if data is not None else self.data._local
+        distributor = self.grid.distributor
+
+        # Also brings the MPI routing plan up-to-date
+        ret = self._dist_subfunc_scatter()
+
+        # If not using MPI, don't waste time
+        if distributor.nprocs == 1:
+            ret[self] = data
+            return ret
+
+        comm = distributor.comm
+        mpitype = MPI._typedict[np.dtype(self.dtype).char]
+
+        # Pack sparse data values so that they can be sent out via an Alltoallv
+        data = data[self._dist_scatter_mask]
+        data = np.ascontiguousarray(np.transpose(data, self._dist_reorder_mask))
+        # Send out the sparse point values
+        _, scount, sdisp, rshape, rcount, rdisp = self._dist_alltoall
+        scattered = np.empty(shape=rshape, dtype=self.dtype)
+        comm.Alltoallv([data, scount, sdisp, mpitype],
+                       [scattered, rcount, rdisp, mpitype])
+        data = scattered
+        # Unpack data values so that they follow the expected storage layout
+        data = np.ascontiguousarray(np.transpose(data, self._dist_reorder_mask))
+
+        ret[self] = data
+        return ret
+
+    def _dist_subfunc_scatter(self):
+        """
+        Analogous to :meth:`_dist_scatter`, but only for self's SubFunctions.
+        As the sparse points rarely move, the scattered values are cached
+        along with the MPI routing plan.
+        """
         raise NotImplementedError
 
     def _dist_gather(self, data):
@@ -243,16 +451,20 @@ class AbstractSparseFunction(DiscreteFunction, Differentiable):
         """
         raise NotImplementedError
 
-    @memoized_meth
-    def _arg_defaults(self, alias=None):
+    def _arg_defaults(self, alias=None, subfuncs_only=False):
         key = alias or self
         mapper = {self: key}
         mapper.update({getattr(self, i): getattr(key, i) for i in self._sub_functions})
         args = ReducerMap()
 
         # Add in the sparse data (as well as any SubFunction data) belonging to
-        # self's local domain only
-        for k, v in self._dist_scatter().items():
+        # self's local domain only. Note: the sparse data must be scattered at
+        # every call, as it may have changed in the meantime
+        if subfuncs_only:
+            scattered = self._dist_subfunc_scatter()
+        else:
+            scattered = self._dist_scatter()
+        for k, v in scattered.items():
             args[mapper[k].name] = v
             for i, s, o in zip(mapper[k].indices, v.shape, k.staggered):
                 args.update(i._arg_defaults(_min=0, size=s+o))
@@ -397,6 +609,10 @@ class SparseFunction(AbstractSparseFunction):
         Controller for memory allocation. To be used, for example, when one wants
         to take advantage of the memory hierarchy in a NUMA architecture. Refer to
         `default_allocator.__doc__` for more information.
+    precompute : bool, optional
+        If True, the reference grid point and the interpolation coefficients of
+        each sparse point are computed right before running an Operator, rather
+        than at every iteration of the generated code. Defaults to False.
 
     Examples
     --------
@@ -456,6 +672,8 @@ class SparseFunction(AbstractSparseFunction):
         if not self._cached():
             super(SparseFunction, self).__init__(*args, **kwargs)
 
+            self._precompute = kwargs.get('precompute', False)
+
             # Set up sparse point coordinates
             coordinates = kwargs.get('coordinates', kwargs.get('coordinates_data'))
             if isinstance(coordinates, Function):
@@ -477,14 +695,6 @@ class SparseFunction(AbstractSparseFunction):
                     # case ``self._data is None``
                     self.coordinates.data
 
-    def __distributor_setup__(self, **kwargs):
-        """
-        A `SparseDistributor` handles the SparseFunction decomposition based on
-        physical ownership, and allows to convert between global and local indices.
-        """
-        return SparseDistributor(kwargs['npoint'], self._sparse_dim,
-                                 kwargs['grid'].distributor)
-
     @property
     def coordinates(self):
         """The SparseFunction coordinates."""
@@ -494,6 +704,51 @@ class SparseFunction(AbstractSparseFunction):
     def coordinates_data(self):
         return self.coordinates.data.view(np.ndarray)
 
+    @property
+    def precompute(self):
+        """
+        True if the interpolation coefficients are computed ahead of time, False
+        if they are computed on-the-fly within the generated code.
+        """
+        return self._precompute
+
+    @cached_property
+    def _interpolation_tables(self):
+        """
+        The SubFunctions carrying, for each sparse point, the reference grid point
+        and the two interpolation coefficients along each Dimension. These are only
+        used if ``self.precompute`` is True.
+        """
+        p_dim = self.indices[-1]
+        d = Dimension(name='d')
+        gridpoints = SubFunction(name='%s_gridpoints' % self.name, parent=self,
+                                 dtype=np.int32, dimensions=(p_dim, d),
+                                 shape=(self.npoint, self.grid.dim), space_order=0)
+        i = Dimension(name='i_%s' % self.name)
+        coefficients = SubFunction(name='%s_coefficients' % self.name, parent=self,
+                                   dtype=self.dtype, dimensions=(p_dim, d, i),
+                                   shape=(self.npoint, self.grid.dim, 2),
+                                   space_order=0)
+        return gridpoints, coefficients
+
+    def _interpolation_data(self):
+        """
+        The data of ``self._interpolation_tables``, derived from the coordinates
+        of the sparse points required by the calling MPI rank.
+        """
+        coords = np.asarray(self._dist_subfunc_scatter()[self.coordinates],
+                            dtype=self.dtype)
+        origin = np.array([o.data for o in self.grid.origin], dtype=self.dtype)
+        spacing = np.array([i.spacing.data for i in self.grid.dimensions],
+                           dtype=self.dtype)
+
+        # Same arithmetic as in `_coordinate_indices` and `_coordinate_bases`
+        gridpoints = np.floor((coords - origin)/spacing)
+        bases = (coords - origin - gridpoints*spacing)/spacing
+        coefficients = np.stack([1 - bases, bases], axis=-1).astype(self.dtype)
+
+        return gridpoints.astype(np.int32), coefficients
+
     @property
     def _coefficients(self):
         """
@@ -506,6 +761,15 @@ class SparseFunction(AbstractSparseFunction):
         -------
         Matrix of coefficient expressions.
         """
+        if self.precompute:
+            # The coefficients are tabulated per Dimension, so those of the
+            # [bi,tri]linear interpolation are just their products
+            p_dim = self.indices[-1]
+            _, coefficients = self._interpolation_tables
+            return [prod([coefficients.indexify((p_dim, d, i))
+                          for d, i in enumerate(inc)])
+                    for inc in self._point_increments]
+
         # Grid indices corresponding to the corners of the cell ie x1, y1, z1
         indices1 = tuple(sympy.symbols('%s1' % d) for d in self.grid.dimensions)
         indices2 = tuple(sympy.symbols('%s2' % d) for d in self.grid.dimensions)
@@ -557,6 +821,11 @@ class SparseFunction(AbstractSparseFunction):
     @cached_property
     def _coordinate_indices(self):
         """Symbol for each grid index according to the coordinates."""
+        if self.precompute:
+            p_dim = self.indices[-1]
+            gridpoints, _ = self._interpolation_tables
+            return tuple([gridpoints.indexify((p_dim, i))
+                          for i in range(self.grid.dim)])
         indices = self.grid.dimensions
         return tuple([INT(sympy.Function('floor')((c - o) / i.spacing))
                       for c, o, i in zip(self._coordinate_symbols, self.grid.origin,
@@ -615,18 +884,29 @@ class SparseFunction(AbstractSparseFunction):
 
         # Equations for the indirection dimensions
         eqns = [Eq(v, k) for k, v in points.items()]
-        # Equations (temporaries) for the coefficients
-        eqns.extend([Eq(p, c) for p, c in
-                     zip(self._point_symbols, self._coordinate_bases)])
+        # Equations (temporaries) for the coefficients, unless precomputed
+        if not self.precompute:
+            eqns.extend([Eq(p, c) for p, c in
+                         zip(self._point_symbols, self._coordinate_bases)])
 
         return idx_subs, eqns
 
+    @property
+    def _colouring_extent(self):
+        return 2*self._radius
+
+    def _colouring_gridpoints(self):
+        coords = np.asarray(self._dist_subfunc_scatter()[self.coordinates])
+        origin = np.array([o.data for o in self.grid.origin])
+        spacing = np.array([d.spacing.data for d in self.grid.dimensions])
+        return np.floor((coords - origin)/spacing)
+
     @property
     def gridpoints(self):
         if self.coordinates._data is None:
             raise ValueError("No coordinates attached to this SparseFunction")
         ret = []
-        for coords in self.coordinates.data._local:
+        for coords in self.coordinates.data_ro_domain._local:
             ret.append(tuple(int(sympy.floor((c - o.data)/i.spacing.data)) for c, o, i in
                              zip(coords, self.grid.origin, self.grid.dimensions)))
         return ret
@@ -728,72 +1008,41 @@ class SparseFunction(AbstractSparseFunction):
 
         return out, eqns
 
-    @cached_property
-    def _decomposition(self):
-        mapper = {self._sparse_dim: self._distributor.decomposition[self._sparse_dim]}
-        return tuple(mapper.get(d) for d in self.dimensions)
+    def _arg_defaults(self, alias=None, subfuncs_only=False):
+        args = super(SparseFunction, self)._arg_defaults(alias=alias,
+                                                         subfuncs_only=subfuncs_only)
 
-    @property
-    def _dist_subfunc_alltoall(self):
-        ssparse, rsparse = self._dist_count
-
-        # Per-rank shape of send/recv `coordinates`
-        sshape = [(i, self.grid.dim) for i in ssparse]
-        rshape = [(i, self.grid.dim) for i in rsparse]
-
-        # Per-rank count of send/recv `coordinates`
-        scount = [prod(i) for i in sshape]
-        rcount = [prod(i) for i in rshape]
-
-        # Per-rank displacement of send/recv `coordinates` (it's actually all
-        # contiguous, but the Alltoallv needs this information anyway)
-        sdisp = np.concatenate([[0], np.cumsum(scount)[:-1]])
-        rdisp = np.concatenate([[0], tuple(np.cumsum(rcount))[:-1]])
-
-        # Total shape of send/recv `coordinates`
-        sshape = list(self.coordinates.shape)
-        sshape[0] = sum(ssparse)
-        rshape = list(self.coordinates.shape)
-        rshape[0] = sum(rsparse)
+        # Add in the interpolation tables, if used by `key`. Like the coordinates,
+        # these are recomputed at every call, as the sparse points may have moved
+        key = alias or self
+        if key.precompute:
+            for k, v in zip(key._interpolation_tables, self._interpolation_data()):
+                args[k.name] = v
+                for i, s in zip(k.indices, v.shape):
+                    args.update(i._arg_defaults(_min=0, size=s))
 
-        return sshape, scount, sdisp, rshape, rcount, rdisp
+        return args
 
-    def _dist_scatter(self, data=None):
-        data = data if data is not None else self.data._local
+    def _dist_subfunc_scatter(self):
         distributor = self.grid.distributor
 
         # If not using MPI, don't waste time
         if distributor.nprocs == 1:
-            return {self: data, self.coordinates: self.coordinates.data}
+            return {self.coordinates: self.coordinates.data}
 
-        comm = distributor.comm
-        mpitype = MPI._typedict[np.dtype(self.dtype).char]
-
-        # Pack sparse data values so that they can be sent out via an Alltoallv
-        data = data[self._dist_scatter_mask]
-        data = np.ascontiguousarray(np.transpose(data, self._dist_reorder_mask))
-        # Send out the sparse point values
-        _, scount, sdisp, rshape, rcount, rdisp = self._dist_alltoall
-        scattered = np.empty(shape=rshape, dtype=self.dtype)
-        comm.Alltoallv([data, scount, sdisp, mpitype],
-                       [scattered, rcount, rdisp, mpitype])
-        data = scattered
-        # Unpack data values so that they follow the expected storage layout
-        data = np.ascontiguousarray(np.transpose(data, self._dist_reorder_mask))
+        self._dist_refresh()
+        return {self.coordinates: self._dist_coordinates}
 
-        # Pack (reordered) coordinates so that they can be sent out via an Alltoallv
-        coords = self.coordinates.data._local[self._dist_subfunc_scatter_mask]
-        # Send out the sparse point coordinates
-        _, scount, sdisp, rshape, rcount, rdisp = self._dist_subfunc_alltoall
-        scattered = np.empty(shape=rshape, dtype=self.coordinates.dtype)
-        comm.Alltoallv([coords, scount, sdisp, mpitype],
-                       [scattered, rcount, rdisp, mpitype])
-        coords = scattered
+    @_dist_cached
+    def _dist_coordinates(self):
+        """
+        The coordinates of the sparse points required by the calling MPI rank,
+        relative to its local domain.
+        """
+        coords = self._dist_subfunc_alltoallv(self.coordinates)
 
         # Translate global coordinates into local coordinates
-        coords = coords - np.array(self.grid.origin_offset, dtype=self.dtype)
-
-        return {self: data, self.coordinates: coords}
+        return coords - np.array(self.grid.origin_offset, dtype=self.dtype)
 
     def _dist_gather(self, data):
         distributor = self.grid.distributor
@@ -823,7 +1072,8 @@ class SparseFunction(AbstractSparseFunction):
         # values are not distributed, as this is a read-only field.
 
     # Pickling support
-    _pickle_kwargs = AbstractSparseFunction._pickle_kwargs + ['coordinates_data']
+    _pickle_kwargs = AbstractSparseFunction._pickle_kwargs + ['coordinates_data',
+                                                              'precompute']
 
 
 class SparseTimeFunction(AbstractSparseTimeFunction, SparseFunction):
@@ -1020,6 +1270,12 @@ class PrecomputedSparseFunction(AbstractSparseFunction):
     -----
     The parameters must always be given as keyword arguments, since SymPy
     uses ``*args`` to (re-)create the dimension arguments of the symbolic object.
+    With MPI, ``gridpoints`` and ``coefficients`` refer to all of the ``npoint``
+    sparse points, like the coordinates of a SparseFunction. Right before running
+    an Operator, they are sent to the MPI ranks whose local domain contains at
+    least one of the ``r^d`` grid points surrounding each sparse point. Each MPI
+    rank then only accesses the grid points within its local domain, and the
+    sparse data values updated by the various MPI ranks are summed up.
     """
 
     is_PrecomputedSparseFunction = True
@@ -1041,21 +1297,22 @@ class PrecomputedSparseFunction(AbstractSparseFunction):
             gridpoints = SubFunction(name="%s_gridpoints" % self.name, dtype=np.int32,
                                      dimensions=(self.indices[-1], Dimension(name='d')),
                                      shape=(self.npoint, self.grid.dim), space_order=0,
-                                     parent=self)
+                                     parent=self, distributor=self._distributor)
 
             gridpoints_data = kwargs.get('gridpoints', None)
             assert(gridpoints_data is not None)
-            gridpoints.data[:] = gridpoints_data[:]
+            gridpoints.data[:] = np.asarray(gridpoints_data)[:]
             self._gridpoints = gridpoints
 
             coefficients = SubFunction(name="%s_coefficients" % self.name,
                                        dimensions=(self.indices[-1], Dimension(name='d'),
                                                    Dimension(name='i')),
                                        shape=(self.npoint, self.grid.dim, self.r),
-                                       dtype=self.dtype, space_order=0, parent=self)
+                                       dtype=self.dtype, space_order=0, parent=self,
+                                       distributor=self._distributor)
             coefficients_data = kwargs.get('coefficients', None)
             assert(coefficients_data is not None)
-            coefficients.data[:] = coefficients_data[:]
+            coefficients.data[:] = np.asarray(coefficients_data)[:]
             self._coefficients = coefficients
             warning("Ensure that the provided coefficient and grid point values are " +
                     "computed on the final grid that will be used for other " +
@@ -1076,13 +1333,7 @@ class PrecomputedSparseFunction(AbstractSparseFunction):
         """
         expr = indexify(expr)
 
-        p, _, _ = self.coefficients.indices
-        dim_subs = []
-        coeffs = []
-        for i, d in enumerate(self.grid.dimensions):
-            rd = DefaultDimension(name="r%s" % d.name, default_value=self.r)
-            dim_subs.append((d, INT(rd + self.gridpoints[p, i])))
-            coeffs.append(self.coefficients[p, i, rd])
+        dim_subs, coeffs = self._interpolation_subs
         # Apply optional time symbol substitutions to lhs of assignment
         lhs = self.subs(self_subs)
         rhs = prod(coeffs) * expr.subs(dim_subs)
@@ -1105,16 +1356,37 @@ class PrecomputedSparseFunction(AbstractSparseFunction):
         expr = indexify(expr)
         field = indexify(field)
 
+        dim_subs, coeffs = self._interpolation_subs
+        rhs = prod(coeffs) * expr
+        field = field.subs(dim_subs)
+        return [Inc(field, rhs.subs(dim_subs))]
+
+    @cached_property
+    def _interpolation_subs(self):
+        """
+        A 2-tuple, with:
+
+            * the substitutions turning each grid Dimension into the indices of
+              the ``r`` grid points surrounding a sparse point along it;
+            * the coefficients associated with these grid points.
+
+        Only the grid points within the (local) domain are accessed, so that each
+        of them is handled by exactly one MPI rank, even when the support of a
+        sparse point straddles the boundary of two or more MPI ranks.
+        """
         p, _ = self.gridpoints.indices
         dim_subs = []
         coeffs = []
         for i, d in enumerate(self.grid.dimensions):
             rd = DefaultDimension(name="r%s" % d.name, default_value=self.r)
-            dim_subs.append((d, INT(rd + self.gridpoints[p, i])))
-            coeffs.append(self.coefficients[p, i, rd])
-        rhs = prod(coeffs) * expr
-        field = field.subs(dim_subs)
-        return [Eq(field, field + rhs.subs(dim_subs))]
+            idx = rd + self.gridpoints[p, i]
+            lb = sympy.And(idx >= d.symbolic_min, evaluate=False)
+            ub = sympy.And(idx <= d.symbolic_max, evaluate=False)
+            condition = sympy.And(lb, ub, evaluate=False)
+            cd = ConditionalDimension("%sg" % rd.name, rd, condition=condition)
+            dim_subs.append((d, INT(cd + self.gridpoints[p, i])))
+            coeffs.append(self.coefficients[p, i, cd])
+        return dim_subs, coeffs
 
     @property
     def gridpoints(self):
@@ -1124,16 +1396,52 @@ class PrecomputedSparseFunction(AbstractSparseFunction):
     def coefficients(self):
         return self._coefficients
 
-    def _dist_scatter(self, data=None):
-        data = data if data is not None else self.data
+    @property
+    def _support(self):
+        ret = []
+        for i in self.gridpoints.data_ro_domain._local:
+            support = [range(max(0, j), min(M, j + self.r))
+                       for j, M in zip(i, self.grid.shape)]
+            ret.append(tuple(product(*support)))
+        return ret
+
+    @property
+    def _colouring_extent(self):
+        return self.r
+
+    def _colouring_gridpoints(self):
+        return self._dist_subfunc_scatter()[self.gridpoints]
+
+    def _dist_subfunc_scatter(self):
         distributor = self.grid.distributor
 
         # If not using MPI, don't waste time
         if distributor.nprocs == 1:
-            return {self: data, self.gridpoints: self.gridpoints.data,
+            return {self.gridpoints: self.gridpoints.data,
                     self.coefficients: self.coefficients.data}
 
-        raise NotImplementedError
+        self._dist_refresh()
+        return {self.gridpoints: self._dist_gridpoints,
+                self.coefficients: self._dist_coefficients}
+
+    @_dist_cached
+    def _dist_gridpoints(self):
+        """
+        The reference grid points of the sparse points required by the calling
+        MPI rank, relative to its local domain.
+        """
+        gridpoints = self._dist_subfunc_alltoallv(self.gridpoints)
+
+        # Translate global indices into local indices
+        offset = [min(i) for i in self.grid.distributor.glb_numb]
+        return gridpoints - np.array(offset, dtype=gridpoints.dtype)
+
+    @_dist_cached
+    def _dist_coefficients(self):
+        """
+        The coefficients of the sparse points required by the calling MPI rank.
+        """
+        return self._dist_subfunc_alltoallv(self.coefficients)
 
     def _dist_gather(self, data):
         distributor = self.grid.distributor
@@ -1142,7 +1450,31 @@ class PrecomputedSparseFunction(AbstractSparseFunction):
         if distributor.nprocs == 1:
             return
 
-        raise NotImplementedError
+        comm = distributor.comm
+
+        # Pack sparse data values so that they can be sent out via an Alltoallv
+        data = np.ascontiguousarray(np.transpose(data, self._dist_reorder_mask))
+        # Send back the sparse point values
+        sshape, scount, sdisp, _, rcount, rdisp = self._dist_alltoall
+        gathered = np.empty(shape=sshape, dtype=self.dtype)
+        mpitype = MPI._typedict[np.dtype(self.dtype).char]
+        comm.Alltoallv([data, rcount, rdisp, mpitype],
+                       [gathered, scount, sdisp, mpitype])
+        data = gathered
+        # Unpack data values so that they follow the expected storage layout
+        data = np.ascontiguousarray(np.transpose(data, self._dist_reorder_mask))
+
+        # A sparse point whose support straddles two or more MPI ranks has been
+        # sent to all of them, and each of them has only handled the grid points
+        # within its local domain. Thus, unlike in SparseFunction, the duplicate
+        # sparse data values are not discarded; rather, the updates performed by
+        # the various MPI ranks are summed up
+        current = np.asarray(self._data)
+        increments = data - current[self._dist_scatter_mask]
+        updated = np.moveaxis(current.copy(), self._sparse_position, 0)
+        np.add.at(updated, self._dist_subfunc_scatter_mask,
+                  np.moveaxis(increments, self._sparse_position, 0))
+        self._data[:] = np.moveaxis(updated, 0, self._sparse_position)
 
 
 class PrecomputedSparseTimeFunction(AbstractSparseTimeFunction,
@@ -1233,3 +1565,29 @@ class PrecomputedSparseTimeFunction(AbstractSparseTimeFunction,
         return super(PrecomputedSparseTimeFunction, self).interpolate(
             expr, offset=offset, increment=increment, self_subs=subs
         )
+
+
+class ColouringFunction(SubFunction):
+
+    """
+    A SubFunction carrying part of the colouring of the sparse points of its
+    parent AbstractSparseFunction. The colouring is derived from the sparse
+    point coordinates right before running an Operator.
+    """
+
+    def _arg_values(self, **kwargs):
+        if self.name in kwargs:
+            raise RuntimeError("`%s` is a SubFunction, so it can't be assigned "
+                               "a value dynamically" % self.name)
+        # If the parent has been replaced by another AbstractSparseFunction, then
+        # the colouring must be derived from the latter's sparse points
+        parent = kwargs.get(self.parent.name, self.parent)
+        if not isinstance(parent, AbstractSparseFunction):
+            parent = self.parent
+        index = [i.name for i in self.parent._colouring].index(self.name)
+        data = parent._colouring_data()[index]
+
+        values = {self.name: data}
+        for i, s in zip(self.indices, data.shape):
+            values.update(i._arg_defaults(_min=0, size=s))
+        return values
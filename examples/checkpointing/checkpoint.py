@@ -20,6 +20,7 @@ class CheckpointOperator(Operator):
         self.args = kwargs
         op_default_args = self.op._prepare_arguments(**kwargs)
         self.start_offset = op_default_args[self.t_arg_names['t_start']]
+        self.bound = None
 
     def _prepare_args(self, t_start, t_end):
         args = self.args.copy()
@@ -33,11 +34,14 @@ class CheckpointOperator(Operator):
             pyRevolve.Operator.apply() without caring about these extra arguments while
             this method passes them on correctly to devito.Operator
         """
-        # Build the arguments list to invoke the kernel function
-        args = self.op.arguments(**self._prepare_args(t_start, t_end))
-        # Invoke kernel function with args
-        arg_values = [args[p.name] for p in self.op.parameters]
-        self.op.cfunction(*arg_values)
+        args = self._prepare_args(t_start, t_end)
+        if self.bound is None:
+            # Build the arguments list to invoke the kernel function, once
+            self.bound = self.op.bind(**args)
+            self.bound()
+        else:
+            # Only the time bounds change across calls, so they're simply patched
+            self.bound(**{k: args[k] for k in self.t_arg_names.values()})
 
 
 class DevitoCheckpoint(Checkpoint):
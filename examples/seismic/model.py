@@ -404,6 +404,26 @@ def initialize_function(function, data, nbpml, pad_mode='edge'):
     function.data_with_halo[:] = data
 
 
+def pml_cost_marginals(shape, nbpml, pml_cost):
+    """
+    Per-dimension costs of a domain of physical shape ``shape`` surrounded by
+    ``nbpml`` PML points, where each PML point costs ``pml_cost`` times as much
+    as a physical point. These are the marginals of the per-point cost, i.e.
+    its sums over all of the other dimensions, normalized by the number of
+    points summed, so the per-point cost is never materialized.
+    """
+    shape_pml = [n + 2*nbpml for n in shape]
+    ret = []
+    for d in range(len(shape)):
+        others = [i for i in range(len(shape)) if i != d]
+        npoints = np.prod([shape_pml[i] for i in others])
+        nphysical = np.prod([shape[i] for i in others])
+        marginal = np.full(shape_pml[d], float(pml_cost))
+        marginal[nbpml:-nbpml] = (nphysical + (npoints - nphysical)*pml_cost)/npoints
+        ret.append(marginal)
+    return tuple(ret)
+
+
 class PhysicalDomain(SubDomain):
 
     name = 'phydomain'
@@ -421,7 +441,7 @@ class GenericModel(object):
     General model class with common properties
     """
     def __init__(self, origin, spacing, shape, space_order, nbpml=20,
-                 dtype=np.float32):
+                 dtype=np.float32, pml_cost=None, topology=None):
         self.shape = shape
         self.nbpml = int(nbpml)
         self.origin = tuple([dtype(o) for o in origin])
@@ -433,8 +453,17 @@ class GenericModel(object):
         shape_pml = np.array(shape) + 2 * self.nbpml
         # Physical extent is calculated per cell, so shape - 1
         extent = tuple(np.array(spacing) * (shape_pml - 1))
+        # With MPI, the PML points may be given a higher cost than the physical
+        # ones, to balance the load across the ranks. Unless requested, the
+        # default domain decomposition is retained
+        if pml_cost is not None and self.nbpml > 0:
+            cost = pml_cost_marginals(shape, self.nbpml, pml_cost)
+            topology = topology or 'auto'
+        else:
+            cost = None
         self.grid = Grid(extent=extent, shape=shape_pml, origin=origin_pml, dtype=dtype,
-                         subdomains=phydomain)
+                         subdomains=phydomain, topology=topology, cost=cost,
+                         radius=max(space_order // 2, 1))
 
     def physical_params(self, **kwargs):
         """
@@ -499,6 +528,11 @@ class Model(GenericModel):
     :param delta: Thomsen delta parameter (0<delta<1), delta<epsilon
     :param theta: Tilt angle in radian
     :param phi: Asymuth angle in radian
+    :param pml_cost: Cost of a PML point relative to a physical point, used to
+                     balance the load across the MPI ranks
+    :param topology: The number of MPI ranks along each dimension, or 'auto' to
+                     minimise the halo traffic. Defaults to 'auto' if `pml_cost`
+                     is given, and to the default decomposition otherwise
 
     The :class:`Model` provides two symbolic data objects for the
     creation of seismic wave propagation operators:
@@ -509,7 +543,8 @@ class Model(GenericModel):
     def __init__(self, origin, spacing, shape, space_order, vp, nbpml=20,
                  dtype=np.float32, epsilon=None, delta=None, theta=None, phi=None,
                  **kwargs):
-        super(Model, self).__init__(origin, spacing, shape, space_order, nbpml, dtype)
+        super(Model, self).__init__(origin, spacing, shape, space_order, nbpml, dtype,
+                                    kwargs.get('pml_cost'), kwargs.get('topology'))
 
         # Are we provided with an existing grid?
         grid = kwargs.get('grid')
@@ -687,6 +722,11 @@ class ModelViscoAcoustic(GenericModel):
     :param delta: Thomsen delta parameter (0<delta<1), delta<epsilon
     :param theta: Tilt angle in radian
     :param phi: Asymuth angle in radian
+    :param pml_cost: Cost of a PML point relative to a physical point, used to
+                     balance the load across the MPI ranks
+    :param topology: The number of MPI ranks along each dimension, or 'auto' to
+                     minimise the halo traffic. Defaults to 'auto' if `pml_cost`
+                     is given, and to the default decomposition otherwise
 
     The :class:`Model` provides two symbolic data objects for the
     creation of seismic wave propagation operators:
@@ -697,7 +737,9 @@ class ModelViscoAcoustic(GenericModel):
     def __init__(self, origin, spacing, shape, space_order, vp, Q=None, f0=None, nbpml=20,
                  dtype=np.float32, epsilon=None, delta=None, theta=None, phi=None,
                  **kwargs):
-        super(ModelViscoAcoustic, self).__init__(origin, spacing, shape, space_order, nbpml, dtype)
+        super(ModelViscoAcoustic, self).__init__(origin, spacing, shape, space_order,
+                                                 nbpml, dtype, kwargs.get('pml_cost'),
+                                                 kwargs.get('topology'))
 
         self.Q = Q
         self.f0 = f0
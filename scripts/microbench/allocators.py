@@ -0,0 +1,55 @@
+"""
+Compare the stencil sweep throughput, in points per second, of Functions
+allocated through the various memory allocators, e.g. with and without huge
+pages.
+
+A large grid should be used, so that the working set vastly exceeds the
+reach of the TLB.
+"""
+
+import click
+
+from devito import Eq, Grid, Operator, TimeFunction, configuration
+from devito.data.allocators import (ALLOC_FLAT, ALLOC_NUMA_LOCAL, ALLOC_HUGEPAGES,
+                                    ALLOC_HUGEPAGES_NUMA_LOCAL, NumaAllocator)
+
+
+@click.command()
+@click.option('--shape', '-d', default=(512, 512, 512), type=(int, int, int),
+              help='Shape of the grid.')
+@click.option('--space-order', '-so', default=4, help='Space order of the stencil.')
+@click.option('--nt', default=10, help='Number of timesteps.')
+@click.option('--repeats', '-r', default=3, help='Number of repetitions; the '
+                                                 'best one is reported.')
+def run(shape, space_order, nt, repeats):
+    configuration['log-level'] = 'WARNING'
+
+    allocators = [('flat', ALLOC_FLAT), ('hugepages', ALLOC_HUGEPAGES)]
+    if NumaAllocator.available():
+        allocators.extend([('numa-local', ALLOC_NUMA_LOCAL),
+                           ('hugepages, numa-local', ALLOC_HUGEPAGES_NUMA_LOCAL)])
+
+    grid = Grid(shape=shape)
+    npoints = nt
+    for i in shape:
+        npoints *= i
+
+    for name, allocator in allocators:
+        u = TimeFunction(name='u', grid=grid, space_order=space_order,
+                         allocator=allocator)
+        u.data_with_halo[:] = 1.
+        op = Operator(Eq(u.forward, u.laplace + u))
+
+        timings = []
+        for _ in range(repeats):
+            summary = op.apply(time_M=nt-1)
+            timings.append(sum(v.time for v in summary.values()))
+        best = min(timings)
+        click.echo("%s: %.2f s, %.2f GPoints/s" % (name, best, npoints/best/1e9))
+
+        # Release the memory before moving on to the next allocator
+        del op, u
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,42 @@
+"""
+Measure the Python-level overhead of running an Operator, through both
+``Operator.apply`` and a bound Operator (``Operator.bind``).
+
+A tiny Operator is used, so that the time spent in the generated code is
+negligible and the reported figures are, essentially, pure overhead.
+"""
+
+from timeit import Timer
+
+import click
+
+from devito import Eq, Grid, Operator, TimeFunction, configuration
+
+
+@click.command()
+@click.option('--shape', '-d', default=(4, 4), type=(int, int),
+              help='Shape of the (tiny) grid.')
+@click.option('--ncalls', '-n', default=1000, help='Number of Operator calls.')
+@click.option('--repeats', '-r', default=5, help='Number of repetitions; the '
+                                                 'best one is reported.')
+def run(shape, ncalls, repeats):
+    configuration['log-level'] = 'WARNING'
+
+    grid = Grid(shape=shape)
+    u = TimeFunction(name='u', grid=grid)
+    op = Operator(Eq(u.forward, u + 1))
+
+    bound = op.bind(time_M=0)
+    timings = [
+        ('apply', lambda: op.apply(time_m=1, time_M=1)),
+        ('bound', lambda: bound()),
+        ('bound, patched time bounds', lambda: bound(time_m=1, time_M=1)),
+    ]
+    for name, func in timings:
+        func()  # Warm up (e.g., JIT compilation)
+        best = min(Timer(func).repeat(repeats, ncalls))
+        click.echo("%s: %.2f us/call" % (name, best/ncalls*1e6))
+
+
+if __name__ == "__main__":
+    run()
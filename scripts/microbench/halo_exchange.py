@@ -0,0 +1,58 @@
+"""
+Compare the MPI halo exchange schemes (``basic``, ``full``, ``overlap``,
+``persistent``, ``wide``) on a star-like stencil plus a cross-derivative, so
+that both the face and the diagonal (edge, corner) neighbours must be exchanged
+with.
+
+Run with, e.g.: ::
+
+    DEVITO_MPI=1 mpirun -n 8 python scripts/microbench/halo_exchange.py
+
+The reported figures are the best times per timestep over ``--repeats`` runs,
+as measured on rank 0.
+"""
+
+from timeit import default_timer
+
+import click
+
+from devito import Eq, Grid, Operator, TimeFunction, configuration
+from devito.mpi.routines import modes
+
+
+@click.command()
+@click.option('--shape', '-d', default=(128, 128, 128), type=(int, int, int),
+              help='Shape of the grid.')
+@click.option('--space-order', '-so', default=8, help='Space order of the stencil.')
+@click.option('--nt', default=20, help='Number of timesteps.')
+@click.option('--repeats', '-r', default=3, help='Number of repetitions; the '
+                                                 'best one is reported.')
+@click.option('--mode', '-m', multiple=True, default=sorted(modes),
+              type=click.Choice(sorted(modes)), help='The schemes to benchmark.')
+def run(shape, space_order, nt, repeats, mode):
+    configuration['log-level'] = 'WARNING'
+    if not configuration['mpi']:
+        raise click.UsageError("Must be run with MPI enabled (e.g., DEVITO_MPI=1)")
+
+    grid = Grid(shape=shape)
+    u = TimeFunction(name='u', grid=grid, space_order=space_order)
+    eq = Eq(u.forward, u + 0.1*u.laplace + 0.01*u.dx.dy)
+
+    for i in mode:
+        op = Operator(eq, mpi=i)
+        op.apply(time_M=0)  # Warm up (e.g., JIT compilation)
+
+        timings = []
+        for _ in range(repeats):
+            grid.distributor.comm.Barrier()
+            tic = default_timer()
+            op.apply(time_M=nt-1)
+            grid.distributor.comm.Barrier()
+            timings.append(default_timer() - tic)
+
+        if grid.distributor.myrank == 0:
+            click.echo("%s: %.3f ms/timestep" % (i, min(timings)/nt*1e3))
+
+
+if __name__ == "__main__":
+    run()
@@ -179,6 +179,71 @@ def test_mixed_blocking_nthreads():
     assert 'nthreads' in op._state['autotuning'][0]['tuned']
 
 
+def test_temporal_blocking():
+    from devito.core.autotuning import options
+
+    grid = Grid(shape=(64, 64, 64))
+    f = TimeFunction(name='f', grid=grid, space_order=2)
+
+    op = Operator(Eq(f.forward, f + f.laplace),
+                  dle=('advanced', {'openmp': False, 'blocktime': True}))
+    op.apply(time=100, autotune=True)
+
+    # Six space tile shapes times three time tile sizes, with each run
+    # spanning at least one time tile
+    assert op._state['autotuning'][0]['runs'] == 18
+    assert op._state['autotuning'][0]['tpr'] == max(options['tblocksize']) + 1
+    assert set(op._state['autotuning'][0]['tuned']) ==\
+        {'time0_tblock_size', 'x0_tblock_size', 'y0_tblock_size'}
+
+
+def test_database(tmpdir, monkeypatch):
+    from devito.core.autotuning import TuningDatabase, options
+    path = str(tmpdir.join('db.json'))
+    monkeypatch.setitem(options, 'database', path)
+
+    grid = Grid(shape=(64, 64, 64))
+    f = TimeFunction(name='f', grid=grid)
+
+    op = Operator(Eq(f.forward, f + 1.), dle=('advanced', {'openmp': False}))
+    op.apply(time=0, autotune=True)
+    assert op._state['autotuning'][0]['runs'] == 6
+    tuned = op._state['autotuning'][0]['tuned']
+    assert list(TuningDatabase(path).load().values()) == [tuned]
+
+    # The best block shape is now retrieved from the database
+    op.apply(time=0, autotune=True)
+    assert op._state['autotuning'][1]['runs'] == 0
+    assert op._state['autotuning'][1]['tuned'] == tuned
+
+    # Different iteration space sizes lead to a different entry
+    op.apply(time=0, x_M=31, autotune=True)
+    assert op._state['autotuning'][2]['runs'] > 0
+    assert len(TuningDatabase(path).load()) == 2
+
+    # Force re-tuning
+    monkeypatch.setitem(options, 'refresh', True)
+    op.apply(time=0, autotune=True)
+    assert op._state['autotuning'][3]['runs'] == 6
+
+
+def test_guided(monkeypatch):
+    from devito.core.autotuning import options
+    # Make sure no candidate gets pruned by the working set model
+    monkeypatch.setitem(options, 'l2-cache-size', 2**40)
+
+    grid = Grid(shape=(64, 64, 64))
+    f = TimeFunction(name='f', grid=grid)
+
+    op = Operator(Eq(f.forward, f + 1.), dle=('advanced', {'openmp': False}))
+    op.apply(time=0, autotune='aggressive')
+    op.apply(time=0, autotune='guided')
+    aggressive, guided = op._state['autotuning']
+    assert 6 <= guided['runs'] < aggressive['runs']
+    assert guided['saved'] > 0
+    assert len(guided['tuned']) == len(aggressive['tuned'])
+
+
 def test_tti_aggressive():
     from test_dse import tti_operator
     wave_solver = tti_operator(dse='aggressive', dle=('advanced', {'openmp': False}))
@@ -1,10 +1,16 @@
+import os
+import tempfile
+
 import pytest
 import numpy as np
 
 from conftest import skipif
 from devito import (Grid, Function, TimeFunction, SparseTimeFunction, Dimension, # noqa
-                    Eq, Operator, ALLOC_GUARD, ALLOC_FLAT)
-from devito.data import LEFT, RIGHT, Decomposition
+                    Eq, Operator, ALLOC_GUARD, ALLOC_FLAT, ALLOC_HUGEPAGES,
+                    ALLOC_HUGEPAGES_NUMA_LOCAL, ALLOC_MMAP, ALLOC_SHM, clear_cache,
+                    default_allocator, switchconfig)
+from devito.data import LEFT, RIGHT, Data, Decomposition, PoolAllocator
+from devito.exceptions import InvalidArgument
 
 pytestmark = skipif('ops')
 
@@ -246,6 +252,41 @@ class TestDataBasic(object):
         sf.data[1:-1, 0] = np.arange(8)
         assert np.all(sf.data[1:-1, 0] == np.arange(8))
 
+    @pytest.mark.parametrize('ext', ['npy', 'raw'])
+    def test_file_io(self, tmpdir, ext):
+        """
+        Test loading and saving the data of Functions and TimeFunctions.
+        """
+        grid = Grid(shape=(4, 5))
+        values = np.arange(20, dtype=np.float32).reshape(4, 5)
+        filename = str(tmpdir.join('f.%s' % ext))
+
+        f = Function(name='f', grid=grid)
+        f.data[:] = values
+        f.to_file(filename)
+
+        g = Function(name='g', grid=grid)
+        g.from_file(filename)
+        assert np.all(g.data == values)
+
+        # Single snapshots
+        u = TimeFunction(name='u', grid=grid, save=3)
+        u.from_file(filename, time=1)
+        assert np.all(u.data[0] == 0.)
+        assert np.all(u.data[1] == values)
+        u.to_file(filename, time=1)
+        g.from_file(filename)
+        assert np.all(g.data == values)
+
+        # All snapshots
+        u.to_file(filename)
+        v = TimeFunction(name='v', grid=grid, save=3)
+        v.from_file(filename)
+        assert np.all(v.data == u.data)
+
+        with pytest.raises(ValueError):
+            g.from_file(filename)
+
 
 @skipif('yask')
 class TestDecomposition(object):
@@ -371,6 +412,85 @@ class TestDataDistributed(object):
     Test Data indexing and manipulation when distributed over a set of MPI processes.
     """
 
+    @pytest.mark.parallel(nprocs=4)
+    @pytest.mark.parametrize('ext', ['npy', 'raw'])
+    def test_file_io(self, ext):
+        grid = Grid(shape=(6, 7))
+        distributor = grid.distributor
+        values = np.arange(42, dtype=np.float32).reshape(6, 7)
+
+        # A directory shared by all ranks
+        dirname = tempfile.mkdtemp() if distributor.myrank == 0 else None
+        dirname = distributor.comm.bcast(dirname, root=0)
+        filename = os.path.join(dirname, 'f.%s' % ext)
+
+        f = Function(name='f', grid=grid)
+        f.data[:] = values
+        f.to_file(filename)
+        if distributor.myrank == 0:
+            if ext == 'npy':
+                assert np.all(np.load(filename) == values)
+            else:
+                assert np.all(np.fromfile(filename, dtype=np.float32) == values.ravel())
+
+        g = Function(name='g', grid=grid)
+        g.from_file(filename)
+        assert np.all(g.data_ro_domain._local == values[g.local_indices])
+
+        u = TimeFunction(name='u', grid=grid)
+        u.from_file(filename, time=1)
+        assert np.all(u.data_ro_domain._local[1] == values[g.local_indices])
+        assert np.all(u.data_ro_domain._local[0] == 0.)
+
+        # Overwriting a larger file
+        u.to_file(filename)
+        v = TimeFunction(name='v', grid=grid)
+        v.from_file(filename)
+        assert np.all(v.data_ro_domain._local == u.data_ro_domain._local)
+        u.to_file(filename, time=1)
+        g.data[:] = 0.
+        g.from_file(filename)
+        assert np.all(g.data_ro_domain._local == values[g.local_indices])
+
+        with pytest.raises(ValueError):
+            v.from_file(filename)
+
+        # A missing file is reported by all ranks
+        with pytest.raises(IOError):
+            g.from_file(os.path.join(dirname, 'missing.%s' % ext))
+
+    @pytest.mark.parallel(nprocs=2)
+    def test_readonly_allocators(self):
+        """
+        Test that read-only memory-mapped Functions may be read by an Operator,
+        unless their halo needs to be exchanged.
+        """
+        grid = Grid(shape=(8, 8))
+        distributor = grid.distributor
+
+        dirname = tempfile.mkdtemp() if distributor.myrank == 0 else None
+        dirname = distributor.comm.bcast(dirname, root=0)
+        filename = os.path.join(dirname, 'u%d.bin' % distributor.myrank)
+
+        u = TimeFunction(name='u', grid=grid, save=3, allocator=ALLOC_MMAP(filename))
+        Operator(Eq(u.forward, u + 1)).apply(time_M=1)
+
+        name = 'devito-test-shm-%d-%d' % (os.getpid(), distributor.myrank)
+        m = Function(name='m', grid=grid, allocator=ALLOC_SHM(name))
+        m.data[:] = 2.
+
+        v = TimeFunction(name='v', grid=grid, save=3,
+                         allocator=ALLOC_MMAP(filename, mode='r'))
+        n = Function(name='n', grid=grid, allocator=ALLOC_SHM(name, mode='r'))
+        f = Function(name='f', grid=grid)
+        Operator(Eq(f, f + v*n)).apply(time_m=0, time_M=2)
+        assert np.all(f.data_ro_domain == 6.)
+
+        with pytest.raises(InvalidArgument):
+            Operator(Eq(f, v.dx)).apply(time_m=0, time_M=2)
+        with pytest.raises(InvalidArgument):
+            Operator(Eq(f, n.dx)).apply()
+
     @pytest.mark.parallel(nprocs=4)
     def test_localviews(self):
         grid = Grid(shape=(4, 4))
@@ -678,6 +798,159 @@ def test_scalar_arg_substitution(t0, t1):
     assert t0.subs('t0', t1) == t1
 
 
+@pytest.mark.parametrize('allocator', [ALLOC_HUGEPAGES, ALLOC_HUGEPAGES_NUMA_LOCAL])
+def test_hugepages_allocator(allocator):
+    """
+    Tests the huge pages allocator, which silently falls back to transparent
+    huge pages, or even to regular pages, depending on the system.
+    """
+    grid = Grid(shape=(40, 40))
+    u = TimeFunction(name='u', grid=grid, allocator=allocator)
+    assert u._data_buffer.ctypes.data % allocator.hugepagesize == 0
+
+    Operator(Eq(u.forward, u + 1)).apply(time_M=1)
+    assert np.all(u.data[0] == 2.)
+
+    assert switchconfig(allocator='hugepages')(default_allocator)().is_HugePages
+    assert not default_allocator().is_HugePages
+
+
+def test_pool_allocator():
+    """
+    Tests the pool allocator, which recycles the freed memory blocks.
+    """
+    pool = PoolAllocator(ALLOC_FLAT, capacity=2*1024*1024, zero=True)
+    modulo = (False, False)
+
+    a = Data((512, 512), np.float32, modulo=modulo, allocator=pool)
+    a[:] = 1.
+    address = a.ctypes.data
+    del a
+    assert pool.stats['nblocks_cached'] == 1
+
+    # Same size class -> the block is recycled and zeroed
+    a = Data((511, 512), np.float32, modulo=modulo, allocator=pool)
+    assert a.ctypes.data == address
+    assert np.all(a == 0.)
+    assert pool.stats['hits'] == 1
+    assert pool.stats['misses'] == 1
+
+    # Different size class -> fresh allocation
+    b = Data((256, 256), np.float32, modulo=modulo, allocator=pool)
+    assert pool.stats['misses'] == 2
+
+    # Exceeding the capacity triggers the eviction of the least recently freed
+    # blocks
+    c = Data((512, 512), np.float32, modulo=modulo, allocator=pool)
+    del b, a, c
+    assert pool.stats['evictions'] == 1
+    assert pool.stats['nbytes_cached'] == 2*1024*1024
+
+    pool.clear()
+    assert pool.stats['nbytes_cached'] == 0
+
+    assert switchconfig(allocator='pool')(default_allocator)().is_Pool
+
+
+def test_mmap_allocator(tmpdir):
+    """
+    Tests the file-backed allocator, including the reopening of a file as the
+    data of another Function.
+    """
+    grid = Grid(shape=(8, 8))
+    filename = str(tmpdir.join('u.bin'))
+
+    u = TimeFunction(name='u', grid=grid, save=4,
+                     allocator=ALLOC_MMAP(filename, advice='sequential'))
+    Operator(Eq(u.forward, u + 1)).apply(time_M=2)
+    assert np.all(u.data[3] == 3.)
+    assert os.path.getsize(filename) == u._data_buffer.nbytes
+
+    # Reopen, read-only
+    allocator = ALLOC_MMAP(filename, mode='r')
+    v = TimeFunction(name='v', grid=grid, save=4, allocator=allocator)
+    assert np.all(v.data[3] == 3.)
+    with pytest.raises(ValueError):
+        v.data[:] = 0.
+    allocator.advise('reverse')
+    f = Function(name='f', grid=grid)
+    Operator(Eq(f, f + v)).apply(time_m=0, time_M=3)
+    assert np.all(f.data == 6.)
+    # ... but may not be written by an Operator
+    with pytest.raises(InvalidArgument):
+        Operator(Eq(v, v + 1)).apply(time_m=0, time_M=3)
+    assert np.all(v.data[3] == 3.)
+
+    # Reopen, with mismatching shape
+    with pytest.raises(ValueError):
+        TimeFunction(name='w', grid=grid, save=5,
+                     allocator=ALLOC_MMAP(filename, mode='r+')).data
+
+    # Scratch files in a directory
+    allocator = ALLOC_MMAP(str(tmpdir))
+    g = Function(name='g', grid=grid, allocator=allocator)
+    h = Function(name='h', grid=grid, allocator=allocator)
+    g.data[:] = 1.
+    h.data[:] = 2.
+    assert np.all(g.data == 1.)
+    assert os.listdir(str(tmpdir)) == ['u.bin']
+
+
+def test_shm_allocator():
+    """
+    Tests the shared-memory allocator, including the attachment of another
+    Function to an existing segment and the removal of the segment once its
+    last user has gone.
+    """
+    grid = Grid(shape=(8, 8))
+    name = 'devito-test-shm-%d' % os.getpid()
+
+    u = Function(name='u', grid=grid, allocator=ALLOC_SHM(name))
+    u.data[:] = 2.
+    path = u._allocator.path
+    assert os.path.exists(path)
+
+    # A segment may be overwritten only if no one else is using it
+    with pytest.raises(RuntimeError):
+        Function(name='w', grid=grid, allocator=ALLOC_SHM(name)).data
+
+    # Attach, read-only
+    v = Function(name='v', grid=grid, allocator=ALLOC_SHM(name, mode='r'))
+    assert np.all(v.data == 2.)
+    with pytest.raises(ValueError):
+        v.data[:] = 0.
+    u.data[:] = 3.
+    assert np.all(v.data == 3.)
+    f = Function(name='f', grid=grid)
+    Operator(Eq(f, f + v)).apply()
+    assert np.all(f.data == 3.)
+
+    # The segment is removed along with its last user
+    del u
+    clear_cache()
+    assert os.path.exists(path)
+    del v
+    clear_cache()
+    assert not os.path.exists(path)
+
+    with pytest.raises(OSError):
+        Function(name='v', grid=grid, allocator=ALLOC_SHM(name, mode='r')).data
+
+
+def test_shm_allocator_no_fcntl(monkeypatch):
+    """
+    Tests that the shared-memory allocator is disabled on platforms lacking
+    ``fcntl``, e.g. Windows.
+    """
+    from devito.data import allocators
+    monkeypatch.setattr(allocators, 'fcntl', None)
+    monkeypatch.setattr(allocators.SharedMemoryAllocator, '_attempted_init', False)
+    monkeypatch.setattr(allocators.SharedMemoryAllocator, 'lib', None)
+    assert not ALLOC_SHM.available()
+    with pytest.raises(RuntimeError):
+        ALLOC_SHM('devito-test-shm-%d' % os.getpid())
+
+
 @pytest.mark.skip(reason="will corrupt memory and risk crash")
 def test_oob_noguard():
     """
@@ -5,7 +5,8 @@ import numpy as np
 import pytest
 
 from conftest import EVAL, skipif
-from devito import Grid, Function, TimeFunction, Eq, Operator, solve
+from devito import (Grid, Dimension, Function, TimeFunction, SparseFunction,
+                    SparseTimeFunction, Eq, Inc, Operator, dimensions, solve)
 from devito.dle import transform
 from devito.ir.equations import DummyEq
 from devito.ir.iet import (ELEMENTAL, Expression, Callable, Iteration, List, tagger,
@@ -353,6 +354,63 @@ def test_cache_blocking_edge_cases_highorder(shape, blockshape):
     assert np.equal(wo_blocking.data, w_blocking.data).all()
 
 
+def _new_operator4(shape, time_order, space_order, save=None, dle=None, **kwargs):
+    grid = Grid(shape=shape, extent=tuple(i - 1 for i in shape))
+    u = TimeFunction(name='u', grid=grid, time_order=time_order,
+                     space_order=space_order, save=save)
+    u.data[:] = 0.
+    u.data[:, 2:-2, 2:-2] = 1.
+
+    rhs = u + 0.1*u.laplace
+    if time_order == 2:
+        rhs -= 0.5*u.backward
+    op = Operator(Eq(u.forward, rhs), dle=dle)
+    op(time_M=10, **kwargs)
+
+    return u, op
+
+
+@pytest.mark.parametrize("shape", [(20, 33), (23, 19, 21)])
+@pytest.mark.parametrize("time_order,space_order,save", [
+    (1, 2, None),
+    (2, 4, None),
+    (2, 8, None),
+    (1, 4, 12)
+])
+@pytest.mark.parametrize("tileshape", [(1, 1), (3, 7), (4, 32), (11, 2)])
+def test_temporal_blocking(shape, time_order, space_order, save, tileshape):
+    wo_blocking, _ = _new_operator4(shape, time_order, space_order, save, dle='noop')
+
+    tiles = {'time0_tblock_size': tileshape[0]}
+    tiles.update({'%s0_tblock_size' % d: tileshape[1] for d in 'xy'[:len(shape) - 1]})
+    w_blocking, op = _new_operator4(shape, time_order, space_order, save,
+                                    dle=('advanced', {'blocktime': True}), **tiles)
+
+    # The time loop and all but the innermost space loops are tiled
+    trees = retrieve_iteration_tree(op)
+    assert len(trees) == 1
+    assert [i.dim.name for i in trees[0][:len(shape)]] ==\
+        ['time0_tblock'] + ['%s0_tblock' % d for d in 'xy'[:len(shape) - 1]]
+
+    assert np.allclose(wo_blocking.data, w_blocking.data, rtol=0, atol=1e-6)
+
+
+def test_temporal_blocking_unsupported():
+    """
+    Check that loop nests that cannot be tiled across time, here because of
+    the sparse operations within the time loop, are left untouched.
+    """
+    grid = Grid(shape=(20, 20))
+    u = TimeFunction(name='u', grid=grid, space_order=2)
+    src = SparseTimeFunction(name='src', grid=grid, npoint=1, nt=10)
+
+    eqns = [Eq(u.forward, u + 0.1*u.laplace)] + src.inject(field=u.forward, expr=src)
+    op0 = Operator(eqns, dle=('advanced', {'openmp': False}))
+    op1 = Operator(eqns, dle=('advanced', {'openmp': False, 'blocktime': True}))
+
+    assert str(op0.ccode) == str(op1.ccode)
+
+
 @pytest.mark.parametrize('exprs,expected', [
     # trivial 1D
     (['Eq(fa[x], fa[x] + fb[x])'],
@@ -434,6 +492,115 @@ def test_dynamic_nthreads():
     assert op.arguments(time=0, nthreads=123)['nthreads'] == 123  # user supplied
 
 
+def test_reductions():
+    grid = Grid(shape=(16, 16, 16))
+    f = Function(name='f', grid=grid)
+    f.data[:] = 2.
+
+    # Increments into the same location across all threads are reductions
+    n = Function(name='n', shape=(1,), dimensions=(Dimension(name='i'),))
+    op = Operator(Inc(n[0], f), dle='openmp')
+    assert 'reduction(+:n[0:1])' in str(op)
+    assert 'omp atomic' not in str(op)
+    op.apply()
+    assert n.data[0] == 2.*16**3
+
+    # Reduction into an array, privatized as a whole
+    i, j = dimensions('i j')
+    A = Function(name='A', shape=(30, 20), dimensions=(i, j))
+    A.data[:] = np.arange(600).reshape(30, 20)
+    b = Function(name='b', shape=(30,), dimensions=(i,))
+    b.data[:] = 1.
+    x = Function(name='x', shape=(20,), dimensions=(j,))
+    op = Operator(Inc(x, A*b), dle='openmp')
+    assert 'reduction(+:x[0:x_vec->size[0]])' in str(op)
+    assert 'omp atomic' not in str(op)
+    op.apply()
+    assert np.all(x.data == A.data.sum(axis=0))
+
+    # Reduction into a non-contiguous section, so the whole array is privatized
+    k = Dimension(name='k')
+    y = Function(name='y', shape=(20, 2), dimensions=(j, k))
+    op = Operator(Inc(y[j, 1], A), dle='openmp')
+    assert 'reduction(+:y[0:y_vec->size[0]][0:y_vec->size[1]])' in str(op)
+    assert 'omp atomic' not in str(op)
+    op.apply()
+    assert np.all(y.data[:, 0] == 0.)
+    assert np.all(y.data[:, 1] == A.data.sum(axis=0))
+
+    # Injection, where different threads may hit the same grid point
+    sf = SparseFunction(name='sf', grid=grid, npoint=4)
+    op = Operator(sf.inject(field=f, expr=sf), dle='openmp')
+    assert 'reduction' not in str(op)
+    assert 'omp atomic' in str(op)
+
+    # Also incremented at a point depending on the parallel Dimension, so all
+    # increments of `m` must be atomic
+    grid = Grid(shape=(64, 64))
+    xd, _ = grid.dimensions
+    g = Function(name='g', grid=grid)
+    g.data[:] = 2.
+    m = Function(name='m', shape=(64,), dimensions=(xd,))
+    op = Operator([Inc(m[0], g), Inc(m[xd], g)], dle='openmp')
+    assert 'reduction' not in str(op)
+    assert str(op).count('omp atomic') == 2
+    op.apply()
+    assert m.data[0] == 2.*64*64 + 2.*64
+    assert np.all(m.data[1:] == 2.*64)
+
+
+@pytest.mark.parametrize('threshold,expected', [
+    (80, 'reduction(+:x[0:x_vec->size[0]])'),
+    (79, 'omp atomic')
+])
+def test_reductions_threshold(threshold, expected):
+    """Sections larger than ``Ompizer.REDUCTION`` bytes are not privatized."""
+    i, j = dimensions('i j')
+    A = Function(name='A', shape=(30, 20), dimensions=(i, j))
+    A.data[:] = np.arange(600).reshape(30, 20)
+    x = Function(name='x', shape=(20,), dimensions=(j,))
+    with patch("devito.dle.backends.parallelizer.Ompizer.REDUCTION", threshold):
+        op = Operator(Inc(x, A), dle='openmp')
+    assert expected in str(op)
+    assert ('reduction' in str(op)) != ('omp atomic' in str(op))
+    op.apply()
+    assert np.all(x.data == A.data.sum(axis=0))
+
+
+@patch("devito.dle.backends.parallelizer.Ompizer.COLOURING", 1)
+@pytest.mark.parametrize("shape", [(41, 41), (21, 21, 21)])
+def test_coloured_injection(shape):
+    grid = Grid(shape=shape)
+    npoint = 500
+    src = SparseTimeFunction(name='src', grid=grid, npoint=npoint, nt=5,
+                             coordinates=np.random.rand(npoint, len(shape)))
+    src.data[:] = np.random.rand(5, npoint)
+    u = TimeFunction(name='u', grid=grid)
+    v = TimeFunction(name='v', grid=grid)
+
+    op = Operator(src.inject(field=u.forward, expr=src), dle='openmp')
+    assert 'omp atomic' not in str(op)
+    ref = Operator(src.inject(field=v.forward, expr=src), dle='noop')
+
+    for i in range(2):
+        # Same-colour points never touch the same grid points
+        points, offsets = src._colouring_data()
+        gridpoints = np.array(src.gridpoints)
+        for start, end in zip(offsets, offsets[1:]):
+            handle = gridpoints[points[start:end]]
+            distance = np.abs(handle[:, None] - handle[None, :]).max(axis=2)
+            assert np.all(distance[~np.eye(end - start, dtype=bool)] >= 2)
+
+        u.data[:] = 0.
+        v.data[:] = 0.
+        op.apply(time_M=3)
+        ref.apply(time_M=3)
+        assert np.allclose(u.data, v.data, rtol=1e-5, atol=1e-6)
+
+        # Move the sparse points; the colouring must be recomputed
+        src.coordinates.data[:] *= 0.5
+
+
 @pytest.mark.parametrize("shape", [(41,), (20, 33), (45, 31, 45)])
 def test_composite_transformation(shape):
     wo_blocking, _ = _new_operator1(shape, dle='noop')
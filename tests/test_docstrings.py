@@ -24,7 +24,7 @@ pytestmark = skipif(['yask', 'ops'])
     'types.basic', 'types.dimension', 'types.constant', 'types.grid',
     'types.dense', 'types.sparse', 'equation', 'operator',
     'data.decomposition', 'finite_differences.finite_difference',
-    'ir.support.space'
+    'ir.support.space', 'mpi.planner'
 ])
 def test_docstrings(modname):
     module = import_module('devito.%s' % modname)
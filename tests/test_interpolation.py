@@ -6,7 +6,8 @@ import pytest
 from conftest import skipif, unit_box, points, unit_box_time, time_points
 from devito.cgen_utils import FLOAT
 from devito import (Grid, Operator, Function, SparseFunction, Dimension, TimeFunction,
-                    PrecomputedSparseFunction, PrecomputedSparseTimeFunction)
+                    SparseTimeFunction, PrecomputedSparseFunction,
+                    PrecomputedSparseTimeFunction)
 from examples.seismic import (demo_model, TimeAxis, RickerSource, Receiver,
                               AcquisitionGeometry)
 from examples.seismic.acoustic import AcousticWaveSolver
@@ -362,6 +363,42 @@ def test_inject_from_field(shape, coords, result, npoints=19):
     assert np.allclose(a.data[indices], result, rtol=1.e-5)
 
 
+@pytest.mark.parametrize('shape', [(11, 11), (11, 11, 11)])
+def test_precompute(shape, npoints=20):
+    """Test that interpolation and injection through precomputed coefficients
+    match their on-the-fly counterparts, also after the sparse points have moved.
+    """
+    grid = Grid(shape=shape, extent=tuple(10. for _ in shape),
+                origin=tuple(-3. for _ in shape))
+    f = Function(name='f', grid=grid)
+    f.data[:] = np.random.RandomState(0).rand(*shape)
+
+    coords = np.linspace(-2.9, 6.9, npoints)[:, None]
+
+    results = []
+    for precompute in [False, True]:
+        u = TimeFunction(name='u', grid=grid)
+        sf = SparseTimeFunction(name='sf', grid=grid, npoint=npoints, nt=3,
+                                precompute=precompute)
+        sf.coordinates.data[:] = coords
+        sf.data[:] = 1.
+
+        op = Operator(sf.interpolate(f, increment=True) + sf.inject(u, sf))
+        assert ('floor' in str(op)) is not precompute
+
+        op.apply(time_M=1)
+        results.append((sf.data.copy(), u.data.copy()))
+
+        # Move the sparse points; the coefficients must be recomputed
+        sf.coordinates.data[:] = coords[::-1] + 0.01
+        op.apply(time_M=1)
+        results.append((sf.data.copy(), u.data.copy()))
+
+    for (sd0, ud0), (sd1, ud1) in zip(results[:2], results[2:]):
+        assert np.allclose(sd0, sd1, rtol=1.e-5)
+        assert np.allclose(ud0, ud1, rtol=1.e-5)
+
+
 @pytest.mark.parametrize('shape', [(50, 50, 50)])
 def test_position(shape):
     t0 = 0.0  # Start time
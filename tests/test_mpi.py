@@ -1,13 +1,18 @@
+from itertools import product
+
 import numpy as np
 import pytest
 
 from conftest import skipif
 from devito import (Grid, Constant, Function, TimeFunction, SparseFunction,
-                    SparseTimeFunction, Dimension, ConditionalDimension,
-                    SubDimension, Eq, Inc, Operator, norm, inner)
+                    SparseTimeFunction, PrecomputedSparseFunction, Dimension,
+                    ConditionalDimension, SubDimension, Eq, Inc, Operator, norm,
+                    inner, switchconfig)
 from devito.data import LEFT, RIGHT
+from devito.exceptions import InvalidArgument
 from devito.ir.iet import Call, Conditional, Iteration, FindNodes
-from devito.mpi import MPI, HaloExchangeBuilder
+from devito.mpi import (MPI, HaloExchangeBuilder, DecompositionPlan,
+                        plan_decomposition)
 from examples.seismic.acoustic import acoustic_setup
 
 pytestmark = skipif(['yask', 'ops', 'nompi'])
@@ -45,6 +50,82 @@ class TestDistributor(object):
         }
         assert f.shape == expected[distributor.nprocs][distributor.myrank]
 
+    @pytest.mark.parametrize('shape,nprocs,radius,topology,volume', [
+        ((16, 16), 4, 1, (2, 2), 64),
+        ((64, 16), 4, 1, (4, 1), 96),
+        ((16, 64), 4, 1, (1, 4), 96),
+        ((32, 32, 8), 8, 1, (2, 4, 1), 2048),
+        # An anisotropic stencil favours cuts across the Dimension with
+        # the smallest radius
+        ((32, 32), 4, (4, 1), (1, 4), 192),
+        # Prime number of processes
+        ((20, 30), 5, 1, (1, 5), 160),
+    ])
+    def test_plan_decomposition(self, shape, nprocs, radius, topology, volume):
+        plan = plan_decomposition(shape, nprocs, radius=radius)
+        assert plan.topology == topology
+        assert plan.volume == volume
+        assert plan.nprocs == nprocs
+        assert all(sum(i) == j for i, j in zip(plan.splits, shape))
+
+    def test_plan_decomposition_cost(self):
+        shape = (40, 40)
+        cost = np.ones(shape)
+        cost[:10] = 4.
+
+        # A uniform split is unbalanced...
+        plan = DecompositionPlan(shape, (4, 1), ((10, 10, 10, 10), (40,)), cost=cost)
+        assert np.isclose(plan.imbalance, 1600/700)
+
+        # ... unlike a cost-weighted one
+        plan = plan_decomposition(shape, 4, cost=cost, topology=(4, 1))
+        assert plan.splits == ((4, 5, 13, 18), (40,))
+        assert plan.imbalance < 1.15
+
+        # The same, through the per-Dimension costs
+        marginals = (cost.sum(axis=1), np.ones(40))
+        plan = plan_decomposition(shape, 4, cost=marginals, topology=(4, 1))
+        assert plan.splits == ((4, 5, 13, 18), (40,))
+        assert np.isclose(plan.imbalance, 1600/1400)
+
+        with pytest.raises(ValueError):
+            plan_decomposition(shape, 4, topology=(3, 1))
+        with pytest.raises(ValueError):
+            plan_decomposition(shape, 4, cost=np.ones((4, 4)))
+        with pytest.raises(ValueError):
+            plan_decomposition(shape, 4, cost=(np.ones(40), np.ones(4)))
+
+    @pytest.mark.parallel(nprocs=4)
+    def test_partitioning_planned(self):
+        shape = (24, 8)
+        cost = np.ones(shape)
+        cost[:4] = 5.
+        cost[-4:] = 5.
+        grid = Grid(shape=shape, topology='auto', cost=cost)
+        f = Function(name='f', grid=grid)
+
+        distributor = grid.distributor
+        assert distributor.topology == (4, 1)
+        assert distributor.plan.volume == 48
+        expected = [(3, 8), (9, 8), (9, 8), (3, 8)]
+        assert f.shape == expected[distributor.myrank]
+
+        # The decomposition is transparent to the user
+        data = np.arange(24*8).reshape(shape)
+        f.data[:] = data
+        glb_slices = tuple(distributor.glb_slices[d] for d in grid.dimensions)
+        assert np.all(f.data._local == data[glb_slices])
+
+    @pytest.mark.parallel(nprocs=4)
+    def test_partitioning_planned_radius(self):
+        # An anisotropic stencil favours cuts across the Dimension with
+        # the smallest radius
+        grid = Grid(shape=(32, 32), topology='auto', radius=(4, 1))
+        distributor = grid.distributor
+        assert distributor.plan.radius == (4, 1)
+        assert distributor.topology == (1, 4)
+        assert distributor.plan.volume == 192
+
     @pytest.mark.parallel(nprocs=9)
     def test_neighborhood_horizontal_2d(self):
         grid = Grid(shape=(3, 3))
@@ -378,19 +459,21 @@ free(bufg);"""
         f = TimeFunction(name='f', grid=grid)
 
         heb = HaloExchangeBuilder(False)
-        mock_halo = {(x, LEFT): True, (x, RIGHT): True, (y, LEFT): True, (y, RIGHT): True}
-        haloupdate = heb._make_haloupdate(f, [t], mock_halo)
+        mock_amounts = {(x, LEFT): 2, (x, RIGHT): 1, (y, LEFT): 1, (y, RIGHT): 0}
+        haloupdate = heb._make_haloupdate(f, [t], mock_amounts)
         assert str(haloupdate.parameters) == """\
 (f(t, x, y), comm, nb, otime)"""
+        # The messages are trimmed to the required amount of halo, and no
+        # message is sent to fill the right halo along `y`
         assert str(haloupdate.body[0]) == """\
-sendrecv3d(f_vec,f_vec->hsize[3],f_vec->npsize[2],otime,f_vec->oofs[2],\
+sendrecv3d(f_vec,1,f_vec->npsize[2],otime,f_vec->oofs[2],\
 f_vec->hofs[4],otime,f_vec->hofs[3],f_vec->hofs[4],nb->rc,nb->lc,comm);
-sendrecv3d(f_vec,f_vec->hsize[2],f_vec->npsize[2],otime,f_vec->oofs[3],\
-f_vec->hofs[4],otime,f_vec->hofs[2],f_vec->hofs[4],nb->lc,nb->rc,comm);
-sendrecv3d(f_vec,f_vec->npsize[1],f_vec->hsize[5],otime,f_vec->hofs[2],\
-f_vec->oofs[4],otime,f_vec->hofs[2],f_vec->hofs[5],nb->cr,nb->cl,comm);
-sendrecv3d(f_vec,f_vec->npsize[1],f_vec->hsize[4],otime,f_vec->hofs[2],\
-f_vec->oofs[5],otime,f_vec->hofs[2],f_vec->hofs[4],nb->cl,nb->cr,comm);"""
+sendrecv3d(f_vec,2,f_vec->npsize[2],otime,-2 + f_vec->hsize[2] + f_vec->oofs[3],\
+f_vec->hofs[4],otime,-2 + f_vec->hofs[2] + f_vec->hsize[2],f_vec->hofs[4],\
+nb->lc,nb->rc,comm);
+sendrecv3d(f_vec,f_vec->npsize[1],1,otime,f_vec->hofs[2],\
+-1 + f_vec->hsize[4] + f_vec->oofs[5],otime,f_vec->hofs[2],\
+-1 + f_vec->hofs[4] + f_vec->hsize[4],nb->cl,nb->cr,comm);"""
 
 
 class TestSparseFunction(object):
@@ -480,6 +563,65 @@ class TestSparseFunction(object):
         assert len(sf.data) == 1
         assert np.all(sf.data == data[sf.local_indices]*2)
 
+    @pytest.mark.parallel(nprocs=4)
+    def test_scatter_plan_reuse(self):
+        """
+        Test that the MPI routing plan of the sparse points is computed once and
+        for all, until the coordinates change.
+        """
+        grid = Grid(shape=(4, 4), extent=(4.0, 4.0))
+
+        coords = np.array([(3., 3.), (3., 1.), (1., 3.), (1., 1.)])
+        sf = SparseFunction(name='sf', grid=grid, npoint=len(coords), coordinates=coords)
+        sf.data[:] = np.array([3, 2, 1, 0])
+
+        loc_data = sf._dist_scatter()[sf]
+        assert loc_data[0] == grid.distributor.myrank
+        plan = sf._dist_plan
+        alltoall = plan['_dist_alltoall']
+
+        # Neither new data values nor re-scatters invalidate the plan...
+        sf.data[:] = np.array([7, 6, 5, 4])
+        loc_data = sf._dist_scatter()[sf]
+        assert loc_data[0] == grid.distributor.myrank + 4
+        assert sf._dist_plan is plan
+        assert sf._dist_plan['_dist_alltoall'] is alltoall
+
+        # ... while moving the points does
+        coordinates = sf.coordinates.data
+        coordinates[:] = coords[::-1]
+        loc_data = sf._dist_scatter()[sf]
+        assert loc_data[0] == 7 - grid.distributor.myrank
+        assert sf._dist_plan['_dist_alltoall'] is not alltoall
+
+        # ... even through a view handed out before the plan was computed
+        alltoall = sf._dist_plan['_dist_alltoall']
+        coordinates[:] = coords
+        loc_data = sf._dist_scatter()[sf]
+        assert loc_data[0] == grid.distributor.myrank + 4
+        assert sf._dist_plan['_dist_alltoall'] is not alltoall
+
+    @pytest.mark.parallel(nprocs=[2, 4])
+    def test_inject_twice(self):
+        """
+        Test that the sparse data is re-scattered at each Operator run.
+        """
+        grid = Grid(shape=(8, 8), extent=(7., 7.))
+        f = Function(name='f', grid=grid)
+        sf = SparseFunction(name='sf', grid=grid, npoint=2,
+                            coordinates=[(1., 1.), (5., 5.)])
+
+        op = Operator(sf.inject(f, sf))
+
+        sf.data[:] = 1.
+        op.apply()
+        assert np.isclose(norm(f), np.sqrt(2.))
+
+        f.data[:] = 0.
+        sf.data[:] = 2.
+        op.apply()
+        assert np.isclose(norm(f), 2*np.sqrt(2.))
+
 
 class TestOperatorSimple(object):
 
@@ -723,8 +865,352 @@ class TestOperatorSimple(object):
         assert np.all(f2.data == 1.)
 
 
+class TestHaloExchangeSchemes(object):
+
+    @pytest.mark.parallel(nprocs=1)
+    @switchconfig(mpi='overlap')
+    def test_iet_core_remainder(self):
+        grid = Grid(shape=(12, 12))
+        x, y = grid.dimensions
+
+        f = TimeFunction(name='f', grid=grid, space_order=2)
+
+        op = Operator(Eq(f.forward, f.laplace + 1.), dle='noop')
+
+        calls = [i.name for i in FindNodes(Call).visit(op)]
+        assert calls == ['halostart3d0', 'halowait3d0']
+
+        # One CORE nest, then two REMAINDER nests per distributed Dimension
+        xs = [i for i in FindNodes(Iteration).visit(op) if i.dim is x]
+        assert len(xs) == 5
+        assert str(xs[0].limits[:2]) == '(x_m + 1, x_M - 1)'
+        assert str(xs[1].limits[:2]) == '(x_m, Min(x_M, x_m))'
+        assert str(xs[2].limits[:2]) == '(Max(x_M, x_m + 1), x_M)'
+
+    @pytest.mark.parallel(nprocs=1)
+    @switchconfig(mpi='overlap')
+    def test_fallback_if_not_splittable(self):
+        grid = Grid(shape=(12, 12))
+        x, y = grid.dimensions
+        t = grid.stepping_dim
+
+        f = TimeFunction(name='f', grid=grid)
+
+        # The `y` Iteration is sequential, so there is no CORE region
+        op = Operator(Eq(f[t+1, x, y], f[t, x+1, y] + f[t+1, x, y-1] + 1))
+
+        calls = [i.name for i in FindNodes(Call).visit(op)]
+        assert calls == ['halostart3d0', 'halowait3d0']
+        assert len([i for i in FindNodes(Iteration).visit(op) if i.dim is x]) == 1
+
+    @pytest.mark.parallel(nprocs=1)
+    @switchconfig(mpi='persistent')
+    def test_iet_persistent(self):
+        grid = Grid(shape=(12, 12))
+
+        f = TimeFunction(name='f', grid=grid, space_order=2)
+
+        op = Operator(Eq(f.forward, f.laplace + 1.), dle='noop')
+
+        # Buffers and requests are set up outside of the time loop...
+        assert [i.name for i in FindNodes(Call).visit(op)] ==\
+            ['haloinit3d0', 'halostart3d0', 'halowait3d0', 'halofree3d0']
+        timeloop = FindNodes(Iteration).visit(op)[0]
+        assert timeloop.dim is grid.time_dim
+        assert [i.name for i in FindNodes(Call).visit(timeloop)] ==\
+            ['halostart3d0', 'halowait3d0']
+
+        # ... while the halo exchanges simply start and complete them
+        halostart = op._func_table['halostart3d0'].root
+        halowait = op._func_table['halowait3d0'].root
+        assert str(FindNodes(Call).visit(halostart)[-1]) ==\
+            'MPI_Startall(16,msgs->reqs);'
+        assert str(FindNodes(Call).visit(halowait)[0]) ==\
+            'MPI_Waitall(16,msgs->reqs,MPI_STATUSES_IGNORE);'
+
+    @pytest.mark.parallel(nprocs=1)
+    @switchconfig(mpi='persistent')
+    def test_iet_persistent_multi(self):
+        grid = Grid(shape=(12, 12))
+
+        f = TimeFunction(name='f', grid=grid, space_order=2)
+        g = TimeFunction(name='g', grid=grid, space_order=2)
+
+        op = Operator(Eq(f.forward, f.laplace + g.laplace + 1.), dle='noop')
+
+        # The messages of all of the Functions exchanged at the same HaloSpot
+        # are started and completed at once
+        assert [i.name for i in FindNodes(Call).visit(op)] ==\
+            ['haloinit3d3d0', 'halostart3d3d0', 'halowait3d3d0', 'halofree3d3d0']
+        halostart = op._func_table['halostart3d3d0'].root
+        halowait = op._func_table['halowait3d3d0'].root
+        assert [str(i) for i in FindNodes(Call).visit(halostart)
+                if i.name.startswith('MPI')] == ['MPI_Startall(32,msgs->reqs);']
+        assert [str(i) for i in FindNodes(Call).visit(halowait)
+                if i.name.startswith('MPI')] ==\
+            ['MPI_Waitall(32,msgs->reqs,MPI_STATUSES_IGNORE);']
+
+    @pytest.mark.parallel(nprocs=1)
+    @pytest.mark.parametrize('mode', [1, True])
+    @switchconfig(mpi='overlap')
+    def test_mode_basic_alias(self, mode):
+        grid = Grid(shape=(12, 12))
+
+        f = TimeFunction(name='f', grid=grid, space_order=2)
+
+        # As with `configuration['mpi']`, 1 and True mean `basic`
+        op = Operator(Eq(f.forward, f.laplace + 1.), mpi=mode)
+
+        calls = [i.name for i in FindNodes(Call).visit(op)]
+        assert calls == ['haloupdate3d0']
+
+    @pytest.mark.parallel(nprocs=1)
+    def test_iet_full(self):
+        grid = Grid(shape=(12, 12))
+
+        f = TimeFunction(name='f', grid=grid, space_order=2)
+
+        op = Operator(Eq(f.forward, f.laplace + 1.), mpi='full')
+
+        calls = [i.name for i in FindNodes(Call).visit(op)]
+        assert calls == ['halostart3d0', 'halowait3d0']
+
+        # All of the 8 neighbours, including the diagonal ones
+        halostart = op._func_table['halostart3d0'].root
+        calls = FindNodes(Call).visit(halostart)
+        torank = [str(i.params[-3]) for i in calls]
+        assert torank == ['nb->ll', 'nb->lc', 'nb->lr', 'nb->cl',
+                          'nb->cr', 'nb->rl', 'nb->rc', 'nb->rr']
+
+    @pytest.mark.parallel(nprocs=[2, 4])
+    @pytest.mark.parametrize('mode', ['full', 'overlap', 'persistent'])
+    @pytest.mark.parametrize('dle', ['noop', 'advanced'])
+    def test_same_as_basic(self, mode, dle):
+        grid = Grid(shape=(12, 12, 10))
+
+        u = TimeFunction(name='u', grid=grid, space_order=4)
+        v = TimeFunction(name='v', grid=grid, space_order=2)
+        eqns = [Eq(u.forward, u.laplace*0.01 + u + v.dx + u.dxr),
+                Eq(v.forward, v + u.dy*0.1 + v.dx)]
+
+        results = []
+        for i in ['basic', mode]:
+            u.data_with_halo[:] = 0.
+            u.data[0, 3:6, 2:9, 4:6] = 1.
+            v.data_with_halo[:] = 0.
+            v.data[0, 5, 5, 5] = 3.
+
+            op = switchconfig(mpi=i)(Operator)(eqns, dle=dle)
+            op.apply(time_M=3)
+
+            results.append((norm(u), norm(v)))
+
+        assert np.allclose(results[0], results[1], rtol=1e-12)
+
+    @pytest.mark.parallel(nprocs=1)
+    @pytest.mark.parametrize('mode', ['basic', 'full'])
+    def test_trimmed_messages(self, mode):
+        grid = Grid(shape=(12, 12))
+        x, y = grid.dimensions
+        t = grid.stepping_dim
+
+        f = TimeFunction(name='f', grid=grid, space_order=4)
+
+        # Only one point of halo is needed along `x`, on the right side
+        op = Operator(Eq(f.forward, f[t, x+1, y] + 1), mpi=mode)
+
+        calls = [i for i in FindNodes(Call).visit(op)
+                 if i.name.startswith(('haloupdate', 'halostart'))]
+        assert len(calls) == 1
+        haloupdate = op._func_table[calls[0].name].root
+        msgs = FindNodes(Call).visit(haloupdate)
+        assert len(msgs) == 1
+        assert msgs[0].params[1] == 1
+
+    @pytest.mark.parallel(nprocs=4)
+    @pytest.mark.parametrize('mode', ['basic', 'full', 'overlap', 'persistent'])
+    def test_onesided(self, mode):
+        grid = Grid(shape=(12, 11))
+        x, y = grid.dimensions
+        t = grid.stepping_dim
+
+        u = TimeFunction(name='u', grid=grid, space_order=4)
+        u.data_with_halo[:] = 0.
+        u.data[0, 2:7, 2:7] = 1.
+        u.data[0, 6:9, 6:10] = 2.
+
+        # Only the right halo along `x` and the left halo along `y` are exchanged
+        eqn = Eq(u.forward, 0.3*(u[t, x+2, y] + u[t, x+1, y-1]))
+        Operator(eqn, mpi=mode).apply(time_M=3)
+
+        # The expected value was computed through a sequential run
+        assert np.isclose(norm(u), 1.49803541, rtol=1e-6)
+
+    @pytest.mark.parallel(nprocs=4)
+    @pytest.mark.parametrize('mode', ['full', 'overlap', 'persistent'])
+    def test_corners(self, mode):
+        grid = Grid(shape=(12, 11))
+        x, y = grid.dimensions
+        t = grid.stepping_dim
+
+        u = TimeFunction(name='u', grid=grid, space_order=2)
+
+        # A stencil reading the corners of the halo
+        eqn = Eq(u.forward, u + 0.1*(u[t, x-2, y-2] + u[t, x+2, y+2]) +
+                 0.2*(u[t, x-1, y+2] + u[t, x+2, y-1]))
+
+        results = []
+        for i in ['basic', mode]:
+            u.data_with_halo[:] = 0.
+            u.data[0, 2:7, 2:7] = 1.
+            u.data[0, 6:9, 6:9] = 2.
+
+            Operator(eqn, mpi=i).apply(time_M=3)
+
+            results.append(norm(u))
+
+        assert np.isclose(results[0], results[1], rtol=1e-12)
+
+    @pytest.mark.parallel(nprocs=1)
+    def test_iet_wide(self):
+        grid = Grid(shape=(12, 12))
+        x, y = grid.dimensions
+
+        u = TimeFunction(name='u', grid=grid, space_order=4, time_order=2)
+        m = Function(name='m', grid=grid, space_order=4)
+
+        op = Operator(Eq(u.forward, 2*u - u.backward + m*u.laplace), mpi='wide',
+                      dle='noop')
+
+        # `m` is exchanged once, before the time loop, while `u` is exchanged
+        # only once every `exchange_period` timesteps
+        timeloop = FindNodes(Iteration).visit(op)[0]
+        assert timeloop.dim is grid.time_dim
+        calls = [i.name for i in FindNodes(Call).visit(op)]
+        assert calls == ['haloupdate2d0', 'haloupdate3d1', 'haloupdate3d2']
+        conditional = FindNodes(Conditional).visit(timeloop)[0]
+        assert str(conditional.condition) ==\
+            'Eq(Mod(time - time_m, exchange_period), 0)'
+        assert len(FindNodes(Call).visit(conditional)) == 2
+
+        # In between, the loop nest is computed redundantly over the ghost region
+        xs = [i for i in FindNodes(Iteration).visit(op) if i.dim is x]
+        assert len(xs) == 1
+        assert str(xs[0].limits[:2]) == '(-2*ghosts*nb_xl + x_m, 2*ghosts*nb_xr + x_M)'
+
+        # The halo of the Functions cannot accommodate more than 2 timesteps
+        period = [i for i in op.parameters if i.name == 'exchange_period'].pop()
+        assert period.maximum == 2
+        with pytest.raises(InvalidArgument):
+            op.apply(time_M=1, exchange_period=3)
+
+    @pytest.mark.parallel(nprocs=[2, 4])
+    @pytest.mark.parametrize('depth,period', [(1, 1), (1, 2), (2, 3), (3, 4)])
+    def test_wide_same_as_basic(self, depth, period):
+        grid = Grid(shape=(23, 21))
+
+        # A deeper halo allows less frequent halo exchanges
+        deep = switchconfig(**{'halo-depth': depth})
+        u = deep(TimeFunction)(name='u', grid=grid, space_order=4, time_order=2)
+        m = deep(Function)(name='m', grid=grid, space_order=4)
+        m.data[:] = 1.
+        m.data[5:10, :] = 1.5
+        eqn = Eq(u.forward, 2*u - u.backward + 0.0005*m*u.laplace + 0.0001*u.dx.dy)
+
+        results = []
+        for i in ['basic', 'wide']:
+            u.data_with_halo[:] = 0.
+            u.data[0:2, 8:12, 9:13] = 1.
+
+            op = Operator(eqn, mpi=i)
+            if i == 'wide':
+                op.apply(time_M=9, exchange_period=period)
+            else:
+                op.apply(time_M=9)
+
+            results.append(norm(u))
+
+        assert np.isclose(results[0], results[1], rtol=1e-12)
+
+    @pytest.mark.parallel(nprocs=4)
+    @pytest.mark.parametrize('mode,expected', [
+        # One message at a time: 2 halo points x 28 points (domain+halo)
+        ('basic', 2*2*28*4),
+        # All of the messages at once: 4 faces of 2x20 points, 4 corners of 2x2
+        ('overlap', 2*(4*2*20 + 4*2*2)*4),
+        # Retained for the whole run, for both HaloSpots
+        ('persistent', 2*2*(4*2*20 + 4*2*2)*4)
+    ])
+    def test_estimate_memory(self, mode, expected):
+        grid = Grid(shape=(40, 40))
+
+        u = TimeFunction(name='u', grid=grid, space_order=4)
+        v = TimeFunction(name='v', grid=grid, space_order=4)
+
+        op = Operator([Eq(u.forward, u.laplace + v), Eq(v.forward, v.laplace + u)],
+                      mpi=mode)
+        estimate = op.estimate_memory(time_M=4)
+
+        # The local data, including the halo
+        assert estimate['functions']['u'] == 2*28*28*4
+        assert estimate.communication == expected
+        assert estimate.ranks == [estimate.total]*4
+
+
 class TestOperatorAdvanced(object):
 
+    @pytest.mark.parallel(nprocs=[2])
+    def test_apply_async(self):
+        """
+        Test that Operators performing halo exchanges run asynchronously only
+        if MPI supports multiple threads.
+        """
+        grid = Grid(shape=(8, 8))
+        u = TimeFunction(name='u', grid=grid, space_order=2)
+        v = TimeFunction(name='v', grid=grid, space_order=2)
+
+        op = Operator(Eq(u.forward, u.dx + 1))
+        future = op.apply_async(time_M=3)
+        if MPI.Query_thread() < MPI.THREAD_MULTIPLE:
+            assert future.done()
+        future.result()
+        op.apply(u=v, time_M=3)
+        assert np.all(u.data_ro_domain == v.data_ro_domain)
+
+    @pytest.mark.parallel(nprocs=[2])
+    @switchconfig(opcache=1)
+    def test_opcache_warm_start(self, monkeypatch):
+        """
+        Test that Operators performing halo exchanges are reused from the
+        persistent Operator cache.
+        """
+        import tempfile
+        from devito import clear_cache
+        from devito.opcache import opcache, options
+
+        # A directory shared by all ranks
+        dirname = tempfile.mkdtemp() if MPI.COMM_WORLD.rank == 0 else None
+        dirname = MPI.COMM_WORLD.bcast(dirname, root=0)
+        monkeypatch.setitem(options, 'path', dirname)
+
+        def make_problem():
+            grid = Grid(shape=(8, 8))
+            u = TimeFunction(name='u', grid=grid, space_order=2)
+            u.data[:, 4, 4] = 1.
+            return u, Operator(Eq(u.forward, u.laplace + u))
+
+        hits = opcache.stats['hits']
+        u0, op0 = make_problem()
+        op0.apply(time_M=3)
+        assert opcache.stats['hits'] == hits
+
+        # Fresh data carriers, as if in a different process
+        clear_cache()
+        u1, op1 = make_problem()
+        assert opcache.stats['hits'] == hits + 1
+        op1.apply(time_M=3)
+        assert np.all(u1.data_ro_domain == u0.data_ro_domain)
+
     @pytest.mark.parallel(nprocs=[4])
     def test_injection_wodup(self):
         """
@@ -782,6 +1268,29 @@ class TestOperatorAdvanced(object):
         assert np.all(f.data[1] == 2.25)
         assert np.all(f.data[2] == 3.25)
 
+    @pytest.mark.parallel(nprocs=[2, 4])
+    def test_injection_many_points(self):
+        """
+        Test injection operator with enough sparse points that the scattered
+        sparse data must outlive its only Python reference, which is dropped as
+        soon as the Operator arguments are turned into ctypes objects.
+        """
+        grid = Grid(shape=(41, 41))
+
+        f = Function(name='f', grid=grid)
+        f.data[:] = 0.
+        npoint = 800
+        coords = np.random.RandomState(0).uniform(0.1, 0.9, size=(npoint, 2))
+        sf = SparseFunction(name='sf', grid=grid, npoint=npoint, coordinates=coords)
+        sf.data[:] = 1.
+
+        op = Operator(sf.inject(field=f, expr=sf))
+        op.apply()
+
+        # All the injection weights fall within the domain and add up to 1
+        total = grid.distributor.comm.allreduce(float(np.sum(f.data_ro_domain._local)))
+        assert np.isclose(total, npoint, rtol=1e-5)
+
     @pytest.mark.parallel(nprocs=[4])
     def test_injection_dup(self):
         """
@@ -916,6 +1425,47 @@ class TestOperatorAdvanced(object):
 
         assert np.all(sf.data == [1.5, 2.5, 2.5, 3.5][grid.distributor.myrank])
 
+    @pytest.mark.parallel(nprocs=[2, 4])
+    @pytest.mark.parametrize('r', [2, 4])
+    def test_precomputed_dup(self, r):
+        """
+        Test interpolation and injection through a PrecomputedSparseFunction
+        whose sparse points have a support straddling two or more MPI ranks.
+        """
+        shape = (21, 21)
+        grid = Grid(shape=shape)
+        npoint = 50
+
+        rs = np.random.RandomState(0)
+        # Some supports fall partly outside of the grid
+        gridpoints = rs.randint(-1, shape[0], size=(npoint, 2))
+        coefficients = rs.rand(npoint, 2, r)
+        fdata = rs.rand(*shape)
+
+        # Expected results, computed on the global grid
+        interpolated = np.ones(npoint)
+        injected = np.zeros(shape)
+        for n, (i, j) in enumerate(gridpoints):
+            for ri, rj in product(range(r), repeat=2):
+                if 0 <= i + ri < shape[0] and 0 <= j + rj < shape[1]:
+                    w = coefficients[n, 0, ri]*coefficients[n, 1, rj]
+                    interpolated[n] += w*fdata[i + ri, j + rj]
+                    injected[i + ri, j + rj] += w
+
+        f = Function(name='f', grid=grid)
+        f.data[:] = fdata
+        g = Function(name='g', grid=grid)
+        sf = PrecomputedSparseFunction(name='sf', grid=grid, r=r, npoint=npoint,
+                                       gridpoints=gridpoints, coefficients=coefficients)
+
+        sf.data[:] = 1.
+        Operator(sf.inject(g, sf)).apply()
+        glb_slices = tuple(grid.distributor.glb_slices[d] for d in grid.dimensions)
+        assert np.allclose(g.data_ro_domain._local, injected[glb_slices], rtol=1e-5)
+
+        Operator(sf.interpolate(f)).apply()
+        assert np.allclose(sf.data, interpolated[sf.local_indices], rtol=1e-5)
+
     @pytest.mark.parallel(nprocs=2)
     def test_subsampling(self):
         grid = Grid(shape=(40,))
@@ -1,10 +1,12 @@
 import numpy as np
 import pytest
+from sympy import cos, sin
 
 from conftest import skipif, EVAL, time, x, y, z
 from devito import (clear_cache, Grid, Eq, Operator, Constant, Function, TimeFunction,
                     SparseFunction, SparseTimeFunction, Dimension, error, SpaceDimension,
-                    NODE, CELL, configuration, switchconfig)
+                    NODE, CELL, compile_all, configuration, switchconfig)
+from devito.exceptions import InvalidArgument
 from devito.ir.iet import (ArrayCast, Expression, Iteration, FindNodes,
                            IsPerfectIteration, retrieve_iteration_tree)
 from devito.ir.support import Any, Backward, Forward
@@ -476,6 +478,37 @@ class TestAllocation(object):
         Operator([set_f, set_g])()
         assert f.data[index] == 2.
 
+    def test_estimate_memory(self):
+        grid = Grid(shape=(20, 20, 20))
+        u = TimeFunction(name='u', grid=grid, space_order=4, save=10)
+        m = Function(name='m', grid=grid, padding=(0, 0, 4))
+        eqn = Eq(u.forward, u.laplace*sin(m)*cos(m) + u*sin(m))
+        op = Operator(eqn, dse='aggressive')
+
+        estimate = op.estimate_memory(time_M=8)
+        assert u._data is None and m._data is None
+
+        # Each DiscreteFunction, including the padding and all of its timesteps
+        assert estimate['functions']['u'] == 10*28**3*4
+        assert estimate['functions']['m'] == 22*22*26*4
+        assert estimate['functions']['u'] == u._data_buffer.nbytes
+        assert estimate['functions']['m'] == m._data_buffer.nbytes
+        assert estimate.padding == 22*22*4*4
+
+        # The DSE heap temporaries
+        assert len(estimate['temporaries']) == 2
+        assert all(i == 20**3*4 for i in estimate['temporaries'].values())
+
+        # No MPI
+        assert estimate.communication == 0
+        assert estimate.total == (estimate.functions + estimate.temporaries)
+        assert estimate.ranks == [estimate.total]
+
+        # Overrides, e.g. a larger TimeFunction, are taken into account
+        u2 = TimeFunction(name='u', grid=grid, space_order=4, save=20)
+        estimate = op.estimate_memory(u=u2, time_M=18)
+        assert estimate['functions']['u'] == 20*28**3*4
+
 
 class TestArguments(object):
 
@@ -947,6 +980,50 @@ class TestArguments(object):
 
         assert u_arg_shape == expected
 
+    def test_bind(self):
+        """
+        Test that a bound Operator computes the same as ``apply``, also when
+        the time bounds and the Constants are patched at call time.
+        """
+        grid = Grid(shape=(4, 4))
+        c = Constant(name='c', value=1.)
+        u = TimeFunction(name='u', grid=grid)
+        v = TimeFunction(name='v', grid=grid)
+
+        op = Operator(Eq(u.forward, u + c))
+
+        op.apply(u=v, time_M=9)
+
+        bound = op.bind(time_M=0)
+        for i in range(5):
+            bound(time_m=i, time_M=i)
+        bound(time_m=5, time=9)
+        assert np.all(u.data == v.data)
+
+        bound(c=2., time_m=10, time_M=10)
+        assert np.all(u.data[1] == v.data[0] + 2.)
+
+        # Non-scalar overrides trigger a re-binding
+        v.data[:] = 0.
+        bound(u=v, time_m=0, time_M=0)
+        assert np.all(v.data[1] == 2.)
+
+    def test_bind_oob(self):
+        """Test that patched Dimension bounds are checked at call time."""
+        grid = Grid(shape=(4, 4))
+        u = TimeFunction(name='u', grid=grid, save=5)
+
+        op = Operator(Eq(u.forward, u + 1))
+
+        bound = op.bind()
+        with pytest.raises(InvalidArgument):
+            bound(time_M=4)
+        # Illegal values are never patched in
+        assert bound.args['time_M'] == 3
+        bound(time_M=2)
+        assert np.all(u.data[3] == 3.)
+        assert np.all(u.data[4] == 0.)
+
 
 class TestDeclarator(object):
 
@@ -1414,3 +1491,321 @@ class TestLoopScheduler(object):
         trees = retrieve_iteration_tree(op)
         assert len(trees) == 4
         assert all(trees[0][0] is i[0] for i in trees)
+
+
+class TestOperatorCache(object):
+
+    @pytest.fixture(autouse=True)
+    def opcache_path(self, tmpdir, monkeypatch):
+        from devito.opcache import options
+        monkeypatch.setitem(options, 'path', str(tmpdir))
+
+    def _make_problem(self, name='u'):
+        grid = Grid(shape=(8, 8))
+        u = TimeFunction(name=name, grid=grid, space_order=2)
+        c = Constant(name='c', value=0.1)
+        sf = SparseTimeFunction(name='sf', grid=grid, npoint=1, nt=5,
+                                coordinates=[(0.45, 0.55)])
+        eqns = [Eq(u.forward, u + c*u.laplace)] + sf.interpolate(u)
+        return u, sf, eqns
+
+    @switchconfig(opcache=1)
+    def test_warm_start(self):
+        from devito.opcache import opcache
+        stats = dict(opcache.stats)
+
+        u0, sf0, eqns = self._make_problem()
+        u0.data[:, 4, 4] = 1.
+        op0 = Operator(eqns)
+        op0.apply(time_M=3)
+        assert opcache.stats['misses'] == stats['misses'] + 1
+        assert opcache.stats['stores'] == stats['stores'] + 1
+
+        # Fresh data carriers, as if in a different process
+        clear_cache()
+        u1, sf1, eqns = self._make_problem()
+        u1.data[:, 4, 4] = 1.
+        op1 = Operator(eqns)
+        assert opcache.stats['hits'] == stats['hits'] + 1
+        assert op1._soname == op0._soname
+        assert str(op1) == str(op0)
+
+        op1.apply(time_M=3)
+        assert np.all(u1.data == u0.data)
+        assert np.all(sf1.data == sf0.data)
+
+    @switchconfig(opcache=1)
+    def test_miss(self):
+        from devito.opcache import opcache
+
+        _, _, eqns = self._make_problem()
+        Operator(eqns).apply(time_M=1)
+
+        # Different names and different Operator arguments lead to different keys
+        hits = opcache.stats['hits']
+        _, _, eqns = self._make_problem(name='v')
+        Operator(eqns).apply(time_M=1)
+        Operator(eqns, dle='noop').apply(time_M=1)
+        assert opcache.stats['hits'] == hits
+        assert len(opcache.entries) == 3
+
+    @switchconfig(opcache=1)
+    def test_stale_entry(self):
+        from devito.opcache import opcache
+
+        _, _, eqns = self._make_problem(name='s')
+        op = Operator(eqns)
+        op.apply(time_M=1)
+        entry = opcache.path.joinpath(op._opcache_key).with_suffix('.opc')
+        assert entry.is_file()
+
+        # E.g., an entry pickled by an older Devito version, which can't be
+        # unpickled anymore, is treated as a miss and then replaced
+        entry.write_bytes(b'cdevito\nNoSuchClass\n.')
+        misses = opcache.stats['misses']
+        op = Operator(eqns)
+        assert opcache.stats['misses'] == misses + 1
+        op.apply(time_M=1)
+        assert entry.stat().st_size > 100
+
+    @switchconfig(opcache=1)
+    def test_eviction(self, monkeypatch):
+        from devito.opcache import opcache, options
+
+        for name in ['u', 'v', 'w']:
+            _, _, eqns = self._make_problem(name=name)
+            Operator(eqns).apply(time_M=1)
+        assert len(opcache.entries) == 3
+
+        # Only the most recently used entry can fit
+        monkeypatch.setitem(options, 'max-size', opcache.entries[-1][1])
+        opcache.evict()
+        assert len(opcache.entries) == 1
+
+        opcache.clear()
+        assert len(opcache.entries) == 0
+
+    @switchconfig(opcache=1)
+    def test_untrusted_path(self):
+        """
+        Test that the Operator cache is disabled if other users may write into
+        its directory.
+        """
+        from devito.opcache import opcache
+
+        assert opcache.enabled
+        opcache.path.chmod(0o777)
+        assert not opcache.enabled
+
+        _, _, eqns = self._make_problem()
+        Operator(eqns).apply(time_M=1)
+        assert len(opcache.entries) == 0
+
+
+def test_compile_all():
+    """Test parallel JIT compilation of a batch of Operators."""
+    grid = Grid(shape=(8, 8))
+    u = TimeFunction(name='u', grid=grid, space_order=4)
+
+    ops = [Operator(Eq(u.forward, u + 1), name='Kernel0'),
+           Operator(Eq(u.forward, u.laplace), name='Kernel1'),
+           Operator(Eq(u.forward, u + 1), name='Kernel0')]
+    compile_all(ops, workers=2)
+    assert all(i._lib is not None for i in ops)
+
+    ops[0].apply(time_M=1)
+    assert np.all(u.data[0] == 2.)
+
+
+@skipif('nompi')
+@switchconfig(mpi=True)
+def test_compile_all_mpi(monkeypatch):
+    """Test that, with MPI, the compilations are serial unless told otherwise."""
+    import devito.compiler as compiler
+
+    def pool(*args, **kwargs):
+        raise AssertionError("No pool expected")
+    monkeypatch.setattr(compiler, 'ProcessPoolExecutor', pool)
+
+    grid = Grid(shape=(8, 8))
+    u = TimeFunction(name='u', grid=grid)
+    ops = [Operator(Eq(u.forward, u + 2), name='Kernel0'),
+           Operator(Eq(u.forward, u + 3), name='Kernel1')]
+    compile_all(ops)
+    assert all(i._lib is not None for i in ops)
+
+
+class TestApplyAsync(object):
+
+    @pytest.fixture(autouse=True)
+    def async_executor(self, monkeypatch):
+        import devito.operator as operator
+        monkeypatch.setattr(operator, 'async_executor', operator.AsyncExecutor(4))
+
+    def test_basic(self):
+        grid = Grid(shape=(8, 8))
+        u = TimeFunction(name='u', grid=grid)
+        v = TimeFunction(name='v', grid=grid)
+
+        op = Operator(Eq(u.forward, u + 1))
+
+        future = op.apply_async(time_M=9)
+        summary = op.apply(u=v, time_M=9)
+        assert set(future.result()) == set(summary)
+        assert np.all(u.data == v.data)
+
+    def test_conflicts(self):
+        """
+        Test that in-flight Operators accessing the same data are serialized.
+        """
+        grid = Grid(shape=(8, 8))
+        u = TimeFunction(name='u', grid=grid)
+        v = TimeFunction(name='v', grid=grid)
+        u1 = TimeFunction(name='u1', grid=grid)
+        v1 = TimeFunction(name='v1', grid=grid)
+
+        op0 = Operator(Eq(u.forward, u + 1))
+        op1 = Operator(Eq(v.forward, v + u))
+
+        futures = []
+        for i in range(4):
+            futures.append(op0.apply_async(time_m=5*i, time_M=5*i + 4))
+            futures.append(op1.apply_async(time_m=5*i, time_M=5*i + 4))
+        for i in range(4):
+            op0.apply(u=u1, time_m=5*i, time_M=5*i + 4)
+            op1.apply(u=u1, v=v1, time_m=5*i, time_M=5*i + 4)
+        [i.result() for i in futures]
+
+        assert np.all(u.data == u1.data)
+        assert np.all(v.data == v1.data)
+
+    def test_array_override(self):
+        """
+        Test that runtime overrides given as arrays are serialized with the
+        Operators accessing the same memory.
+        """
+        grid = Grid(shape=(8, 8))
+        u = Function(name='u', grid=grid)
+        v = Function(name='v', grid=grid)
+
+        op0 = Operator(Eq(u, u + 1))
+        op1 = Operator(Eq(v, v + u))
+
+        data = u._data_allocated.copy()
+        futures = []
+        for i in range(4):
+            futures.append(op0.apply_async(u=data))
+            futures.append(op1.apply_async(u=data))
+        [i.result() for i in futures]
+
+        assert np.all(u.data == 0.)
+        assert np.all(v.data == 10.)
+
+    def test_no_autotuning(self):
+        grid = Grid(shape=(8, 8))
+        u = TimeFunction(name='u', grid=grid)
+
+        op = Operator(Eq(u.forward, u + 1))
+
+        with pytest.raises(ValueError):
+            op.apply_async(time_M=9, autotune=True)
+
+    def test_sync(self):
+        """
+        Test that synchronous submissions run in the calling thread, but only
+        once the conflicting in-flight Operators have completed.
+        """
+        import threading
+        from devito.operator import async_executor
+
+        event = threading.Event()
+        future0 = async_executor.submit(lambda: event.wait(5), set(), {0})
+        future1 = async_executor.submit(threading.current_thread, {0}, set(),
+                                        sync=True)
+        assert future0.done() and future0.result() is False
+        assert future1.done() and future1.result() is threading.current_thread()
+
+
+def test_compilation_profile():
+    """Test the tracking of the time spent in the compilation stages."""
+    from devito.profiling import compilation_profile
+    calls = compilation_profile.get('clusterize', {}).get('calls', 0)
+
+    grid = Grid(shape=(8, 8))
+    u = TimeFunction(name='u', grid=grid, space_order=4)
+
+    op = Operator(Eq(u.forward, u.laplace + u), dse='advanced', dle='advanced')
+    op.cfunction
+
+    profile = op._state['compile-timings']
+    assert all(i in profile for i in ['clusterize', 'dse', 'st_build', 'iet_build',
+                                      'dle', 'codegen', 'jit'])
+    assert all(v['time'] >= 0 and v['calls'] >= 1 for v in profile.values())
+
+    # The DSE passes track the operation count before and after the pass
+    factorize = profile['dse.factorize']
+    assert factorize['ops-after'] <= factorize['ops-before']
+    assert factorize['exprs-after'] >= 1
+    assert any(i.startswith('dle.') for i in profile)
+
+    # Also aggregated process-wide
+    assert compilation_profile['clusterize']['calls'] == calls + 1
+
+
+@switchconfig(profiling_memory=1)
+def test_compile_stage_memory():
+    """Test that the peak memory allocated in a compilation stage is tracked."""
+    from devito.profiling import CompilationProfile, compile_stage
+
+    profile = CompilationProfile()
+    with profile:
+        with compile_stage('alloc'):
+            a = np.ones(2**23)
+        with compile_stage('noalloc'):
+            a.sum()
+        with compile_stage('outer'):
+            with compile_stage('temporary'):
+                np.ones(2**23).sum()
+    assert profile['alloc']['memory'] >= 2**25
+    assert profile['noalloc']['memory'] < 2**25
+    # The peak is tracked, even if the memory is released within the stage
+    assert profile['temporary']['memory'] >= 2**25
+    assert profile['outer']['memory'] >= 2**25
+
+    # Also tracked if the stage fails
+    with profile:
+        with pytest.raises(ValueError):
+            with compile_stage('alloc'):
+                raise ValueError
+    assert profile['alloc']['calls'] == 2
+
+
+def test_compile_stage_memory_tracing():
+    """
+    Test that memory is only traced on request, and that a tracing session
+    started by the user is left untouched.
+    """
+    import tracemalloc
+    from devito.profiling import CompilationProfile, compile_stage
+
+    profile = CompilationProfile()
+    with profile:
+        with compile_stage('alloc'):
+            np.ones(2**23).sum()
+    assert profile['alloc']['memory'] == 0
+    assert not tracemalloc.is_tracing()
+
+    configuration['profiling-memory'] = 1
+    tracemalloc.start()
+    try:
+        a = np.ones(2**20)  # noqa
+        traced = tracemalloc.get_traced_memory()[0]
+        with profile:
+            with compile_stage('alloc'):
+                np.ones(2**23).sum()
+        assert tracemalloc.is_tracing()
+        assert tracemalloc.get_traced_memory()[0] >= traced
+        assert profile['alloc']['memory'] >= 2**25
+    finally:
+        tracemalloc.stop()
+        configuration['profiling-memory'] = 0
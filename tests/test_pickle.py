@@ -6,7 +6,7 @@ import cloudpickle as pickle
 from conftest import skipif
 from devito import (Constant, Eq, Function, TimeFunction, SparseFunction, Grid,
                     TimeDimension, SteppingDimension, Operator)
-from devito.mpi.routines import MPIStatusObject, MPIRequestObject
+from devito.mpi.routines import MPIStatusObject, MPIRequestObject, MPIMsg, MPIMsgs
 from devito.profiling import Timer
 from devito.symbolics import IntDiv, ListInitializer, FunctionFromPointer
 from examples.seismic import (demo_model, AcquisitionGeometry,
@@ -271,6 +271,22 @@ def test_mpi_objects():
     assert obj.name == new_obj.name
     assert obj.dtype == new_obj.dtype
 
+    # Message
+    obj = MPIMsg(name='msg')
+    pkl_obj = pickle.dumps(obj)
+    new_obj = pickle.loads(pkl_obj)
+    assert obj.name == new_obj.name
+    assert obj.pname == new_obj.pname
+    assert obj.pfields == new_obj.pfields
+
+    # Messages, with persistent requests
+    obj = MPIMsgs(name='msgs', nmsgs=4)
+    pkl_obj = pickle.dumps(obj)
+    new_obj = pickle.loads(pkl_obj)
+    assert obj.name == new_obj.name
+    assert obj.nmsgs == new_obj.nmsgs
+    assert obj.pfields == new_obj.pfields
+
 
 @skipif(['yask', 'nompi'])
 @pytest.mark.parallel(nprocs=[1])